@@ -1,7 +1,9 @@
 from __future__ import annotations
 from sarb.data.ingest import load_yfinance_prices
-from sarb.live.paper_broker import PaperBroker
-from sarb.live.runner import LiveConfig, run_live_step
+from sarb.live.array_broker import ArrayPaperBroker
+from sarb.live.replay import replay_live
+from sarb.live.runner import LiveConfig
+from sarb.metrics.performance import MetricsAccumulator
 
 
 def main():
@@ -13,32 +15,36 @@ def main():
     prices = prices.dropna()
     print(f"Loaded {len(prices)} days for {list(prices.columns)}")
 
-    broker = PaperBroker(initial_capital=100_000.0, fee_bps=1.0, slippage_bps=0.5)
+    broker = ArrayPaperBroker(initial_capital=100_000.0, fee_bps=1.0, slippage_bps=0.5)
     config = LiveConfig(pairs=pairs, notional_per_pair=20_000.0)
 
     start_idx = config.train_lookback + config.lookback_z
     print(f"Starting paper trading from day {start_idx}...\n")
 
-    for i in range(start_idx, len(prices)):
-        daily_prices = prices.iloc[: i + 1]
-        current = {t: float(daily_prices[t].iloc[-1]) for t in tickers}
-        broker.set_current_prices(current)
-
-        signals = run_live_step(daily_prices, config, broker)
+    # Same signals and fills as stepping run_live_step day by day, without re-slicing history
+    report = replay_live(prices, config, broker, start=start_idx)
 
+    # Running metrics on daily account returns, O(1) per day
+    stats = MetricsAccumulator()
+    prev_acct = 100_000.0
+    for i, (date, acct) in enumerate(report.account_value.items(), start=start_idx):
+        stats.update(acct / prev_acct - 1.0)
+        prev_acct = acct
         if i % 50 == 0 or i == len(prices) - 1:
-            date = prices.index[i].strftime("%Y-%m-%d")
-            acct = broker.get_account_value()
-            pos = broker.get_all_positions()
-            n_pos = len(pos)
-            print(f"  {date} | Account: ${acct:,.2f} | Open positions: {n_pos}")
+            print(
+                f"  {date.strftime('%Y-%m-%d')} | Account: ${acct:,.2f}"
+                f" | Sharpe: {stats.sharpe():.2f} | MaxDD: {stats.max_drawdown():.2%}"
+            )
 
     final = broker.get_account_value()
     pnl = final - 100_000.0
     print(f"\n=== Paper Trading Summary ===")
     print(f"Final account value: ${final:,.2f}")
     print(f"Total P&L: ${pnl:,.2f} ({pnl / 100_000.0:.2%})")
-    print(f"Total fills: {len(broker.get_fill_history())}")
+    print(f"Sharpe: {stats.sharpe():.2f} | Max Drawdown: {stats.max_drawdown():.2%} | Hit rate: {stats.hit_rate():.1%}")
+    print(f"Open positions: {len(broker.get_all_positions())}")
+    print(f"Total fills: {report.n_fills}")
+    print(report.summary())
 
 
 if __name__ == "__main__":
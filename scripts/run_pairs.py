@@ -8,7 +8,7 @@ from sarb.features.spread import fit_hedge_ratio, compute_spread, rolling_zscore
 from sarb.strategy.pairs import generate_spread_positions
 from sarb.backtest.engine import backtest_pairs
 from sarb.metrics.performance import sharpe, max_drawdown, cagr
-from sarb.stats.bootstrap import bootstrap_mean_ci, bootstrap_sharpe_ci
+from sarb.stats.bootstrap import bootstrap_cis
 from sarb.stats.cointegration import engle_granger_adf_pvalue, estimate_half_life
 from sarb.backtest.walkforward import walkforward_pairs_backtest
 from sarb.viz.report import save_backtest_report
@@ -70,17 +70,16 @@ def main():
     print("=== Pairs Trading (Test Window) ===")
     print(f"Pair: {cfg.y_ticker}/{cfg.x_ticker}")
     print(f"alpha={alpha:.6f}, beta={beta:.6f}")
-    print(f"Sharpe: {sharpe(r):.3f}")
+    print(f"Sharpe: {sharpe(r, ann_factor=cfg.ann_factor):.3f}")
     print(f"Max Drawdown: {max_drawdown(eq):.3%}")
-    print(f"CAGR: {cagr(eq):.3%}")
+    print(f"CAGR: {cagr(eq, ann_factor=cfg.ann_factor):.3%}")
     print(f"Avg daily net ret: {r.mean():.6f}")
 
-    mean_ci = bootstrap_mean_ci(r, n_boot=3000)
-    sh_ci = bootstrap_sharpe_ci(r, n_boot=3000)
+    ci = bootstrap_cis({"test": r}, n_boot=3000, ann_factor=cfg.ann_factor).loc["test"]
 
     print("\n=== Bootstrap (Test Window) ===")
-    print(f"Mean CI: [{mean_ci['ci_low']:.6f}, {mean_ci['ci_high']:.6f}] (mean={mean_ci['mean']:.6f})")
-    print(f"Sharpe CI: [{sh_ci['ci_low']:.3f}, {sh_ci['ci_high']:.3f}] (sharpe={sh_ci['sharpe']:.3f})")
+    print(f"Mean CI: [{ci['mean_ci_low']:.6f}, {ci['mean_ci_high']:.6f}] (mean={ci['mean']:.6f})")
+    print(f"Sharpe CI: [{ci['sharpe_ci_low']:.3f}, {ci['sharpe_ci_high']:.3f}] (sharpe={ci['sharpe']:.3f})")
 
     # Save plots
     spread_test = compute_spread(
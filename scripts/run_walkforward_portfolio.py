@@ -2,18 +2,18 @@ from __future__ import annotations
 
 from sarb.data.ingest import load_yfinance_prices
 from sarb.split.rebalance import rolling_windows_by_quarter
-from sarb.research.walkforward_portfolio import WFConfig, walkforward_quarterly_portfolio
+from sarb.research.walkforward_portfolio import WFConfig, walkforward_quarterly_portfolio_multi
 from sarb.metrics.performance import sharpe, max_drawdown, cagr
 from sarb.viz.charts import plot_equity_curve, plot_drawdown, save_figure
 
 
-def summarize(label: str, port):
+def summarize(label: str, port, cfg: WFConfig):
     r = port["ret_net"]
     eq = port["equity"]
     print(f"\n=== {label} ===")
-    print(f"Sharpe: {sharpe(r):.2f}")
+    print(f"Sharpe: {sharpe(r, cfg.ann_factor):.2f}")
     print(f"Max Drawdown: {max_drawdown(eq):.2%}")
-    print(f"CAGR: {cagr(eq):.2%}")
+    print(f"CAGR: {cagr(eq, cfg.ann_factor):.2%}")
 
 
 def main():
@@ -36,7 +36,6 @@ def main():
         corr_threshold=0.6,
         use_vol_targeting=False,   # OFF
     )
-    port_eq, meta_eq = walkforward_quarterly_portfolio(prices, tickers, windows, cfg_eq)
 
     # -------------------------
     # RUN 2: Vol targeted (equal risk)
@@ -48,7 +47,6 @@ def main():
         target_daily_vol=0.008,
         max_pair_scale=3.0,
     )
-    port_vt, meta_vt = walkforward_quarterly_portfolio(prices, tickers, windows, cfg_vt)
 
     # -------------------------
     # RUN 3: Risk-managed (correlation weights + drawdown breaker)
@@ -69,14 +67,19 @@ def main():
             short_borrow_cost_bps=50.0,
         ),
     )
-    port_rm, meta_rm = walkforward_quarterly_portfolio(prices, tickers, windows, cfg_rm)
+
+    # All three share selection/signal settings: select and trade pairs once,
+    # then build each portfolio from the shared per-pair returns
+    (port_eq, meta_eq), (port_vt, meta_vt), (port_rm, meta_rm) = walkforward_quarterly_portfolio_multi(
+        prices, tickers, windows, [cfg_eq, cfg_vt, cfg_rm]
+    )
 
     # -------------------------
     # Print metrics for all
     # -------------------------
-    summarize("Equal Weight (no vol targeting)", port_eq)
-    summarize("Vol Targeted (equal risk)", port_vt)
-    summarize("Risk-Managed (corr weights + DD breaker)", port_rm)
+    summarize("Equal Weight (no vol targeting)", port_eq, cfg_eq)
+    summarize("Vol Targeted (equal risk)", port_vt, cfg_vt)
+    summarize("Risk-Managed (corr weights + DD breaker)", port_rm, cfg_rm)
 
     print("\n=== Vol Target: Quarterly Selection Log (first 10) ===")
     print(meta_vt.head(10).to_string(index=False))
@@ -8,7 +8,7 @@ from sarb.features.spread import fit_hedge_ratio, compute_spread, rolling_zscore
 from sarb.strategy.pairs import generate_spread_positions
 from sarb.backtest.engine import backtest_pairs
 from sarb.metrics.performance import sharpe, max_drawdown, cagr
-from sarb.stats.bootstrap import bootstrap_mean_ci, bootstrap_sharpe_ci
+from sarb.stats.bootstrap import bootstrap_cis
 
 
 def main():
@@ -56,6 +56,7 @@ def main():
 
     # Evaluate each selected pair on TEST only (reporting)
     print("\n=== Out-of-sample TEST Results ===")
+    test_returns, summary = {}, {}
     for r in selected:
         # Fit on TRAIN only (you can also fit on TRAIN+VAL for a different protocol; keep train-only for purity)
         alpha, beta = fit_hedge_ratio(train_px[r.y], train_px[r.x])
@@ -85,13 +86,17 @@ def main():
         mdd = max_drawdown(eq)
         g = cagr(eq)
 
-        mean_ci = bootstrap_mean_ci(daily, n_boot=2000)
-        sh_ci = bootstrap_sharpe_ci(daily, n_boot=2000)
+        test_returns[f"{r.y}/{r.x}"] = daily
+        summary[f"{r.y}/{r.x}"] = (sh, mdd, g)
 
-        print(f"\nPair {r.y}/{r.x}")
+    # one bootstrap pass over all selected pairs, spread over every CPU
+    cis = bootstrap_cis(test_returns, n_boot=2000, jobs=0)
+    for name, (sh, mdd, g) in summary.items():
+        ci = cis.loc[name]
+        print(f"\nPair {name}")
         print(f"Sharpe={sh:.2f} | MaxDD={mdd:.2%} | CAGR={g:.2%}")
-        print(f"Mean CI: [{mean_ci['ci_low']:.6f}, {mean_ci['ci_high']:.6f}]")
-        print(f"Sharpe CI: [{sh_ci['ci_low']:.2f}, {sh_ci['ci_high']:.2f}]")
+        print(f"Mean CI: [{ci['mean_ci_low']:.6f}, {ci['mean_ci_high']:.6f}]")
+        print(f"Sharpe CI: [{ci['sharpe_ci_low']:.2f}, {ci['sharpe_ci_high']:.2f}]")
 
 if __name__ == "__main__":
     main()
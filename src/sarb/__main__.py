@@ -0,0 +1,5 @@
+import sys
+
+from sarb.cli import main
+
+sys.exit(main())
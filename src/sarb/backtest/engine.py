@@ -13,6 +13,7 @@ def backtest_pairs(
     slippage_bps: float,
     leverage: float = 1.0,
     short_borrow_cost_bps: float = 0.0,
+    ann_factor: float = 252,
 ) -> pd.DataFrame:
     """
     prices: DataFrame with columns [y, x] of aligned prices
@@ -21,6 +22,7 @@ def backtest_pairs(
       long spread: +1*y  and  -beta*x
       short spread: -1*y and +beta*x
     Uses simple returns per leg and charges costs on position changes (turnover).
+    ann_factor: bars per year, used to accrue borrow per bar (252 for daily bars).
     """
     px = prices[[y, x]].copy()
     ret = px.pct_change().fillna(0.0)
@@ -45,11 +47,11 @@ def backtest_pairs(
     cost_rate = (fee_bps + slippage_bps) / 1e4  # bps -> fraction
     costs = turnover * cost_rate
 
-    # Short borrow cost: daily carry on short leg notional
+    # Short borrow cost: per-bar carry on short leg notional
     if short_borrow_cost_bps > 0:
         short_notional = w_x.clip(upper=0.0).abs() + w_y.clip(upper=0.0).abs()
-        borrow_daily = short_borrow_cost_bps / 1e4 / 252
-        costs = costs + short_notional * borrow_daily
+        borrow_per_bar = short_borrow_cost_bps / 1e4 / ann_factor
+        costs = costs + short_notional * borrow_per_bar
 
     port_ret_net = port_ret_gross - costs
 
@@ -66,3 +68,91 @@ def backtest_pairs(
     )
     out["equity"] = (1.0 + out["ret_net"]).cumprod()
     return out
+
+
+def pair_net_returns(
+    py: np.ndarray,
+    px: np.ndarray,
+    beta: float,
+    spread_pos: np.ndarray,
+    fee_bps: float,
+    slippage_bps: float,
+    leverage: float = 1.0,
+) -> np.ndarray:
+    """
+    ret_net column of backtest_pairs (no borrow) on plain arrays, for the
+    per-pair research loops where building the DataFrame dominates the cost.
+    """
+    n = len(py)
+    ret_y = np.zeros(n)
+    ret_x = np.zeros(n)
+    ret_y[1:] = py[1:] / py[:-1] - 1.0
+    ret_x[1:] = px[1:] / px[:-1] - 1.0
+
+    w_y = spread_pos * 1.0
+    w_x = spread_pos * (-beta)
+    gross = np.abs(w_y) + np.abs(w_x)
+    with np.errstate(divide="ignore"):
+        scale = np.where(gross == 0.0, 0.0, leverage / gross)
+    w_y = w_y * scale
+    w_x = w_x * scale
+
+    port_ret_gross = w_y * ret_y + w_x * ret_x
+    turnover = np.abs(np.diff(w_y, prepend=0.0)) + np.abs(np.diff(w_x, prepend=0.0))
+    cost_rate = (fee_bps + slippage_bps) / 1e4
+    return port_ret_gross - turnover * cost_rate
+
+
+def basket_leg_weights(weights, spread_pos, leverage: float = 1.0) -> np.ndarray:
+    """
+    (bars x legs) capital weights for holding `spread_pos` units of the
+    basket spread sum_i weights[i] * leg_i, scaled to gross exposure
+    `leverage` (the N-leg form of w_y = pos, w_x = -beta * pos).
+    """
+    vec = np.asarray(weights, dtype=np.float64)
+    pos = np.asarray(spread_pos, dtype=np.float64)
+    w = pos[:, None] * vec[None, :]
+    gross = np.abs(w).sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(gross == 0.0, 0.0, leverage / gross)
+    return w * scale
+
+
+def backtest_basket(
+    prices: pd.DataFrame,
+    legs: list[str],
+    weights,
+    spread_pos: pd.Series,
+    fee_bps: float,
+    slippage_bps: float,
+    leverage: float = 1.0,
+    short_borrow_cost_bps: float = 0.0,
+    ann_factor: float = 252,
+) -> pd.DataFrame:
+    """
+    backtest_pairs for an N-leg basket with cointegrating vector `weights`
+    (e.g. JohansenBatch.weights(), first leg 1). Same cost, borrow and
+    scaling conventions; with legs [y, x] and weights [1, -beta] it
+    reproduces backtest_pairs. Columns: w_<leg> per leg, turnover,
+    ret_gross, costs, ret_net, equity.
+    """
+    px = prices[list(legs)].to_numpy(dtype=np.float64)
+    ret = np.zeros_like(px)
+    ret[1:] = px[1:] / px[:-1] - 1.0
+    ret = np.nan_to_num(ret, nan=0.0)
+
+    w = basket_leg_weights(weights, spread_pos.reindex(prices.index).to_numpy(), leverage)
+    port_ret_gross = (w * ret).sum(axis=1)
+    turnover = np.abs(np.diff(w, axis=0, prepend=0.0)).sum(axis=1)
+    costs = turnover * ((fee_bps + slippage_bps) / 1e4)
+    if short_borrow_cost_bps > 0:
+        short_notional = np.abs(np.clip(w, None, 0.0)).sum(axis=1)
+        costs = costs + short_notional * (short_borrow_cost_bps / 1e4 / ann_factor)
+
+    out = pd.DataFrame(w, index=prices.index, columns=[f"w_{leg}" for leg in legs])
+    out["turnover"] = turnover
+    out["ret_gross"] = port_ret_gross
+    out["costs"] = costs
+    out["ret_net"] = port_ret_gross - costs
+    out["equity"] = (1.0 + out["ret_net"]).cumprod()
+    return out
@@ -0,0 +1,108 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from sarb.features.spread import StreamingZScore
+from sarb.strategy.pairs import spread_states
+
+
+@dataclass
+class StreamingPairBacktest:
+    """
+    Fixed-hedge pair backtest over price blocks (e.g. from
+    sarb.data.intraday.iter_price_chunks), for series too long to hold in memory.
+
+    Each process() call returns the rows of
+        backtest_pairs(prices, ..., generate_spread_positions(rolling_zscore(spread)))
+    for that block, plus the z and pos columns. Only O(lookback_z) state is
+    carried between blocks: the spread tail, the signal state, last prices,
+    last leg weights and equity.
+    """
+
+    y: str
+    x: str
+    alpha: float
+    beta: float
+    lookback_z: int = 60
+    entry_z: float = 2.0
+    exit_z: float = 0.5
+    fee_bps: float = 1.0
+    slippage_bps: float = 0.5
+    leverage: float = 1.0
+    short_borrow_cost_bps: float = 0.0
+    ann_factor: float = 252
+
+    _z: StreamingZScore = field(init=False, repr=False)
+    _state: float = field(default=0.0, init=False, repr=False)
+    _last_px: np.ndarray | None = field(default=None, init=False, repr=False)
+    _last_w: np.ndarray | None = field(default=None, init=False, repr=False)
+    _equity: float = field(default=1.0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._z = StreamingZScore(self.lookback_z)
+
+    def process(self, prices: pd.DataFrame) -> pd.DataFrame:
+        px = prices[[self.y, self.x]].to_numpy(dtype=np.float64)
+        n = len(px)
+        py, pxx = px[:, 0], px[:, 1]
+
+        spread = py - (self.alpha + self.beta * pxx)
+        z = self._z.update(spread)
+        states = spread_states(z, self.entry_z, self.exit_z, initial=self._state)
+        pos = np.concatenate(([self._state], states[:-1])) if n else states
+        if n:
+            self._state = float(states[-1])
+
+        prev = np.vstack([self._last_px, px[:-1]]) if self._last_px is not None else np.vstack([px[:1], px[:-1]])
+        ret = px / prev[:n] - 1.0
+        ret[np.isnan(ret)] = 0.0
+
+        w_y = pos * 1.0
+        w_x = pos * (-self.beta)
+        gross = np.abs(w_y) + np.abs(w_x)
+        with np.errstate(divide="ignore"):
+            scale = np.where(gross == 0.0, 0.0, self.leverage / gross)
+        w_y = w_y * scale
+        w_x = w_x * scale
+
+        ret_gross = w_y * ret[:, 0] + w_x * ret[:, 1]
+
+        w = np.column_stack([w_y, w_x])
+        prev_w = np.zeros((1, 2)) if self._last_w is None else self._last_w[None, :]
+        dw = np.abs(np.diff(np.vstack([prev_w, w]), axis=0))
+        turnover = dw[:, 0] + dw[:, 1]
+
+        costs = turnover * ((self.fee_bps + self.slippage_bps) / 1e4)
+        if self.short_borrow_cost_bps > 0:
+            short_notional = np.abs(np.minimum(w_x, 0.0)) + np.abs(np.minimum(w_y, 0.0))
+            costs = costs + short_notional * (self.short_borrow_cost_bps / 1e4 / self.ann_factor)
+
+        ret_net = ret_gross - costs
+        equity = np.cumprod(np.concatenate(([self._equity], 1.0 + ret_net)))[1:]
+
+        if n:
+            self._last_px = px[-1].copy()
+            self._last_w = w[-1].copy()
+            self._equity = float(equity[-1])
+
+        return pd.DataFrame(
+            {
+                "z": z,
+                "pos": pos,
+                "w_y": w_y,
+                "w_x": w_x,
+                "turnover": turnover,
+                "ret_gross": ret_gross,
+                "costs": costs,
+                "ret_net": ret_net,
+                "equity": equity,
+            },
+            index=prices.index,
+        )
+
+    def run(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for chunk in chunks:
+            yield self.process(chunk)
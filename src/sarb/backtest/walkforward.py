@@ -1,10 +1,25 @@
 from __future__ import annotations
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
 import pandas as pd
 
-from sarb.features.spread import fit_hedge_ratio, compute_spread, rolling_zscore
-from sarb.strategy.pairs import generate_spread_positions
+from sarb.features.spread import HEDGE_METHODS, _hedge_from_moments, fit_hedge_ratio, compute_spread, rolling_zscore
+from sarb.strategy.pairs import generate_spread_positions, spread_states
 from sarb.backtest.engine import backtest_pairs
 
+WALKFORWARD_COLUMNS = [
+    "alpha", "beta", "z", "pos", "w_y", "w_x",
+    "turnover", "ret_gross", "costs", "ret_net", "equity",
+]
+
+
+def _check_hedge_method(method: str) -> None:
+    if method != "kalman" and method not in HEDGE_METHODS:
+        raise ValueError(f"Unknown hedge method: {method}")
+
 def walkforward_pairs_backtest(
     prices: pd.DataFrame,
     y: str,
@@ -24,8 +39,9 @@ def walkforward_pairs_backtest(
     compute spread/z, generate today's position from yesterday's z (no lookahead),
     then apply returns with costs.
 
-    hedge_method: "ols" (default) or "kalman"
+    hedge_method: "ols" (default), "tls" or "kalman"
     """
+    _check_hedge_method(hedge_method)
     px = prices[[y, x]].dropna().copy()
 
     pos = pd.Series(index=px.index, data=0.0)
@@ -55,10 +71,10 @@ def walkforward_pairs_backtest(
             p = generate_spread_positions(z, entry_z, exit_z)
             pos.iloc[i] = p.iloc[-1]
     else:
-        # OLS: refit alpha/beta on each rolling window
+        # OLS / TLS: refit alpha/beta on each rolling window
         for i in range(train_lookback, len(px)):
             train_slice = px.iloc[i - train_lookback : i]
-            alpha, beta = fit_hedge_ratio(train_slice[y], train_slice[x])
+            alpha, beta = fit_hedge_ratio(train_slice[y], train_slice[x], hedge_method)
 
             alpha_series.iloc[i] = alpha
             beta_series.iloc[i] = beta
@@ -79,7 +95,7 @@ def walkforward_pairs_backtest(
     w_y = pos * 1.0
     w_x = pos * (-beta_series)
 
-    gross = (w_y.abs() + w_x.abs()).replace(0.0, pd.NA)
+    gross = (w_y.abs() + w_x.abs()).replace(0.0, np.nan)
     scale = (leverage / gross).fillna(0.0)
     w_y = w_y * scale
     w_x = w_x * scale
@@ -111,3 +127,230 @@ def walkforward_pairs_backtest(
     )
     out["equity"] = (1.0 + out["ret_net"]).cumprod()
     return out
+
+
+def _z_under_beta(hist: np.ndarray, lo: int, hi: int, beta: float) -> np.ndarray:
+    """
+    Rolling z-score of y - alpha - beta*x on rows [lo, hi) from per-row rolling
+    moments (u=y-mean_y, v=x-mean_x, var_y, cov_xy, var_x); alpha cancels, so
+    the whole history can be re-scored under any beta without the prices.
+    """
+    h = hist[lo:hi]
+    var = h[:, 2] - 2.0 * beta * h[:, 3] + beta * beta * h[:, 4]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (h[:, 0] - beta * h[:, 1]) / np.sqrt(np.maximum(var, 0.0))
+
+
+def _states_before(
+    hist: np.ndarray,
+    rows: np.ndarray,
+    betas: np.ndarray,
+    entry_z: float,
+    exit_z: float,
+    max_cells: int = 1 << 20,
+) -> np.ndarray:
+    """
+    Hysteresis state after z[0..i-1] under betas[j], for every i = rows[j]:
+    the position the in-memory walk-forward takes on day i. With disjoint
+    bands only the bars since the last exit matter, so each row scans
+    backwards in doubling windows; all rows of a block are scanned together
+    as a (rows x width) gather, in batches of at most max_cells cells.
+
+    Cost is O(sum of each row's distance back to its last exit), i.e.
+    O(n * typical holding period) for a mean-reverting spread, degrading
+    towards O(n^2) when the spread trends and rarely exits.
+    """
+    rows = np.asarray(rows, dtype=np.intp)
+    betas = np.asarray(betas, dtype=np.float64)
+    out = np.zeros(len(rows))
+    if entry_z <= exit_z:
+        # overlapping bands: no exit resets the machine, replay everything
+        for j, (i, b) in enumerate(zip(rows.tolist(), betas.tolist())):
+            if i > 0:
+                out[j] = spread_states(_z_under_beta(hist, 0, i, b), entry_z, exit_z)[-1]
+        return out
+
+    todo = np.flatnonzero(rows > 0)
+    width = 64
+    while len(todo):
+        left = []
+        for part in np.array_split(todo, -(-len(todo) * width // max_cells)):
+            i = rows[part]
+            b = betas[part][:, None]
+            at = i[:, None] - width + np.arange(width)      # rows [i - width, i)
+            valid = at >= 0
+            h = hist[np.where(valid, at, 0)]
+            var = h[..., 2] - 2.0 * b * h[..., 3] + b * b * h[..., 4]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                z = (h[..., 0] - b * h[..., 1]) / np.sqrt(np.maximum(var, 0.0))
+            z[~valid] = np.nan
+
+            exits = np.abs(z) <= exit_z
+            has_exit = exits.any(axis=1)
+            done = has_exit | (i - width <= 0)
+            last_exit = np.where(has_exit, width - 1 - np.argmax(exits[:, ::-1], axis=1), -1)
+            entries = ((z <= -entry_z) | (z >= entry_z)) & (np.arange(width) > last_exit[:, None])
+            first = np.argmax(entries, axis=1)
+            state = np.where(z[np.arange(len(part)), first] <= -entry_z, 1.0, -1.0)
+            out[part[done]] = np.where(entries.any(axis=1), state, 0.0)[done]
+            left.append(part[~done])
+        todo = np.concatenate(left)
+        width *= 2
+    return out
+
+
+def walkforward_pairs_backtest_chunked(
+    prices: pd.DataFrame | Iterable[pd.DataFrame],
+    y: str,
+    x: str,
+    train_lookback: int,
+    z_lookback: int,
+    entry_z: float,
+    exit_z: float,
+    fee_bps: float,
+    slippage_bps: float,
+    out_path: str | Path,
+    leverage: float = 1.0,
+    hedge_method: str = "ols",
+    chunk_size: int = 250_000,
+) -> Path:
+    """
+    Out-of-core walkforward_pairs_backtest: same columns and values (up to
+    float rounding in the rolling fits), written block by block to a column
+    store at out_path (see sarb.data.columnar.read_column_store).
+
+    prices: a DataFrame (split into chunk_size blocks) or an iterable of
+    time-ordered blocks, e.g. sarb.data.intraday.iter_price_chunks.
+
+    Carried between blocks: the last max(train_lookback, z_lookback-1) prices,
+    Kalman state, last beta/prices/weights and equity. The in-memory engine
+    re-scores the whole spread history under each day's beta, so a day's
+    position can depend on bars far behind the carried prices (back to the
+    last exit under that beta). To reproduce it exactly, five rolling moments
+    per bar (40 bytes) go to a memory-mapped scratch file on disk, deleted on
+    return; RAM stays bounded by the block size.
+
+    Each block is scored in array passes (see _states_before): the cost is
+    O(n * typical holding period) for a mean-reverting spread and tends to
+    O(n^2) for a spread that trends and rarely exits.
+    """
+    from sarb.data.columnar import ColumnStoreWriter
+    from sarb.features.kalman import KalmanConfig, kalman_filter_arrays
+
+    _check_hedge_method(hedge_method)
+
+    if isinstance(prices, pd.DataFrame):
+        frame = prices
+        prices = (frame.iloc[i : i + chunk_size] for i in range(0, len(frame), chunk_size))
+
+    keep = max(train_lookback, z_lookback - 1)
+    kcfg = KalmanConfig()
+    theta = np.array([kcfg.initial_alpha, kcfg.initial_beta])
+    P = np.eye(2)
+
+    carry = None
+    n_seen = 0
+    last_beta = np.nan
+    last_px = None
+    last_w = np.zeros(2)
+    equity = 1.0
+    cost_rate = (fee_bps + slippage_bps) / 1e4
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=out_path.parent) as scratch, \
+            ColumnStoreWriter(out_path, WALKFORWARD_COLUMNS) as writer:
+        hist_path = Path(scratch) / "zmoments.f8"
+        hist_file = open(hist_path, "ab")
+        try:
+            for chunk in prices:
+                chunk = chunk[[y, x]].dropna()
+                n = len(chunk)
+                if n == 0:
+                    continue
+                buf = chunk if carry is None else pd.concat([carry, chunk])
+                m = len(buf) - n
+                ys, xs = buf[y], buf[x]
+
+                if hedge_method == "kalman":
+                    alpha, beta, _, theta, P = kalman_filter_arrays(
+                        chunk[y].to_numpy(np.float64), chunk[x].to_numpy(np.float64), theta, P, kcfg
+                    )
+                else:
+                    # rolling OLS / TLS from rolling moments (ddof=0 rescales all
+                    # three sums alike, which neither estimator depends on)
+                    ry, rx = ys.rolling(train_lookback), xs.rolling(train_lookback)
+                    a_fit, b_fit = _hedge_from_moments(
+                        rx.mean().to_numpy(), ry.mean().to_numpy(), rx.var(ddof=0).to_numpy(),
+                        ry.cov(xs, ddof=0).to_numpy(), ry.var(ddof=0).to_numpy(), hedge_method,
+                    )
+                    # the fit for day i uses the window ending on day i-1
+                    alpha = np.concatenate(([np.nan], a_fit[:-1]))[m:]
+                    beta = np.concatenate(([np.nan], b_fit[:-1]))[m:]
+
+                ry, rx = ys.rolling(z_lookback), xs.rolling(z_lookback)
+                hist_rows = np.column_stack([
+                    (ys - ry.mean()).to_numpy()[m:],
+                    (xs - rx.mean()).to_numpy()[m:],
+                    ry.var(ddof=0).to_numpy()[m:],
+                    ys.rolling(z_lookback).cov(xs, ddof=0).to_numpy()[m:],
+                    rx.var(ddof=0).to_numpy()[m:],
+                ]).astype("<f8")
+                hist_file.write(hist_rows.tobytes())
+                hist_file.flush()
+                hist = np.memmap(hist_path, dtype="<f8", mode="r", shape=(n_seen + n, 5))
+
+                pos = np.zeros(n)
+                z = np.full(n, np.nan)
+                k = np.flatnonzero((n_seen + np.arange(n) >= train_lookback) & ~np.isnan(beta))
+                if len(k):
+                    h = hist[n_seen + k]
+                    b = beta[k]
+                    var = h[:, 2] - 2.0 * b * h[:, 3] + b * b * h[:, 4]
+                    with np.errstate(divide="ignore", invalid="ignore"):
+                        z[k] = (h[:, 0] - b * h[:, 1]) / np.sqrt(np.maximum(var, 0.0))
+                    pos[k] = _states_before(hist, n_seen + k, b, entry_z, exit_z)
+                del hist
+
+                beta_f = pd.Series(np.concatenate(([last_beta], beta))).ffill().fillna(0.0).to_numpy()[1:]
+                last_beta = beta_f[-1]
+
+                px = chunk.to_numpy(np.float64)
+                prev = np.vstack([px[:1] if last_px is None else last_px[None, :], px[:-1]])
+                ret = px / prev - 1.0
+                ret[np.isnan(ret)] = 0.0
+
+                w_y = pos * 1.0
+                w_x = pos * (-beta_f)
+                gross = np.abs(w_y) + np.abs(w_x)
+                with np.errstate(divide="ignore"):
+                    scale = np.where(gross == 0.0, 0.0, leverage / gross)
+                w_y = w_y * scale
+                w_x = w_x * scale
+
+                ret_gross = w_y * ret[:, 0] + w_x * ret[:, 1]
+                w = np.column_stack([w_y, w_x])
+                dw = np.abs(np.diff(np.vstack([last_w, w]), axis=0))
+                turnover = dw[:, 0] + dw[:, 1]
+                costs = turnover * cost_rate
+                ret_net = ret_gross - costs
+                eq = np.cumprod(np.concatenate(([equity], 1.0 + ret_net)))[1:]
+
+                writer.append(pd.DataFrame(
+                    {
+                        "alpha": alpha, "beta": beta_f, "z": z, "pos": pos,
+                        "w_y": w_y, "w_x": w_x, "turnover": turnover,
+                        "ret_gross": ret_gross, "costs": costs, "ret_net": ret_net,
+                        "equity": eq,
+                    },
+                    index=chunk.index,
+                ))
+
+                carry = buf.iloc[-keep:] if keep > 0 else buf.iloc[:0]
+                last_px = px[-1]
+                last_w = w[-1]
+                equity = float(eq[-1])
+                n_seen += n
+        finally:
+            hist_file.close()
+    return out_path
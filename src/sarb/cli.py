@@ -0,0 +1,478 @@
+"""
+`sarb` command line: one reproducible entry point for the batch jobs.
+
+    sarb ingest      -c configs/example.toml     # download into the local price store
+    sarb scan        -c configs/example.toml     # train/val/test pair scan
+    sarb walkforward -c configs/example.toml     # quarterly walk-forward portfolio(s)
+    sarb sweep       -c configs/example.toml     # grid over walk-forward settings
+    sarb replay      -c configs/example.toml     # paper-trading replay of the live loop
+    sarb report      -c configs/example.toml     # per-pair walk-forward reports + figures
+
+Every command reads its settings from the config file (TOML or JSON) and,
+except ingest, its prices from the local store. Shared options:
+
+    --jobs N        worker processes for independent units of work (0 = all CPUs)
+    --cache-dir D   reuse results keyed by config + store contents
+    --profile       cProfile the run; stats written to <out>/<command>.prof.
+                    replay also records per-stage live latencies
+                    (LatencyRecorder) to <out>/replay_latency.csv
+"""
+from __future__ import annotations
+import argparse
+import cProfile
+import hashlib
+import json
+import os
+import pickle
+import pstats
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import asdict, fields
+from itertools import product
+from pathlib import Path
+
+import pandas as pd
+
+from sarb.data.store import PriceStore
+
+COMMANDS = ("ingest", "scan", "walkforward", "sweep", "replay", "report")
+
+
+# ---------------------------------------------------------------------------
+# config
+# ---------------------------------------------------------------------------
+
+def load_config(path: str | Path) -> dict:
+    """Read a TOML (Python 3.11+) or JSON config file into a dict."""
+    path = Path(path)
+    if path.suffix == ".json":
+        return json.loads(path.read_text())
+    try:
+        import tomllib
+    except ImportError as e:  # Python 3.10
+        raise ImportError("TOML configs need Python 3.11+; use a .json config instead") from e
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def _build(cls, section: dict):
+    """Instantiate dataclass `cls` from a config section, rejecting unknown keys."""
+    unknown = set(section) - {f.name for f in fields(cls)}
+    if unknown:
+        raise ValueError(f"unknown {cls.__name__} settings: {sorted(unknown)}")
+    return cls(**section)
+
+
+def wf_config(section: dict):
+    """WFConfig from a config section; a risk_limits table becomes RiskLimits."""
+    from sarb.research.walkforward_portfolio import WFConfig
+    from sarb.risk.limits import RiskLimits
+
+    section = dict(section)
+    if isinstance(section.get("risk_limits"), dict):
+        section["risk_limits"] = _build(RiskLimits, section["risk_limits"])
+    return _build(WFConfig, section)
+
+
+_WINDOW_KEYS = ("train_days", "val_days", "freq")
+
+
+def _split_window_keys(section: dict) -> tuple[dict, dict]:
+    window = {k: section[k] for k in _WINDOW_KEYS if k in section}
+    rest = {k: v for k, v in section.items() if k not in _WINDOW_KEYS and k != "variants"}
+    return window, rest
+
+
+# ---------------------------------------------------------------------------
+# cache / parallelism
+# ---------------------------------------------------------------------------
+
+class ResultCache:
+    """
+    Pickle cache under `root` keyed by a JSON-able description of the inputs
+    (config, tickers, store fingerprint). root=None disables caching.
+    """
+
+    def __init__(self, root: str | Path | None):
+        self.root = None if root is None else Path(root)
+        if self.root is not None:
+            self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, name: str, key) -> Path:
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()[:20]
+        return self.root / f"{name}-{digest}.pkl"
+
+    def get(self, name: str, key):
+        if self.root is None:
+            return None
+        path = self._path(name, key)
+        if not path.exists():
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def put(self, name: str, key, value) -> None:
+        if self.root is None:
+            return
+        path = self._path(name, key)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def get_or_compute(self, name: str, key, compute):
+        value = self.get(name, key)
+        if value is None:
+            value = compute()
+            self.put(name, key, value)
+        return value
+
+
+def _jobs(n: int) -> int:
+    """--jobs to a worker count; 0 means all CPUs, as in the library APIs."""
+    return n if n > 0 else (os.cpu_count() or 1)
+
+
+def _run_tasks(fn, tasks: list, jobs: int) -> list:
+    """fn over tasks in order, in a process pool when jobs > 1."""
+    if jobs <= 1 or len(tasks) <= 1:
+        return [fn(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        return list(pool.map(fn, tasks))
+
+
+# ---------------------------------------------------------------------------
+# shared helpers
+# ---------------------------------------------------------------------------
+
+def _data_section(cfg: dict, args) -> dict:
+    data = dict(cfg.get("data", {}))
+    if args.store is not None:
+        data["store"] = args.store
+    data.setdefault("store", "data")
+    data.setdefault("field", "Adj Close")
+    data.setdefault("bar_freq", "1D")
+    return data
+
+
+def _load_prices(data: dict, tickers: list[str] | None = None) -> pd.DataFrame:
+    """Store prices for the universe, keeping tickers with full history (as the scripts did)."""
+    store = PriceStore(data["store"])
+    tickers = tickers or data.get("tickers") or store.tickers
+    prices = store.read(tickers, data.get("start"), data.get("end"), mmap=False)
+    return prices.dropna(axis=1, how="any")
+
+
+def _store_key(data: dict, prices: pd.DataFrame) -> dict:
+    return {
+        "store": PriceStore(data["store"]).fingerprint(),
+        "tickers": list(prices.columns),
+        "start": data.get("start"),
+        "end": data.get("end"),
+    }
+
+
+def _summary_row(port: pd.DataFrame, bar_freq: str = "1D") -> dict:
+    from sarb.config import periods_per_year
+    from sarb.metrics.performance import cagr, max_drawdown, sharpe
+
+    ann_factor = periods_per_year(bar_freq)
+    return {
+        "sharpe": sharpe(port["ret_net"], ann_factor),
+        "max_drawdown": max_drawdown(port["equity"]),
+        "cagr": cagr(port["equity"], ann_factor),
+    }
+
+
+def _portfolio_task(task: tuple) -> list[tuple[pd.DataFrame, pd.DataFrame]]:
+    from sarb.data.shared import SharedPriceHandle
+    from sarb.research.context import ResearchData
+    from sarb.research.walkforward_portfolio import walkforward_quarterly_portfolio_multi
+
+    prices, tickers, windows, cfgs = task
+    if isinstance(prices, SharedPriceHandle):
+        prices = ResearchData.from_arrays(*prices.open())
+    return walkforward_quarterly_portfolio_multi(prices, tickers, windows, cfgs)
+
+
+def run_portfolios(
+    prices: pd.DataFrame,
+    cfgs: list,
+    window: dict,
+    jobs: int = 1,
+    cache: ResultCache | None = None,
+    cache_key: dict | None = None,
+) -> list[tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Walk-forward portfolios for many WFConfigs. Configs sharing selection and
+    signal settings run together (walkforward_quarterly_portfolio_multi);
+    the independent groups are spread over `jobs` processes. With a cache,
+    each config's (port, meta) is looked up first and only misses are run.
+    """
+    from sarb.data.shared import SharedPriceMatrix
+    from sarb.research.walkforward_portfolio import _signal_key
+    from sarb.split.rebalance import plan_rolling_windows
+
+    cache = cache or ResultCache(None)
+    tickers = list(prices.columns)
+    keys = [{**(cache_key or {}), "window": window, "cfg": asdict(c)} for c in cfgs]
+    results = [cache.get("walkforward", k) for k in keys]
+
+    groups: dict[tuple, list[int]] = {}
+    for i, c in enumerate(cfgs):
+        if results[i] is None:
+            groups.setdefault(_signal_key(c), []).append(i)
+    if groups:
+        windows = plan_rolling_windows(prices.index, **window)
+        members = list(groups.values())
+        parallel = jobs > 1 and len(members) > 1
+        # workers map one shared copy of the prices instead of unpickling their own
+        with SharedPriceMatrix(prices) if parallel else nullcontext() as shared:
+            source = shared.handle if parallel else prices
+            tasks = [(source, tickers, windows, [cfgs[i] for i in idx]) for idx in members]
+            outputs = _run_tasks(_portfolio_task, tasks, jobs)
+        for idx, out in zip(members, outputs):
+            for i, res in zip(idx, out):
+                results[i] = res
+                cache.put("walkforward", keys[i], res)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# commands
+# ---------------------------------------------------------------------------
+
+def cmd_ingest(cfg: dict, args) -> None:
+    """Download (or read CSVs for) the configured universe into the price store."""
+    from sarb.data.ingest import load_csv_prices, load_yfinance_prices
+
+    data = _data_section(cfg, args)
+    if "csv" in data:
+        prices = load_csv_prices(data["csv"], price_col=data["field"])
+    else:
+        prices = load_yfinance_prices(data["tickers"], data["start"], data["end"], field=data["field"])
+    path = PriceStore(data["store"]).write(prices)
+    print(f"Stored {len(prices)} rows x {prices.shape[1]} tickers in {path}")
+
+
+_SCAN_DEFAULTS = {"lookback_z": 60, "entry_z": 2.0, "exit_z": 0.5, "fee_bps": 1.0, "slippage_bps": 0.5}
+
+
+def _scan(prices: pd.DataFrame, params: dict) -> list:
+    from sarb.research.select_pairs import scan_pairs
+    from sarb.split.time_split import time_train_val_test_split
+
+    params = {**_SCAN_DEFAULTS, **params}
+    train_frac = params.pop("train_frac", 0.6)
+    val_frac = params.pop("val_frac", 0.2)
+    train_px, val_px, _ = time_train_val_test_split(prices, train_frac=train_frac, val_frac=val_frac)
+    return scan_pairs(
+        prices=prices, tickers=list(prices.columns),
+        train_idx=train_px.index, val_idx=val_px.index, **params,
+    )
+
+
+def cmd_scan(cfg: dict, args) -> None:
+    """Select pairs on train/val with FDR control; writes scan.csv."""
+    data = _data_section(cfg, args)
+    prices = _load_prices(data)
+    params = cfg.get("scan", {})
+    selected = ResultCache(args.cache_dir).get_or_compute(
+        "scan", {**_store_key(data, prices), "scan": params}, lambda: _scan(prices, params),
+    )
+    rows = [asdict(r) for r in selected]
+    _write_csv(pd.DataFrame(rows), args.out, "scan.csv")
+    if not rows:
+        print("No pairs selected. Try lowering corr_threshold or expanding tickers.")
+    for r in selected:
+        print(f"{r.y}/{r.x} | valSharpe={r.val_sharpe:.2f} | ADFp={r.adf_p:.4f} | HL={r.half_life:.1f} | corr={r.corr:.2f}")
+
+
+def _walkforward_configs(section: dict, bar_freq: str = "1D") -> tuple[dict, dict, dict]:
+    """
+    (window settings, base WFConfig fields, {variant name: fields}) of a
+    [walkforward] table; windows are counted in bars of data.bar_freq.
+    """
+    from sarb.config import bars_per_day
+
+    window, base = _split_window_keys(section)
+    window["bars_per_day"] = bars_per_day(bar_freq)
+    base = {"bar_freq": bar_freq, **base}
+    variants = section.get("variants") or {"base": {}}
+    return window, base, {name: {**base, **over} for name, over in variants.items()}
+
+
+def cmd_walkforward(cfg: dict, args) -> None:
+    """Quarterly walk-forward portfolio for each configured variant."""
+    data = _data_section(cfg, args)
+    prices = _load_prices(data)
+    window, _, variants = _walkforward_configs(cfg.get("walkforward", {}), data["bar_freq"])
+    names = list(variants)
+    results = run_portfolios(
+        prices, [wf_config(variants[n]) for n in names], window,
+        jobs=_jobs(args.jobs), cache=ResultCache(args.cache_dir), cache_key=_store_key(data, prices),
+    )
+    rows = []
+    for name, (port, meta) in zip(names, results):
+        _write_csv(port, args.out, f"walkforward_{name}.csv", index=True)
+        _write_csv(meta, args.out, f"walkforward_{name}_meta.csv")
+        rows.append({"variant": name, **_summary_row(port, data["bar_freq"])})
+    summary = pd.DataFrame(rows)
+    _write_csv(summary, args.out, "walkforward_summary.csv")
+    print(summary.to_string(index=False))
+
+
+def sweep_grid(grid: dict) -> list[dict]:
+    """Cartesian product of {field: [values]} as a list of override dicts (first key slowest)."""
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in product(*(grid[k] for k in keys))]
+
+
+def cmd_sweep(cfg: dict, args) -> None:
+    """Walk-forward portfolio over a grid of settings; writes sweep.csv."""
+    data = _data_section(cfg, args)
+    prices = _load_prices(data)
+    window, base, _ = _walkforward_configs(cfg.get("walkforward", {}), data["bar_freq"])
+    combos = sweep_grid(cfg.get("sweep", {}).get("grid", {}))
+    results = run_portfolios(
+        prices, [wf_config({**base, **c}) for c in combos], window,
+        jobs=_jobs(args.jobs), cache=ResultCache(args.cache_dir), cache_key=_store_key(data, prices),
+    )
+    summary = pd.DataFrame([{**c, **_summary_row(port, data["bar_freq"])} for c, (port, _meta) in zip(combos, results)])
+    _write_csv(summary, args.out, "sweep.csv")
+    print(summary.to_string(index=False))
+
+
+def cmd_replay(cfg: dict, args) -> None:
+    """Replay the live loop over stored history with the paper broker."""
+    from sarb.live.array_broker import ArrayPaperBroker
+    from sarb.live.latency import LatencyRecorder
+    from sarb.live.replay import replay_live
+    from sarb.live.runner import LiveConfig
+    from sarb.risk.limits import RiskLimits
+
+    data = _data_section(cfg, args)
+    section = dict(cfg.get("replay", {}))
+    broker_kw = {k: section.pop(k) for k in ("initial_capital", "fee_bps", "slippage_bps") if k in section}
+    section["pairs"] = [tuple(p) for p in section.get("pairs", [])]
+    if isinstance(section.get("risk_limits"), dict):
+        section["risk_limits"] = _build(RiskLimits, section["risk_limits"])
+    config = _build(LiveConfig, section)
+
+    prices = _load_prices(data, sorted({t for p in config.pairs for t in p})).dropna()
+    broker = ArrayPaperBroker(**broker_kw)
+    recorder = LatencyRecorder() if args.profile else None
+    report = replay_live(prices, config, broker, recorder=recorder)
+    _write_csv(report.account_value.rename("account_value").to_frame(), args.out, "replay_account.csv", index=True)
+    _write_csv(report.signals, args.out, "replay_signals.csv")
+    print(report.summary())
+    if recorder is not None:
+        _write_csv(recorder.snapshot(), args.out, "replay_latency.csv")
+        print(f"Latency: {recorder.log_line()}", file=sys.stderr)
+    print(f"Final account value: ${broker.get_account_value():,.2f}")
+
+
+def _report_task(task: tuple):
+    from sarb.backtest.walkforward import walkforward_pairs_backtest
+
+    pair_prices, y, x, params = task
+    return walkforward_pairs_backtest(prices=pair_prices.dropna(), y=y, x=x, **params)
+
+
+def cmd_report(cfg: dict, args) -> None:
+    """Walk-forward backtest and figures for each configured pair."""
+    from sarb.features.spread import compute_spread
+    from sarb.viz.report import PairReport, save_backtest_reports
+
+    data = _data_section(cfg, args)
+    section = dict(cfg.get("report", {}))
+    pairs = [tuple(p) for p in section.pop("pairs", [])]
+    downsample = section.pop("downsample", "minmax")
+    params = {
+        "train_lookback": 504, "z_lookback": 60, "entry_z": 2.0, "exit_z": 0.5,
+        "fee_bps": 1.0, "slippage_bps": 0.5, **section,
+    }
+    prices = _load_prices(data, sorted({t for p in pairs for t in p}))
+    cache = ResultCache(args.cache_dir)
+    key = {**_store_key(data, prices), "report": params}
+
+    bts = {p: cache.get("report", {**key, "pair": p}) for p in pairs}
+    todo = [p for p, bt in bts.items() if bt is None]
+    # each task carries only its pair's two columns, not the whole universe
+    tasks = [(prices[list(p)], *p, params) for p in todo]
+    for p, bt in zip(todo, _run_tasks(_report_task, tasks, _jobs(args.jobs))):
+        bts[p] = bt
+        cache.put("report", {**key, "pair": p}, bt)
+
+    items, rows = [], []
+    for (y, x), bt in bts.items():
+        bt = bt.dropna(subset=["z"])
+        spread = compute_spread(prices.loc[bt.index, y], prices.loc[bt.index, x], bt["alpha"], bt["beta"])
+        items.append(PairReport(f"{y}_{x}", bt, spread, bt["z"], params["entry_z"], params["exit_z"]))
+        rows.append({"pair": f"{y}/{x}", **_summary_row(bt, data["bar_freq"])})
+
+    saved = save_backtest_reports(items, Path(args.out) / "figures", jobs=_jobs(args.jobs), downsample=downsample)
+    summary = pd.DataFrame(rows)
+    _write_csv(summary, args.out, "report_summary.csv")
+    print(summary.to_string(index=False))
+    print(f"Figures saved: {sum(len(v) for v in saved.values())} in {Path(args.out) / 'figures'}")
+
+
+def _write_csv(df: pd.DataFrame, out: str | Path, name: str, index: bool = False) -> Path:
+    path = Path(out) / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=index)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# entry point
+# ---------------------------------------------------------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-c", "--config", default="sarb.toml", help="TOML or JSON config file")
+    common.add_argument("--store", default=None, help="price store directory (overrides data.store)")
+    common.add_argument("--out", default="reports", help="output directory")
+    common.add_argument("--jobs", type=int, default=1, help="worker processes (0 = all CPUs)")
+    common.add_argument("--cache-dir", default=None, help="reuse results cached in this directory")
+    common.add_argument("--profile", action="store_true", help="write cProfile stats to <out>/<command>.prof (replay: also live stage latencies)")
+
+    parser = argparse.ArgumentParser(prog="sarb", description="Statistical arbitrage research pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in COMMANDS:
+        doc = (globals()[f"cmd_{name}"].__doc__ or "").strip()
+        sub.add_parser(name, parents=[common], help=doc or None)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if Path(args.config).exists():
+        cfg = load_config(args.config)
+    elif args.config == parser.get_default("config"):
+        cfg = {}
+    else:
+        parser.error(f"config file not found: {args.config}")
+    command = globals()[f"cmd_{args.command}"]
+
+    t0 = time.perf_counter()
+    if not args.profile:
+        command(cfg, args)
+    else:
+        prof = cProfile.Profile()
+        prof.runcall(command, cfg, args)
+        path = Path(args.out) / f"{args.command}.prof"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(path)
+        pstats.Stats(prof, stream=sys.stderr).sort_stats("cumulative").print_stats(20)
+        print(f"Profile written to {path}", file=sys.stderr)
+    print(f"[{args.command}] done in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
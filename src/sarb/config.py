@@ -1,5 +1,26 @@
 from dataclasses import dataclass
 
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+SESSION_MINUTES = 390  # regular US equity session, 09:30-16:00
+
+
+def bars_per_day(bar_freq: str = "1D", session_minutes: int = SESSION_MINUTES) -> float:
+    """Bars in one trading session for a pandas-style frequency ("1D", "1h", "5min")."""
+    minutes = pd.to_timedelta(bar_freq).total_seconds() / 60.0
+    if minutes <= 0:
+        raise ValueError(f"bar_freq must be positive, got {bar_freq!r}")
+    if minutes >= 24 * 60:
+        return 1.0 / (minutes / (24 * 60))
+    return session_minutes / minutes
+
+
+def periods_per_year(bar_freq: str = "1D", session_minutes: int = SESSION_MINUTES) -> float:
+    """Annualization factor for returns sampled at `bar_freq`."""
+    return TRADING_DAYS_PER_YEAR * bars_per_day(bar_freq, session_minutes)
+
+
 @dataclass(frozen=True)
 class PairConfig:
     y_ticker: str = "KO"
@@ -18,3 +39,9 @@ class PairConfig:
     fee_bps: float = 1.0        # per trade leg (bps of notional)
     slippage_bps: float = 0.5   # per trade leg
     leverage: float = 1.0       # gross leverage target
+
+    bar_freq: str = "1D"        # sampling of the price index; drives annualization
+
+    @property
+    def ann_factor(self) -> float:
+        return periods_per_year(self.bar_freq)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+import json
+import shutil
+import struct
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+_INDEX = "__index__"
+_HEADER_LEN = 128  # fixed .npy v1.0 header size so the shape can be patched in place
+
+
+def _npy_header(n_rows: int, descr: str = "<f8") -> bytes:
+    meta = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (descr, n_rows)
+    body_len = _HEADER_LEN - 10
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", body_len) + meta.ljust(body_len - 1).encode() + b"\n"
+
+
+class ColumnStoreWriter:
+    """
+    Append-only on-disk column store: a directory with one float64 .npy file
+    per column plus the datetime index (int64 ns since epoch, UTC). Rows
+    are appended block by block, so a frame of any length can be written
+    without holding it; read_column_store maps the result back lazily.
+    """
+
+    def __init__(self, path: str | Path, columns: list[str], overwrite: bool = True):
+        self.path = Path(path)
+        if self.path.exists():
+            if not overwrite:
+                raise FileExistsError(self.path)
+            shutil.rmtree(self.path)
+        self.path.mkdir(parents=True)
+        self.columns = list(columns)
+        self.n_rows = 0
+        self._tz = None
+        self._files = {}
+        self._descr = {_INDEX: "<i8", **{col: "<f8" for col in self.columns}}
+        for col in self._descr:
+            f = open(self.path / f"{len(self._files)}.npy", "wb")
+            f.write(_npy_header(0, self._descr[col]))
+            self._files[col] = f
+
+    def append(self, frame: pd.DataFrame) -> None:
+        idx = pd.DatetimeIndex(frame.index)
+        if idx.tz is not None:
+            self._tz = str(idx.tz)
+        self._files[_INDEX].write(idx.as_unit("ns").asi8.astype("<i8").tobytes())
+        for col in self.columns:
+            self._files[col].write(frame[col].to_numpy(dtype="<f8").tobytes())
+        self.n_rows += len(frame)
+
+    def close(self) -> Path:
+        for col, f in self._files.items():
+            f.seek(0)
+            f.write(_npy_header(self.n_rows, self._descr[col]))
+            f.close()
+        meta = {"columns": self.columns, "n_rows": self.n_rows, "tz": self._tz}
+        (self.path / "meta.json").write_text(json.dumps(meta))
+        return self.path
+
+    def __enter__(self) -> "ColumnStoreWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_column_store(path: str | Path, columns: list[str] | None = None, mmap: bool = True) -> pd.DataFrame:
+    """Load (optionally a subset of) a ColumnStoreWriter directory as a DataFrame."""
+    path = Path(path)
+    meta = json.loads((path / "meta.json").read_text())
+    mode = "r" if mmap else None
+    names = meta["columns"]
+    wanted = names if columns is None else list(columns)
+
+    index = pd.to_datetime(np.asarray(np.load(path / "0.npy", mmap_mode=mode)))
+    if meta["tz"] is not None:
+        index = index.tz_localize("UTC").tz_convert(meta["tz"])
+    data = {col: np.load(path / f"{names.index(col) + 1}.npy", mmap_mode=mode) for col in wanted}
+    return pd.DataFrame(data, index=index)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 import pandas as pd
-import yfinance as yf
 
 def load_yfinance_prices(tickers: list[str], start: str, end: str, field: str = "Adj Close") -> pd.DataFrame:
+    import yfinance as yf  # heavy (network stack); only needed for downloads
+
     df = yf.download(tickers, start=start, end=end, auto_adjust=False, progress=False)
     if isinstance(df.columns, pd.MultiIndex):
         px = df[field].copy()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+def _read_table(path: str | Path, columns: list[str] | None = None) -> pd.DataFrame:
+    if str(path).endswith((".parquet", ".pq")):
+        # needs pyarrow or fastparquet; pandas raises an ImportError naming them
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def resample_prices(prices: pd.DataFrame, bar_freq: str) -> pd.DataFrame:
+    """Last price per bar for each column; bars with no prints at all are dropped."""
+    return prices.resample(bar_freq, label="left", closed="left").last().dropna(how="all")
+
+
+def load_intraday_prices(
+    path_by_ticker: dict[str, str],
+    timestamp_col: str = "timestamp",
+    price_col: str = "close",
+    bar_freq: str | None = None,
+    tz: str | None = None,
+) -> pd.DataFrame:
+    """
+    Intraday analogue of load_csv_prices: one CSV or Parquet file per ticker
+    (format picked from the suffix), aligned on timestamp. With bar_freq the
+    prints are resampled to the last price per bar before aligning; tz converts
+    tz-aware timestamps (or localizes naive ones) to the given zone.
+    """
+    frames = []
+    for tkr, path in path_by_ticker.items():
+        df = _read_table(path, columns=[timestamp_col, price_col])
+        ts = pd.to_datetime(df[timestamp_col])
+        if tz is not None:
+            ts = ts.dt.tz_convert(tz) if ts.dt.tz is not None else ts.dt.tz_localize(tz)
+        s = pd.Series(df[price_col].to_numpy(dtype=np.float64), index=pd.DatetimeIndex(ts), name=tkr)
+        s = s.sort_index()
+        s = s[~s.index.duplicated(keep="last")]
+        if bar_freq is not None:
+            s = resample_prices(s.to_frame(), bar_freq)[tkr]
+        frames.append(s)
+    px = pd.concat(frames, axis=1).sort_index()
+    px = px.ffill().dropna()
+    return px
+
+
+def iter_price_chunks(
+    path: str | Path,
+    timestamp_col: str = "timestamp",
+    columns: list[str] | None = None,
+    chunksize: int = 1_000_000,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a wide price file (timestamp + one column per ticker) in row blocks
+    indexed by timestamp, without loading it whole. Parquet is read batch by
+    batch through pyarrow; CSV through pandas' chunked reader.
+    """
+    usecols = None if columns is None else [timestamp_col, *columns]
+    if str(path).endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+
+        batches = (
+            b.to_pandas()
+            for b in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=usecols)
+        )
+    else:
+        batches = pd.read_csv(path, usecols=usecols, chunksize=chunksize)
+    for df in batches:
+        df = df.set_index(pd.DatetimeIndex(pd.to_datetime(df[timestamp_col]), name=timestamp_col))
+        yield df.drop(columns=timestamp_col).astype(np.float64)
+
+
+@dataclass
+class StreamingBarResampler:
+    """
+    Incremental tick -> OHLCV bar aggregation for a single instrument.
+
+    Feed time-ordered ticks in blocks of any size with update(); each call
+    returns the bars completed by that block and keeps the still-open bar, so
+    memory is bounded by the block size rather than the history. Bars are
+    labelled by their left edge on a grid aligned to midnight wall-clock time
+    (local time for tz-aware ticks), which matches
+    `Series.resample(bar_freq).ohlc()` for frequencies that divide a day.
+    Around DST changes the grid follows the wall clock.
+    """
+
+    bar_freq: str = "1min"
+    _step: int = field(init=False, repr=False)
+    _open_bar: tuple | None = field(default=None, init=False, repr=False)
+    _tz: object = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._step = int(pd.to_timedelta(self.bar_freq).value)
+        if self._step <= 0:
+            raise ValueError(f"bar_freq must be positive, got {self.bar_freq!r}")
+
+    def _frame(self, bucket, o, h, l, c, v) -> pd.DataFrame:
+        idx = pd.to_datetime(np.asarray(bucket, dtype=np.int64) * self._step)
+        if self._tz is not None:
+            # buckets are wall-clock times; repeated fall-back hours read as standard time
+            idx = idx.tz_localize(self._tz, ambiguous=np.zeros(len(idx), dtype=bool), nonexistent="shift_forward")
+        return pd.DataFrame({"open": o, "high": h, "low": l, "close": c, "volume": v}, index=idx)
+
+    def update(self, timestamps, prices, sizes=None) -> pd.DataFrame:
+        ts = pd.DatetimeIndex(timestamps)
+        ns = ts.as_unit("ns").asi8
+        if ts.tz is not None:
+            self._tz = ts.tz
+            # bucket on wall-clock time so bars align to local midnight
+            # (ordering is checked on the UTC instants, which is what is monotone)
+            wall = ts.tz_localize(None).as_unit("ns").asi8
+        else:
+            wall = ns
+        p = np.asarray(prices, dtype=np.float64)
+        s = np.zeros(len(p)) if sizes is None else np.asarray(sizes, dtype=np.float64)
+        if len(p) == 0:
+            return self._frame([], [], [], [], [], [])
+        if len(ns) > 1 and (np.diff(ns) < 0).any():
+            raise ValueError("ticks must be time-ordered")
+
+        bucket = wall // self._step
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket)) + 1))
+        ends = np.append(starts[1:], len(p))
+        b = bucket[starts]
+        o = p[starts]
+        h = np.maximum.reduceat(p, starts)
+        l = np.minimum.reduceat(p, starts)
+        c = p[ends - 1]
+        v = np.add.reduceat(s, starts)
+
+        if self._open_bar is not None:
+            ob, oo, oh, ol, oc, ov = self._open_bar
+            if ob > b[0]:
+                raise ValueError("ticks must be time-ordered across updates")
+            if ob == b[0]:
+                o[0] = oo
+                h[0] = max(oh, h[0])
+                l[0] = min(ol, l[0])
+                v[0] += ov
+            else:
+                b, o, h, l, c, v = (
+                    np.insert(b, 0, ob), np.insert(o, 0, oo), np.insert(h, 0, oh),
+                    np.insert(l, 0, ol), np.insert(c, 0, oc), np.insert(v, 0, ov),
+                )
+
+        self._open_bar = (b[-1], o[-1], h[-1], l[-1], c[-1], v[-1])
+        return self._frame(b[:-1], o[:-1], h[:-1], l[:-1], c[:-1], v[:-1])
+
+    def flush(self) -> pd.DataFrame:
+        """Emit the open (partial) bar, if any, and reset."""
+        if self._open_bar is None:
+            return self._frame([], [], [], [], [], [])
+        b, o, h, l, c, v = self._open_bar
+        self._open_bar = None
+        return self._frame([b], [o], [h], [l], [c], [v])
@@ -0,0 +1,111 @@
+from __future__ import annotations
+import json
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# segments this process has mapped, by name: the owner's own segment and any
+# a worker attached to, so repeated tasks in one worker map it only once
+_ATTACHED: dict[str, shared_memory.SharedMemory] = {}
+
+
+@dataclass(frozen=True)
+class SharedPriceHandle:
+    """
+    Picklable reference to a SharedPriceMatrix: a few ints and a segment
+    name, so sending it to a worker costs bytes however large the prices.
+    """
+
+    name: str
+    n_rows: int
+    n_cols: int
+    tickers_nbytes: int
+    unit: str = "ns"
+    tz: str | None = None
+    freq: str | None = None
+
+    def open(self) -> tuple[np.ndarray, pd.DatetimeIndex, tuple[str, ...]]:
+        """
+        (values, index, tickers), with values and dates read-only views
+        straight into the shared segment (no copy); research code wraps them
+        with ResearchData.from_arrays. Meant for multiprocessing workers
+        started while the owning SharedPriceMatrix is open.
+        """
+        shm = _ATTACHED.get(self.name)
+        if shm is None:
+            shm = _ATTACHED[self.name] = shared_memory.SharedMemory(name=self.name)
+        dates, values, tickers = _layout(shm.buf, self.n_rows, self.n_cols, self.tickers_nbytes)
+        dates.flags.writeable = False
+        values.flags.writeable = False
+        index = pd.DatetimeIndex(dates.view(f"M8[{self.unit}]"), copy=False)
+        if self.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        if self.freq is not None:
+            index.freq = self.freq
+        names = tuple(json.loads(bytes(tickers).decode("utf-8")))
+        return values, index, names
+
+
+def _layout(buf, n_rows: int, n_cols: int, tickers_nbytes: int):
+    """(dates int64, values float64 rows x cols, ticker JSON bytes) views over one segment."""
+    dates = np.ndarray((n_rows,), dtype=np.int64, buffer=buf, offset=0)
+    values = np.ndarray((n_rows, n_cols), dtype=np.float64, buffer=buf, offset=8 * n_rows)
+    tickers = np.ndarray((tickers_nbytes,), dtype=np.uint8, buffer=buf, offset=8 * n_rows * (1 + n_cols))
+    return dates, values, tickers
+
+
+class SharedPriceMatrix:
+    """
+    Aligned (dates x tickers) float64 prices, the date index and the ticker
+    list copied once into a multiprocessing.shared_memory segment. Workers
+    get `handle` (pickled in a few bytes) and rebuild zero-copy views with
+    handle.open(), instead of each unpickling its own copy of the frame.
+
+    The segment lives as long as the context manager:
+
+        with SharedPriceMatrix(prices) as shared:
+            pool.map(task, [(shared.handle, ...) for ...])
+
+    Exiting closes and unlinks it; workers must be done by then.
+    """
+
+    def __init__(self, prices: pd.DataFrame):
+        if not prices.index.is_monotonic_increasing:
+            prices = prices.sort_index()
+        index = pd.DatetimeIndex(prices.index)
+        tz = None if index.tz is None else str(index.tz)
+        freq = index.freqstr
+        if tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        tickers = json.dumps(list(prices.columns)).encode("utf-8")
+        n_rows, n_cols = prices.shape
+
+        size = 8 * n_rows * (1 + n_cols) + len(tickers)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        _ATTACHED[self._shm.name] = self._shm
+        dates, values, names = _layout(self._shm.buf, n_rows, n_cols, len(tickers))
+        dates[:] = index.asi8
+        values[:] = prices.to_numpy(dtype=np.float64)
+        names[:] = np.frombuffer(tickers, dtype=np.uint8)
+        self.handle = SharedPriceHandle(self._shm.name, n_rows, n_cols, len(tickers), index.unit, tz, freq)
+
+    def open(self) -> tuple[np.ndarray, pd.DatetimeIndex, tuple[str, ...]]:
+        """The owner's view of the shared prices (same as handle.open())."""
+        return self.handle.open()
+
+    def close(self) -> None:
+        """Release and unlink the segment; safe to call twice."""
+        if self._shm is None:
+            return
+        _ATTACHED.pop(self._shm.name, None)
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self) -> "SharedPriceMatrix":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from sarb.data.columnar import ColumnStoreWriter, read_column_store
+
+
+class PriceStore:
+    """
+    Local price history shared by the batch commands: one column store
+    (dates x tickers, see sarb.data.columnar) under `root`. Ingest merges new
+    downloads into it; research runs read from it (memory-mapped) instead of
+    re-downloading, so a rerun over the same store sees the same prices.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.path = self.root / "prices"
+
+    def exists(self) -> bool:
+        return (self.path / "meta.json").exists()
+
+    @property
+    def tickers(self) -> list[str]:
+        if not self.exists():
+            return []
+        return json.loads((self.path / "meta.json").read_text())["columns"]
+
+    def write(self, prices: pd.DataFrame) -> Path:
+        """
+        Merge `prices` into the store: new values win where both have a
+        value, new dates and tickers are added. The store is rewritten to a
+        sibling directory and swapped in, so readers never see half a write.
+        """
+        merged = prices.sort_index()
+        if self.exists():
+            merged = merged.combine_first(self.read()).sort_index()
+        tmp = self.root / "prices.tmp"
+        with ColumnStoreWriter(tmp, [str(c) for c in merged.columns]) as w:
+            w.append(merged.set_axis([str(c) for c in merged.columns], axis=1))
+        old = self.root / "prices.old"
+        if self.path.exists():
+            self.path.rename(old)
+        tmp.rename(self.path)
+        if old.exists():
+            shutil.rmtree(old)
+        return self.path
+
+    def read(
+        self,
+        tickers: list[str] | None = None,
+        start: str | None = None,
+        end: str | None = None,
+        mmap: bool = True,
+    ) -> pd.DataFrame:
+        """Prices for `tickers` (default all) between start and end, inclusive."""
+        if not self.exists():
+            raise FileNotFoundError(f"no price store at {self.path}; run `sarb ingest` first")
+        if tickers is not None:
+            missing = sorted(set(tickers) - set(self.tickers))
+            if missing:
+                raise KeyError(f"tickers not in price store: {missing}")
+        px = read_column_store(self.path, columns=tickers, mmap=mmap)
+        return px.loc[start:end]
+
+    def fingerprint(self) -> str:
+        """Short hash identifying the current store contents; changes on every write."""
+        if not self.exists():
+            return "empty"
+        meta = self.path / "meta.json"
+        return hashlib.sha1(meta.read_bytes() + str(meta.stat().st_mtime_ns).encode()).hexdigest()[:16]
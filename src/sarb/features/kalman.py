@@ -32,18 +32,42 @@ def kalman_hedge_ratio(
     Observation: y_t = H_t @ theta_t + v_t,  where H_t = [1, x_t]
     Transition: theta_t = theta_{t-1} + w_t,  w_t ~ N(0, Q)
     """
-    n = len(y)
     theta = np.array([config.initial_alpha, config.initial_beta], dtype=np.float64)
     P = np.eye(2) * 1.0
+    alphas, betas, errors, _, _ = kalman_filter_arrays(
+        y.values.astype(np.float64), x.values.astype(np.float64), theta, P, config
+    )
+    spreads = errors.copy()
+
+    idx = y.index
+    return KalmanResult(
+        alpha=pd.Series(alphas, index=idx, name="kalman_alpha"),
+        beta=pd.Series(betas, index=idx, name="kalman_beta"),
+        spread=pd.Series(spreads, index=idx, name="kalman_spread"),
+        measurement_error=pd.Series(errors, index=idx, name="kalman_error"),
+    )
+
+
+def kalman_filter_arrays(
+    y_vals: np.ndarray,
+    x_vals: np.ndarray,
+    theta: np.ndarray,
+    P: np.ndarray,
+    config: KalmanConfig = KalmanConfig(),
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Filter loop of kalman_hedge_ratio starting from state (theta, P).
+    Returns (alphas, betas, errors, theta, P); feeding the returned state into
+    the next call continues the filter exactly, so long series can be run in blocks.
+    """
+    n = len(y_vals)
+    theta = np.array(theta, dtype=np.float64)
+    P = np.array(P, dtype=np.float64)
     Q = np.eye(2) * config.delta
     R = config.ve
 
-    y_vals = y.values.astype(np.float64)
-    x_vals = x.values.astype(np.float64)
-
     alphas = np.empty(n)
     betas = np.empty(n)
-    spreads = np.empty(n)
     errors = np.empty(n)
 
     for t in range(n):
@@ -70,16 +94,9 @@ def kalman_hedge_ratio(
 
         alphas[t] = theta[0]
         betas[t] = theta[1]
-        spreads[t] = e
         errors[t] = e
 
-    idx = y.index
-    return KalmanResult(
-        alpha=pd.Series(alphas, index=idx, name="kalman_alpha"),
-        beta=pd.Series(betas, index=idx, name="kalman_beta"),
-        spread=pd.Series(spreads, index=idx, name="kalman_spread"),
-        measurement_error=pd.Series(errors, index=idx, name="kalman_error"),
-    )
+    return alphas, betas, errors, theta, P
 
 
 def fit_hedge_ratio_kalman(
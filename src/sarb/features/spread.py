@@ -1,15 +1,96 @@
 from __future__ import annotations
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
 
-def fit_hedge_ratio(y: pd.Series, x: pd.Series) -> tuple[float, float]:
-    """Fit y ~ alpha + beta*x on TRAIN only."""
-    x_ = sm.add_constant(x.values)
-    model = sm.OLS(y.values, x_).fit()
-    alpha, beta = float(model.params[0]), float(model.params[1])
+HEDGE_METHODS = ("ols", "tls")
+
+
+def _hedge_from_moments(mx, my, sxx, sxy, syy, method: str = "ols"):
+    """
+    (alpha, beta) from means and centered (co)moment sums; works on scalars or
+    arrays. "ols" solves the 2x2 normal equations of y ~ alpha + beta*x in
+    centered form. "tls" is orthogonal regression: the major axis of the
+    (x, y) scatter, so fitting x on y gives exactly 1/beta. With sxy == 0
+    the axes are x and y themselves: beta is 0 when sxx >= syy and NaN
+    (a vertical axis, no finite hedge) otherwise.
+    """
+    if method not in HEDGE_METHODS:
+        raise ValueError(f"Unknown hedge method: {method}")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if method == "ols":
+            beta = np.where(sxx > 0, sxy / np.where(sxx > 0, sxx, 1.0), np.nan)
+        else:
+            d = syy - sxx
+            beta = np.where(
+                sxy != 0,
+                (d + np.sqrt(d * d + 4.0 * sxy * sxy)) / (2.0 * np.where(sxy != 0, sxy, 1.0)),
+                np.where(d <= 0, 0.0, np.nan),
+            )
+    alpha = my - beta * mx
+    if method == "ols":
+        # constant x: the minimum-norm solution statsmodels' pinv returns
+        flat = ~(sxx > 0)
+        if np.any(flat):
+            alpha = np.where(flat, my / (1.0 + mx * mx), alpha)
+            beta = np.where(flat, mx * my / (1.0 + mx * mx), beta)
     return alpha, beta
 
+
+def fit_hedge_ratio(y: pd.Series, x: pd.Series, method: str = "ols") -> tuple[float, float]:
+    """
+    Fit y ~ alpha + beta*x on TRAIN only. Closed form on the raw arrays
+    (same estimate as statsmodels OLS); method="tls" fits orthogonal
+    regression instead, which treats y and x symmetrically.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    mx, my = x.mean(), y.mean()
+    dx, dy = x - mx, y - my
+    alpha, beta = _hedge_from_moments(mx, my, dx @ dx, dx @ dy, dy @ dy, method)
+    return float(alpha), float(beta)
+
+
+def fit_hedge_ratios(
+    values: np.ndarray,
+    col_y,
+    col_x,
+    method: str = "ols",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    fit_hedge_ratio for many (y, x) column pairs of one (rows x tickers)
+    price matrix, e.g. ResearchData.values[train]. The centered cross-product
+    matrix is formed once with a single matmul and each pair reads its three
+    moments from it. Pairs touching a column with NaNs are fitted on their
+    own jointly valid rows, like fit_hedge_ratio after dropna().
+    Returns (alphas, betas) aligned with col_y / col_x.
+    """
+    v = np.asarray(values, dtype=np.float64)
+    cy = np.asarray(col_y, dtype=np.intp)
+    cx = np.asarray(col_x, dtype=np.intp)
+    alphas = np.empty(len(cy))
+    betas = np.empty(len(cy))
+
+    has_nan = np.isnan(v).any(axis=0)
+    clean = ~(has_nan[cy] | has_nan[cx])
+    if clean.any():
+        cols = np.unique(np.concatenate([cy[clean], cx[clean]]))
+        pos = np.full(v.shape[1], -1, dtype=np.intp)
+        pos[cols] = np.arange(len(cols))
+        block = v[:, cols]
+        means = block.mean(axis=0)
+        c = block - means
+        gram = c.T @ c
+        iy, ix = pos[cy[clean]], pos[cx[clean]]
+        alphas[clean], betas[clean] = _hedge_from_moments(
+            means[ix], means[iy], gram[ix, ix], gram[iy, ix], gram[iy, iy], method
+        )
+    for i in np.flatnonzero(~clean):
+        y, x = v[:, cy[i]], v[:, cx[i]]
+        ok = ~(np.isnan(y) | np.isnan(x))
+        alphas[i], betas[i] = fit_hedge_ratio(y[ok], x[ok], method)
+    return alphas, betas
+
+
 def compute_spread(y: pd.Series, x: pd.Series, alpha: float, beta: float) -> pd.Series:
     return y - (alpha + beta * x)
 
@@ -18,3 +99,55 @@ def rolling_zscore(s: pd.Series, lookback: int) -> pd.Series:
     sd = s.rolling(lookback).std(ddof=0)
     z = (s - mu) / sd
     return z
+
+class StreamingZScore:
+    """
+    rolling_zscore over a series delivered in chunks: keeps the last
+    lookback-1 values so each block is scored against its true trailing window.
+    """
+
+    def __init__(self, lookback: int):
+        self.lookback = int(lookback)
+        self._tail = np.empty(0)
+
+    def update(self, values) -> np.ndarray:
+        v = np.asarray(values, dtype=np.float64)
+        joined = np.concatenate([self._tail, v])
+        z = rolling_zscore(pd.Series(joined), self.lookback).to_numpy()[len(self._tail):]
+        self._tail = joined[-(self.lookback - 1):] if self.lookback > 1 else np.empty(0)
+        return z
+
+
+class HedgeRatioAccumulator:
+    """
+    fit_hedge_ratio for data that does not fit in memory: merges per-chunk
+    means and co-moments (Chan et al.), so the result equals one OLS fit over
+    the concatenated chunks without holding them.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self._mx = self._my = 0.0
+        self._sxx = self._sxy = 0.0
+
+    def update(self, y, x) -> None:
+        y = np.asarray(y, dtype=np.float64)
+        x = np.asarray(x, dtype=np.float64)
+        nb = len(y)
+        if nb == 0:
+            return
+        mx, my = x.mean(), y.mean()
+        dx = x - mx
+        sxx, sxy = float(dx @ dx), float(dx @ (y - my))
+        n = self.n + nb
+        ddx, ddy = mx - self._mx, my - self._my
+        f = self.n * nb / n
+        self._sxx += sxx + ddx * ddx * f
+        self._sxy += sxy + ddx * ddy * f
+        self._mx += ddx * nb / n
+        self._my += ddy * nb / n
+        self.n = n
+
+    def fit(self) -> tuple[float, float]:
+        beta = self._sxy / self._sxx
+        return float(self._my - beta * self._mx), float(beta)
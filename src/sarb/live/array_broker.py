@@ -0,0 +1,259 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from sarb.live.broker import BaseBroker, Order, Fill
+
+
+class TickerRegistry:
+    """Stable ticker -> column index map; grows as new tickers appear."""
+
+    __slots__ = ("_index", "tickers")
+
+    def __init__(self, tickers: list[str] | None = None) -> None:
+        self._index: dict[str, int] = {}
+        self.tickers: list[str] = []
+        for t in tickers or []:
+            self.add(t)
+
+    def add(self, ticker: str) -> int:
+        i = self._index.get(ticker)
+        if i is None:
+            i = len(self.tickers)
+            self._index[ticker] = i
+            self.tickers.append(ticker)
+        return i
+
+    def get(self, ticker: str) -> int | None:
+        return self._index.get(ticker)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+
+class FillLog:
+    """
+    Columnar, preallocated fill log. Columns grow by doubling, so appends are
+    amortized O(1) and millions of fills cost a few flat arrays instead of
+    millions of Fill objects.
+    """
+
+    __slots__ = ("_n", "ticker_id", "quantity", "fill_price", "timestamp", "commission")
+
+    def __init__(self, capacity: int = 1024) -> None:
+        capacity = max(int(capacity), 1)
+        self._n = 0
+        self.ticker_id = np.empty(capacity, dtype=np.int32)
+        self.quantity = np.empty(capacity, dtype=np.float64)
+        self.fill_price = np.empty(capacity, dtype=np.float64)
+        self.timestamp = np.empty(capacity, dtype="datetime64[ns]")
+        self.commission = np.empty(capacity, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _reserve(self, extra: int) -> None:
+        need = self._n + extra
+        cap = len(self.quantity)
+        if need <= cap:
+            return
+        while cap < need:
+            cap *= 2
+        for name in ("ticker_id", "quantity", "fill_price", "timestamp", "commission"):
+            old = getattr(self, name)
+            new = np.empty(cap, dtype=old.dtype)
+            new[: self._n] = old[: self._n]
+            setattr(self, name, new)
+
+    def append_many(
+        self,
+        ticker_id: np.ndarray,
+        quantity: np.ndarray,
+        fill_price: np.ndarray,
+        timestamp: np.ndarray,
+        commission: np.ndarray,
+    ) -> None:
+        k = len(quantity)
+        if k == 0:
+            return
+        self._reserve(k)
+        sl = slice(self._n, self._n + k)
+        self.ticker_id[sl] = ticker_id
+        self.quantity[sl] = quantity
+        self.fill_price[sl] = fill_price
+        self.timestamp[sl] = timestamp
+        self.commission[sl] = commission
+        self._n += k
+
+    def to_frame(self, tickers: list[str]) -> pd.DataFrame:
+        n = self._n
+        names = np.asarray(tickers, dtype=object)
+        return pd.DataFrame(
+            {
+                "ticker": names[self.ticker_id[:n]] if n else np.array([], dtype=object),
+                "quantity": self.quantity[:n].copy(),
+                "fill_price": self.fill_price[:n].copy(),
+                "timestamp": self.timestamp[:n].copy(),
+                "commission": self.commission[:n].copy(),
+            }
+        )
+
+
+def _to_datetime64(ts) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(ts if ts is not None else datetime.now()).asm8, "ns")
+
+
+@dataclass
+class ArrayPaperBroker(BaseBroker):
+    """
+    High-throughput paper broker with the same fill model as PaperBroker.
+    Positions and prices are NumPy arrays indexed by a TickerRegistry, fills
+    go to a columnar FillLog, and mark-to-market is one dot product.
+    """
+
+    initial_capital: float = 100_000.0
+    fee_bps: float = 1.0
+    slippage_bps: float = 0.5
+    tickers: list[str] = field(default_factory=list)   # optional pre-registration
+    fill_capacity: int = 1024
+
+    registry: TickerRegistry = field(init=False, repr=False)
+    fills: FillLog = field(init=False, repr=False)
+    _cash: float = field(init=False, default=0.0)
+    _positions: np.ndarray = field(init=False, repr=False)
+    _prices: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._cash = self.initial_capital
+        self.registry = TickerRegistry(self.tickers)
+        self.fills = FillLog(self.fill_capacity)
+        n = len(self.registry)
+        self._positions = np.zeros(n)
+        self._prices = np.full(n, np.nan)
+
+    def register(self, tickers) -> np.ndarray:
+        """Registry ids for tickers, adding unseen ones (with zero position, no price)."""
+        ids = np.fromiter((self.registry.add(t) for t in tickers), dtype=np.int64)
+        n = len(self.registry)
+        if n > len(self._positions):
+            grow = n - len(self._positions)
+            self._positions = np.concatenate([self._positions, np.zeros(grow)])
+            self._prices = np.concatenate([self._prices, np.full(grow, np.nan)])
+        return ids
+
+    def set_current_prices(self, prices: dict[str, float]) -> None:
+        """Replace all prices, like PaperBroker (tickers not given have no price)."""
+        ids = self.register(prices.keys())
+        self._prices[:] = np.nan
+        self._prices[ids] = np.fromiter(prices.values(), dtype=np.float64, count=len(ids))
+
+    def set_price_array(self, prices: np.ndarray) -> None:
+        """Fast path: prices aligned with registry.tickers (e.g. one row of a price matrix)."""
+        p = np.asarray(prices, dtype=np.float64)
+        if p.shape != self._prices.shape:
+            raise ValueError(f"Expected {len(self._prices)} prices, got {p.shape}.")
+        self._prices[:] = p
+
+    def submit_order(self, order: Order) -> Fill | None:
+        return self.submit_orders([order])[0]
+
+    def submit_orders(self, orders: list[Order]) -> list[Fill | None]:
+        if not orders:
+            return []
+        ids = self.register(o.ticker for o in orders)
+        qty = np.fromiter((o.quantity for o in orders), dtype=np.float64, count=len(orders))
+        ts = np.array([_to_datetime64(o.timestamp) for o in orders], dtype="datetime64[ns]")
+        ok = self._execute(ids, qty, ts)
+
+        out: list[Fill | None] = [None] * len(orders)
+        n = len(self.fills)
+        j = n - int(ok.sum())
+        for i in np.flatnonzero(ok):
+            out[i] = Fill(
+                ticker=orders[i].ticker,
+                quantity=float(self.fills.quantity[j]),
+                fill_price=float(self.fills.fill_price[j]),
+                timestamp=orders[i].timestamp or pd.Timestamp(self.fills.timestamp[j]).to_pydatetime(),
+                commission=float(self.fills.commission[j]),
+            )
+            j += 1
+        return out
+
+    def submit_order_arrays(
+        self,
+        ticker_ids: np.ndarray,
+        quantities: np.ndarray,
+        timestamp=None,
+    ) -> np.ndarray:
+        """
+        Object-free batch path for replays: orders given as registry ids and
+        quantities sharing one timestamp. Returns a mask of filled orders.
+        """
+        ids = np.asarray(ticker_ids, dtype=np.int64)
+        qty = np.asarray(quantities, dtype=np.float64)
+        ts = np.full(len(ids), _to_datetime64(timestamp), dtype="datetime64[ns]")
+        return self._execute(ids, qty, ts)
+
+    def _execute(self, ids: np.ndarray, qty: np.ndarray, ts: np.ndarray) -> np.ndarray:
+        mid = self._prices[ids]
+        ok = np.isfinite(mid) & (mid > 0)
+
+        slip = mid * (self.slippage_bps / 1e4)
+        fill_price = np.where(qty > 0, mid + slip, mid - slip)
+        commission = np.abs(qty * fill_price) * (self.fee_bps / 1e4)
+
+        self._cash -= float(np.where(ok, qty * fill_price + commission, 0.0).sum())
+        np.add.at(self._positions, ids[ok], qty[ok])
+        touched = ids[ok]
+        flat = np.abs(self._positions[touched]) < 1e-10
+        self._positions[touched[flat]] = 0.0
+
+        self.fills.append_many(ids[ok], qty[ok], fill_price[ok], ts[ok], commission[ok])
+        return ok
+
+    def get_position(self, ticker: str) -> float:
+        i = self.registry.get(ticker)
+        return float(self._positions[i]) if i is not None else 0.0
+
+    def get_all_positions(self) -> dict[str, float]:
+        nz = np.flatnonzero(self._positions)
+        return {self.registry.tickers[i]: float(self._positions[i]) for i in nz}
+
+    def get_account_value(self) -> float:
+        px = np.where(np.isfinite(self._prices), self._prices, 0.0)
+        return self._cash + float(self._positions @ px)
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Read-only view of positions aligned with registry.tickers."""
+        v = self._positions.view()
+        v.flags.writeable = False
+        return v
+
+    def get_fill_history(self) -> list[Fill]:
+        df = self.fill_history_frame()
+        return [
+            Fill(
+                ticker=r.ticker,
+                quantity=r.quantity,
+                fill_price=r.fill_price,
+                timestamp=r.timestamp.to_pydatetime(),
+                commission=r.commission,
+            )
+            for r in df.itertuples(index=False)
+        ]
+
+    def fill_history_frame(self) -> pd.DataFrame:
+        return self.fills.to_frame(self.registry.tickers)
+
+    def export_state(self) -> tuple[float, dict[str, float]]:
+        """(cash, positions) for snapshots; the fill log is not part of the state."""
+        return self._cash, self.get_all_positions()
+
+    def restore_state(self, cash: float, positions: dict[str, float]) -> None:
+        self._cash = float(cash)
+        self._positions[:] = 0.0
+        ids = self.register(positions.keys())
+        self._positions[ids] = np.fromiter(positions.values(), dtype=np.float64, count=len(ids))
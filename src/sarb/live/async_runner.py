@@ -0,0 +1,87 @@
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass
+import pandas as pd
+
+from sarb.live.broker import AsyncBaseBroker, Fill, Order
+from sarb.live.runner import LiveConfig, compute_pair_signals, target_orders
+from sarb.live.signal import PairSignal
+
+
+@dataclass(frozen=True)
+class AsyncExecutionConfig:
+    max_concurrency: int = 8       # orders in flight at once
+    timeout: float = 5.0           # seconds per broker call
+    max_retries: int = 2           # extra attempts after a failure/timeout
+    retry_backoff: float = 0.1     # seconds, doubled each retry
+
+
+@dataclass(frozen=True)
+class ExecutionReport:
+    orders: list[Order]
+    fills: list[Fill | None]       # aligned with orders; None = rejected or failed
+    n_retries: int
+    n_failed: int
+
+
+async def _submit_with_retry(
+    broker: AsyncBaseBroker,
+    order: Order,
+    sem: asyncio.Semaphore,
+    exec_cfg: AsyncExecutionConfig,
+) -> tuple[Fill | None, int, bool]:
+    """Returns (fill, retries used, failed)."""
+    async with sem:
+        for attempt in range(exec_cfg.max_retries + 1):
+            try:
+                fill = await asyncio.wait_for(broker.submit_order(order), exec_cfg.timeout)
+                return fill, attempt, False
+            except (asyncio.TimeoutError, ConnectionError, OSError):
+                if attempt == exec_cfg.max_retries:
+                    return None, attempt, True
+                await asyncio.sleep(exec_cfg.retry_backoff * (2**attempt))
+    return None, exec_cfg.max_retries, True
+
+
+async def submit_orders_concurrently(
+    broker: AsyncBaseBroker,
+    orders: list[Order],
+    exec_cfg: AsyncExecutionConfig = AsyncExecutionConfig(),
+) -> ExecutionReport:
+    """
+    Send orders with at most max_concurrency in flight, each with a timeout
+    and bounded retries. Orders are netted per ticker upstream, so they are
+    independent and can run in any order.
+
+    Note: a timed-out order may still have reached the broker; real brokers
+    should dedupe retries (e.g. by client order id) before enabling retries.
+    """
+    sem = asyncio.Semaphore(max(1, exec_cfg.max_concurrency))
+    results = await asyncio.gather(
+        *(_submit_with_retry(broker, o, sem, exec_cfg) for o in orders)
+    )
+    return ExecutionReport(
+        orders=list(orders),
+        fills=[r[0] for r in results],
+        n_retries=sum(r[1] for r in results),
+        n_failed=sum(1 for r in results if r[2]),
+    )
+
+
+async def run_live_step_async(
+    prices: pd.DataFrame,
+    config: LiveConfig,
+    broker: AsyncBaseBroker,
+    exec_cfg: AsyncExecutionConfig = AsyncExecutionConfig(),
+) -> tuple[list[PairSignal], ExecutionReport]:
+    """
+    Async single step: compute all pair signals first, net target shares per
+    ticker across pairs, diff once against current holdings, then submit the
+    resulting orders concurrently.
+    """
+    signals = compute_pair_signals(prices, config)
+    positions = await asyncio.wait_for(broker.get_all_positions(), exec_cfg.timeout)
+    orders = target_orders(prices, signals, config, positions)
+
+    report = await submit_orders_concurrently(broker, orders, exec_cfg)
+    return signals, report
@@ -27,6 +27,10 @@ class BaseBroker(ABC):
     def submit_order(self, order: Order) -> Fill | None:
         ...
 
+    def submit_orders(self, orders: list[Order]) -> list[Fill | None]:
+        """Submit a batch of orders; fills are aligned with orders. Override for a native batch API."""
+        return [self.submit_order(o) for o in orders]
+
     @abstractmethod
     def get_position(self, ticker: str) -> float:
         ...
@@ -38,3 +42,31 @@ class BaseBroker(ABC):
     @abstractmethod
     def get_account_value(self) -> float:
         ...
+
+    def export_state(self) -> tuple[float, dict[str, float]]:
+        """(cash, positions) for live-state snapshots (sarb.live.state). Optional."""
+        raise NotImplementedError(f"{type(self).__name__} does not support state snapshots")
+
+    def restore_state(self, cash: float, positions: dict[str, float]) -> None:
+        """Reset cash and positions from a snapshot, the inverse of export_state. Optional."""
+        raise NotImplementedError(f"{type(self).__name__} does not support state snapshots")
+
+
+class AsyncBaseBroker(ABC):
+    """Async counterpart of BaseBroker for network-backed broker APIs."""
+
+    @abstractmethod
+    async def submit_order(self, order: Order) -> Fill | None:
+        ...
+
+    @abstractmethod
+    async def get_position(self, ticker: str) -> float:
+        ...
+
+    @abstractmethod
+    async def get_all_positions(self) -> dict[str, float]:
+        ...
+
+    @abstractmethod
+    async def get_account_value(self) -> float:
+        ...
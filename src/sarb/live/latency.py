@@ -0,0 +1,179 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+import logging
+import math
+import time
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Log-spaced buckets: 4 per doubling from 1us up to ~2 minutes (~19% resolution).
+_BUCKETS_PER_OCTAVE = 4
+_MIN_NS = 1_000
+_N_BUCKETS = 4 * 27 + 2   # underflow bucket + 108 log buckets + overflow bucket
+_UPPER_NS = np.concatenate(
+    [
+        [_MIN_NS],
+        _MIN_NS * 2.0 ** (np.arange(1, _N_BUCKETS - 1) / _BUCKETS_PER_OCTAVE),
+        [np.inf],
+    ]
+)
+
+
+@dataclass
+class LatencyHistogram:
+    """Fixed-bucket latency histogram: O(1) record, mergeable, percentile by bucket upper edge."""
+
+    counts: np.ndarray = field(default_factory=lambda: np.zeros(_N_BUCKETS, dtype=np.int64))
+    n: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+
+    def record(self, ns: int) -> None:
+        if ns <= _MIN_NS:
+            b = 0
+        else:
+            b = min(int(math.ceil(_BUCKETS_PER_OCTAVE * math.log2(ns / _MIN_NS))), _N_BUCKETS - 1)
+        self.counts[b] += 1
+        self.n += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def merge(self, other: LatencyHistogram) -> LatencyHistogram:
+        return LatencyHistogram(
+            counts=self.counts + other.counts,
+            n=self.n + other.n,
+            total_ns=self.total_ns + other.total_ns,
+            max_ns=max(self.max_ns, other.max_ns),
+        )
+
+    def quantile_ns(self, q: float) -> float:
+        """Upper edge of the bucket holding the q-quantile (capped at the observed max)."""
+        if self.n == 0:
+            return 0.0
+        rank = max(1, math.ceil(q * self.n))
+        b = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return float(min(_UPPER_NS[b], self.max_ns))
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.n if self.n else 0.0
+
+
+class _StageTimer:
+    __slots__ = ("_rec", "_key", "_t0")
+
+    def __init__(self, rec: LatencyRecorder, key: tuple[str, str]) -> None:
+        self._rec = rec
+        self._key = key
+
+    def __enter__(self) -> _StageTimer:
+        self._t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._rec.record(self._key[0], time.perf_counter_ns() - self._t0, self._key[1])
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> _NullTimer:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+AGGREGATE = "ALL"
+
+
+class LatencyRecorder:
+    """
+    Per-stage, per-pair latency histograms for the live hot path.
+
+        with recorder.stage("fit_hedge", "KO/PEP"):
+            ...
+
+    Recording is a perf_counter_ns pair and a bucket increment; aggregates
+    across pairs are merged at snapshot time, not on the hot path.
+    """
+
+    def __init__(self, enabled: bool = True, log_every: float = 60.0) -> None:
+        self.enabled = enabled
+        self.log_every = log_every
+        self._hists: dict[tuple[str, str], LatencyHistogram] = {}
+        self._last_log = time.monotonic()
+
+    def stage(self, name: str, pair: str = AGGREGATE):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, (name, pair))
+
+    def record(self, name: str, ns: int, pair: str = AGGREGATE) -> None:
+        h = self._hists.get((name, pair))
+        if h is None:
+            h = self._hists[(name, pair)] = LatencyHistogram()
+        h.record(ns)
+
+    def reset(self) -> None:
+        self._hists.clear()
+
+    def histograms(self) -> dict[tuple[str, str], LatencyHistogram]:
+        """Per-(stage, pair) histograms plus merged (stage, AGGREGATE) ones."""
+        out = dict(self._hists)
+        for (name, pair), h in self._hists.items():
+            if pair == AGGREGATE:
+                continue
+            key = (name, AGGREGATE)
+            out[key] = out[key].merge(h) if key in out else h
+        return out
+
+    def snapshot(self) -> pd.DataFrame:
+        """One row per (stage, pair) with count, p50/p99/max/mean in microseconds."""
+        rows = [
+            {
+                "stage": name,
+                "pair": pair,
+                "count": h.n,
+                "p50_us": h.quantile_ns(0.50) / 1e3,
+                "p99_us": h.quantile_ns(0.99) / 1e3,
+                "max_us": h.max_ns / 1e3,
+                "mean_us": h.mean_ns / 1e3,
+            }
+            for (name, pair), h in sorted(self.histograms().items())
+        ]
+        return pd.DataFrame(rows, columns=["stage", "pair", "count", "p50_us", "p99_us", "max_us", "mean_us"])
+
+    def log_line(self) -> str:
+        agg = [(k[0], h) for k, h in sorted(self.histograms().items()) if k[1] == AGGREGATE]
+        return " | ".join(
+            f"{name} p50={h.quantile_ns(0.5) / 1e3:.0f}us p99={h.quantile_ns(0.99) / 1e3:.0f}us max={h.max_ns / 1e3:.0f}us"
+            for name, h in agg
+        )
+
+    def maybe_log(self, log: logging.Logger | None = None) -> bool:
+        """Emit log_line() at INFO if log_every seconds have passed since the last one."""
+        now = time.monotonic()
+        if now - self._last_log < self.log_every:
+            return False
+        self._last_log = now
+        (log or logger).info("live latency: %s", self.log_line())
+        return True
+
+    def check_budget(self, p99_budget_us: dict[str, float]) -> list[str]:
+        """Stages whose aggregate p99 exceeds its budget (microseconds)."""
+        hists = self.histograms()
+        violations = []
+        for name, budget in p99_budget_us.items():
+            h = hists.get((name, AGGREGATE))
+            if h is not None and h.quantile_ns(0.99) / 1e3 > budget:
+                violations.append(f"{name}: p99 {h.quantile_ns(0.99) / 1e3:.0f}us > {budget:.0f}us")
+        return violations
+
+
+NULL_RECORDER = LatencyRecorder(enabled=False)
@@ -1,8 +1,11 @@
 from __future__ import annotations
+import asyncio
 from dataclasses import dataclass, field
 from datetime import datetime
+import random
+import numpy as np
 
-from sarb.live.broker import BaseBroker, Order, Fill
+from sarb.live.broker import AsyncBaseBroker, BaseBroker, Order, Fill
 
 
 @dataclass
@@ -62,6 +65,46 @@ class PaperBroker(BaseBroker):
         self._fills.append(fill)
         return fill
 
+    def submit_orders(self, orders: list[Order]) -> list[Fill | None]:
+        """
+        Vectorized batch fill: slippage, commissions and the cash update are
+        computed for all orders at once. Same result as submitting them
+        one by one at the current prices.
+        """
+        if not orders:
+            return []
+
+        mid = np.array([self._price_cache.get(o.ticker, np.nan) for o in orders], dtype=np.float64)
+        qty = np.array([o.quantity for o in orders], dtype=np.float64)
+        ok = np.isfinite(mid) & (mid > 0)
+
+        slip = mid * (self.slippage_bps / 1e4)
+        fill_price = np.where(qty > 0, mid + slip, mid - slip)
+        commission = np.abs(qty * fill_price) * (self.fee_bps / 1e4)
+        self._cash -= float(np.where(ok, qty * fill_price + commission, 0.0).sum())
+
+        fills: list[Fill | None] = []
+        now = datetime.now()
+        for i, order in enumerate(orders):
+            if not ok[i]:
+                fills.append(None)
+                continue
+            pos = self._positions.get(order.ticker, 0.0) + order.quantity
+            if abs(pos) < 1e-10:
+                self._positions.pop(order.ticker, None)
+            else:
+                self._positions[order.ticker] = pos
+            fill = Fill(
+                ticker=order.ticker,
+                quantity=order.quantity,
+                fill_price=float(fill_price[i]),
+                timestamp=order.timestamp or now,
+                commission=float(commission[i]),
+            )
+            self._fills.append(fill)
+            fills.append(fill)
+        return fills
+
     def get_position(self, ticker: str) -> float:
         return self._positions.get(ticker, 0.0)
 
@@ -77,3 +120,68 @@ class PaperBroker(BaseBroker):
 
     def get_fill_history(self) -> list[Fill]:
         return list(self._fills)
+
+    def export_state(self) -> tuple[float, dict[str, float]]:
+        """(cash, positions) for snapshots; the fill log is not part of the state."""
+        return self._cash, dict(self._positions)
+
+    def restore_state(self, cash: float, positions: dict[str, float]) -> None:
+        self._cash = float(cash)
+        self._positions = {t: float(q) for t, q in positions.items() if abs(q) >= 1e-10}
+
+
+@dataclass
+class AsyncPaperBroker(AsyncBaseBroker):
+    """
+    In-process async fake broker: wraps a PaperBroker and adds simulated
+    network latency (and optional random failures) to every call, so async
+    execution throughput can be tested without a live service.
+    """
+
+    broker: PaperBroker = field(default_factory=PaperBroker)
+    latency: float = 0.0          # seconds per call
+    jitter: float = 0.0           # extra uniform [0, jitter) seconds
+    failure_rate: float = 0.0     # probability submit_order raises ConnectionError
+    seed: int = 0
+
+    _rng: random.Random = field(init=False, repr=False)
+    _in_flight: int = field(init=False, default=0)
+    max_in_flight: int = field(init=False, default=0)
+    n_calls: int = field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    async def _roundtrip(self) -> None:
+        self.n_calls += 1
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+            await asyncio.sleep(delay)
+        finally:
+            self._in_flight -= 1
+
+    def set_current_prices(self, prices: dict[str, float]) -> None:
+        self.broker.set_current_prices(prices)
+
+    async def submit_order(self, order: Order) -> Fill | None:
+        await self._roundtrip()
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise ConnectionError("simulated broker failure")
+        return self.broker.submit_order(order)
+
+    async def get_position(self, ticker: str) -> float:
+        await self._roundtrip()
+        return self.broker.get_position(ticker)
+
+    async def get_all_positions(self) -> dict[str, float]:
+        await self._roundtrip()
+        return self.broker.get_all_positions()
+
+    async def get_account_value(self) -> float:
+        await self._roundtrip()
+        return self.broker.get_account_value()
+
+    def get_fill_history(self) -> list[Fill]:
+        return self.broker.get_fill_history()
@@ -0,0 +1,193 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import time
+import numpy as np
+import pandas as pd
+
+from sarb.live.broker import BaseBroker
+from sarb.live.latency import LatencyRecorder, NULL_RECORDER
+from sarb.live.runner import LiveConfig, aggregate_target_positions, net_orders
+from sarb.live.signal import PairSignal, window_signal
+
+
+@dataclass(frozen=True)
+class ReplayReport:
+    signals: pd.DataFrame        # one row per (bar, pair): timestamp, y, x, z_score, position, alpha, beta
+    account_value: pd.Series     # broker account value after each replayed bar
+    n_bars: int
+    n_fills: int
+    elapsed: float               # seconds
+
+    @property
+    def bars_per_second(self) -> float:
+        return self.n_bars / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def summary(self) -> str:
+        return (
+            f"Replayed {self.n_bars} bars x {self.signals[['y', 'x']].drop_duplicates().shape[0]} pairs "
+            f"in {self.elapsed:.2f}s ({self.bars_per_second:,.0f} bars/s), {self.n_fills} fills"
+        )
+
+
+class _PairStream:
+    """Preloaded arrays for one pair: NaN-free rows plus global-bar -> row-count map."""
+
+    __slots__ = ("y", "x", "yv", "xv", "dates", "n_valid")
+
+    def __init__(self, prices: pd.DataFrame, y: str, x: str) -> None:
+        both = prices[[y, x]].to_numpy(dtype=np.float64)
+        ok = ~np.isnan(both).any(axis=1)
+        self.y, self.x = y, x
+        self.yv = np.ascontiguousarray(both[ok, 0])
+        self.xv = np.ascontiguousarray(both[ok, 1])
+        self.dates = prices.index[ok]
+        self.n_valid = np.cumsum(ok)
+
+
+def _signal_at(ps: _PairStream, n: int, config: LiveConfig) -> tuple[float, float, float, float, pd.Timestamp | None]:
+    """
+    (z, position, alpha, beta, timestamp) as generate_live_signal on the first
+    n valid rows; flat with timestamp None before the pair has any rows.
+    """
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0, None
+    lo = max(0, n - (config.train_lookback + config.lookback_z))
+    z, pos, alpha, beta = window_signal(
+        ps.yv[lo:n], ps.xv[lo:n],
+        lookback_z=config.lookback_z,
+        entry_z=config.entry_z,
+        exit_z=config.exit_z,
+        train_lookback=config.train_lookback,
+        hedge_method=config.hedge_method,
+    )
+    return z, pos, alpha, beta, ps.dates[n - 1]
+
+
+def replay_live(
+    prices: pd.DataFrame,
+    config: LiveConfig,
+    broker: BaseBroker,
+    start: int | None = None,
+    recorder: LatencyRecorder | None = None,
+) -> ReplayReport:
+    """
+    Fast historical replay of the live loop in scripts/run_live.py.
+
+    For each bar i >= start (default train_lookback + lookback_z), it sets
+    the broker's prices to bar i, generates each pair's live signal from the
+    history up to i, and submits netted orders. The signals and fills are the
+    same as calling run_live_step(prices.iloc[: i + 1]) every day. Prices are
+    loaded into arrays once and each bar uses fixed-size views, so a replay is
+    linear in the number of bars.
+
+    broker must support set_current_prices (PaperBroker, ArrayPaperBroker);
+    ArrayPaperBroker additionally gets an object-free order path.
+
+    recorder: optional LatencyRecorder; times each pair's "signal" plus
+              "orders", "broker" and the whole "step" of every bar, like
+              run_live_step.
+    """
+    from sarb.live.array_broker import ArrayPaperBroker
+
+    streams = [_PairStream(prices, y, x) for y, x in config.pairs]
+    tickers = list(dict.fromkeys(t for pair in config.pairs for t in pair))
+    col = {t: i for i, t in enumerate(tickers)}
+    px = prices[tickers].to_numpy(dtype=np.float64)
+    dates = prices.index
+
+    if start is None:
+        start = config.train_lookback + config.lookback_z
+    bars = range(start, len(prices))
+    n_pairs = len(streams)
+    P = len(bars) * n_pairs
+
+    sig_ts = np.empty(P, dtype=object)
+    sig_z = np.empty(P)
+    sig_pos = np.empty(P)
+    sig_a = np.empty(P)
+    sig_b = np.empty(P)
+    acct = np.empty(len(bars))
+
+    fast = isinstance(broker, ArrayPaperBroker)
+    if fast:
+        bid = broker.register(tickers)
+        price_buf = np.full(len(broker.registry), np.nan)
+        # interleaved (y0, x0, y1, x1, ...) so shared legs sum in pair order
+        leg_idx = np.array([col[t] for pair in config.pairs for t in pair], dtype=np.int64)
+        leg_val = np.empty(2 * n_pairs)
+        targets = np.empty(len(tickers))
+    notional = config.notional_per_pair
+    rec = recorder or NULL_RECORDER
+    names = [f"{ps.y}/{ps.x}" for ps in streams]
+
+    t0 = time.perf_counter()
+    k = 0
+    for j, i in enumerate(bars):
+        row = px[i]
+        ts = dates[i]
+        with rec.stage("step"):
+            for p, ps in enumerate(streams):
+                n = int(ps.n_valid[i])
+                with rec.stage("signal", names[p]):
+                    z, pos, a, b, sts = _signal_at(ps, n, config)
+                sig_ts[k], sig_z[k], sig_pos[k], sig_a[k], sig_b[k] = sts, z, pos, a, b
+                k += 1
+
+            base = k - n_pairs
+            if fast:
+                with rec.stage("orders"):
+                    price_buf[:] = np.nan
+                    price_buf[bid] = row
+                    broker.set_price_array(price_buf)
+
+                    pos_v = sig_pos[base:k]
+                    leg_val[0::2] = pos_v * notional / np.maximum(row[leg_idx[0::2]], 1e-6)
+                    leg_val[1::2] = pos_v * (-sig_b[base:k]) * notional / np.maximum(row[leg_idx[1::2]], 1e-6)
+                    targets[:] = 0.0
+                    np.add.at(targets, leg_idx, leg_val)
+
+                    delta = targets - broker.positions[bid]
+                    m = np.abs(delta) > 0.01
+                with rec.stage("broker"):
+                    if m.any():
+                        broker.submit_order_arrays(bid[m], delta[m], timestamp=ts)
+            else:
+                with rec.stage("orders"):
+                    broker.set_current_prices({t: float(row[c]) for t, c in col.items()})
+                    signals = [
+                        PairSignal(
+                            y_ticker=ps.y, x_ticker=ps.x, z_score=sig_z[base + p],
+                            position=sig_pos[base + p], alpha=sig_a[base + p], beta=sig_b[base + p],
+                            timestamp=sig_ts[base + p],
+                        )
+                        for p, ps in enumerate(streams)
+                    ]
+                    last_prices = {t: float(row[c]) for t, c in col.items()}
+                    targets_d = aggregate_target_positions(signals, last_prices, notional)
+                    orders = net_orders(targets_d, broker.get_all_positions(), timestamp=ts)
+                with rec.stage("broker"):
+                    if orders:
+                        broker.submit_orders(orders)
+
+        acct[j] = broker.get_account_value()
+    elapsed = time.perf_counter() - t0
+
+    signals_df = pd.DataFrame(
+        {
+            "timestamp": sig_ts,
+            "y": np.tile([ps.y for ps in streams], len(bars)),
+            "x": np.tile([ps.x for ps in streams], len(bars)),
+            "z_score": sig_z,
+            "position": sig_pos,
+            "alpha": sig_a,
+            "beta": sig_b,
+        }
+    )
+    n_fills = len(broker.fills) if fast else len(broker.get_fill_history())
+    return ReplayReport(
+        signals=signals_df,
+        account_value=pd.Series(acct, index=dates[start:], name="account_value"),
+        n_bars=len(bars),
+        n_fills=n_fills,
+        elapsed=elapsed,
+    )
@@ -3,6 +3,7 @@ from dataclasses import dataclass, field
 import pandas as pd
 
 from sarb.live.broker import BaseBroker, Order
+from sarb.live.latency import LatencyRecorder, NULL_RECORDER
 from sarb.live.signal import generate_live_signal, PairSignal
 from sarb.risk.limits import RiskLimits
 
@@ -14,7 +15,7 @@ class LiveConfig:
     entry_z: float = 2.0
     exit_z: float = 0.5
     train_lookback: int = 504
-    hedge_method: str = "ols"
+    hedge_method: str = "ols"  # "ols", "tls" or "kalman"
     risk_limits: RiskLimits = field(default_factory=RiskLimits)
     notional_per_pair: float = 10_000.0
 
@@ -23,43 +24,92 @@ def run_live_step(
     prices: pd.DataFrame,
     config: LiveConfig,
     broker: BaseBroker,
+    recorder: LatencyRecorder | None = None,
 ) -> list[PairSignal]:
     """
-    Single step: generate signals for all pairs, compute target positions,
-    and submit orders to broker.
+    Single step: generate signals for all pairs, aggregate target positions
+    per ticker across pairs (shared legs are netted), diff once against
+    current holdings and submit one batched order list to the broker.
+
+    recorder: optional LatencyRecorder; times every signal stage per pair
+              plus "orders", "broker" and the whole "step".
     """
-    signals: list[PairSignal] = []
-    account_value = broker.get_account_value()
+    rec = recorder or NULL_RECORDER
+    with rec.stage("step"):
+        signals = compute_pair_signals(prices, config, recorder)
+        with rec.stage("orders"):
+            orders = target_orders(prices, signals, config, broker.get_all_positions())
+        with rec.stage("broker"):
+            if orders:
+                broker.submit_orders(orders)
+
+    return signals
 
-    for y, x in config.pairs:
-        sig = generate_live_signal(
+
+def compute_pair_signals(
+    prices: pd.DataFrame,
+    config: LiveConfig,
+    recorder: LatencyRecorder | None = None,
+) -> list[PairSignal]:
+    """Latest signal for every configured pair (CPU-only, no broker calls)."""
+    return [
+        generate_live_signal(
             prices, y, x,
             lookback_z=config.lookback_z,
             entry_z=config.entry_z,
             exit_z=config.exit_z,
             train_lookback=config.train_lookback,
             hedge_method=config.hedge_method,
+            recorder=recorder,
         )
-        signals.append(sig)
+        for y, x in config.pairs
+    ]
 
-        # Convert signal to target dollar positions
-        notional = config.notional_per_pair
-        target_y_shares = sig.position * notional / max(prices[y].iloc[-1], 1e-6)
-        target_x_shares = sig.position * (-sig.beta) * notional / max(prices[x].iloc[-1], 1e-6)
 
-        # Compute deltas from current positions
-        current_y = broker.get_position(y)
-        current_x = broker.get_position(x)
+def aggregate_target_positions(
+    signals: list[PairSignal],
+    last_prices: dict[str, float],
+    notional_per_pair: float,
+) -> dict[str, float]:
+    """
+    Portfolio-level target shares per ticker: each pair's leg targets are
+    summed, so a ticker shared by several pairs gets one net target.
+    Every configured ticker appears (0.0 when flat) so stale holdings close.
+    """
+    targets: dict[str, float] = {}
+    for sig in signals:
+        y, x = sig.y_ticker, sig.x_ticker
+        ty = sig.position * notional_per_pair / max(last_prices[y], 1e-6)
+        tx = sig.position * (-sig.beta) * notional_per_pair / max(last_prices[x], 1e-6)
+        targets[y] = targets.get(y, 0.0) + ty
+        targets[x] = targets.get(x, 0.0) + tx
+    return targets
 
-        delta_y = target_y_shares - current_y
-        delta_x = target_x_shares - current_x
 
-        ts = prices.index[-1]
+def net_orders(
+    targets: dict[str, float],
+    positions: dict[str, float],
+    timestamp=None,
+    min_quantity: float = 0.01,
+) -> list[Order]:
+    """One order per ticker for the difference between target and held shares."""
+    orders = []
+    for tkr, target in targets.items():
+        delta = target - positions.get(tkr, 0.0)
+        if abs(delta) > min_quantity:
+            orders.append(Order(ticker=tkr, quantity=delta, timestamp=timestamp))
+    return orders
 
-        # Submit orders for non-trivial deltas
-        if abs(delta_y) > 0.01:
-            broker.submit_order(Order(ticker=y, quantity=delta_y, timestamp=ts))
-        if abs(delta_x) > 0.01:
-            broker.submit_order(Order(ticker=x, quantity=delta_x, timestamp=ts))
 
-    return signals
+def target_orders(
+    prices: pd.DataFrame,
+    signals: list[PairSignal],
+    config: LiveConfig,
+    positions: dict[str, float],
+) -> list[Order]:
+    """Netted per-ticker orders that move `positions` to the signals' targets at the last prices."""
+    last = prices.iloc[-1]
+    tickers = {t for s in signals for t in (s.y_ticker, s.x_ticker)}
+    last_prices = {t: float(last[t]) for t in tickers}
+    targets = aggregate_target_positions(signals, last_prices, config.notional_per_pair)
+    return net_orders(targets, positions, timestamp=prices.index[-1])
@@ -1,9 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
-from sarb.features.spread import fit_hedge_ratio, compute_spread, rolling_zscore
-from sarb.strategy.pairs import generate_spread_positions
+from sarb.live.latency import LatencyRecorder, NULL_RECORDER
+from sarb.features.spread import HEDGE_METHODS, fit_hedge_ratio, compute_spread, rolling_zscore
+from sarb.strategy.pairs import generate_spread_positions, final_spread_state
 
 
 @dataclass(frozen=True)
@@ -17,6 +20,19 @@ class PairSignal:
     timestamp: pd.Timestamp
 
 
+def _fit_hedge(y, x, hedge_method: str) -> tuple[float, float]:
+    """Train-window hedge for the live paths: "ols", "tls" or "kalman" (final filter state)."""
+    if hedge_method == "kalman":
+        from sarb.features.kalman import fit_hedge_ratio_kalman
+        return fit_hedge_ratio_kalman(pd.Series(y), pd.Series(x))
+    return fit_hedge_ratio(y, x, hedge_method)
+
+
+def _check_hedge_method(hedge_method: str) -> None:
+    if hedge_method != "kalman" and hedge_method not in HEDGE_METHODS:
+        raise ValueError(f"Unknown hedge method: {hedge_method}")
+
+
 def generate_live_signal(
     prices: pd.DataFrame,
     y: str,
@@ -26,13 +42,22 @@ def generate_live_signal(
     exit_z: float = 0.5,
     train_lookback: int = 504,
     hedge_method: str = "ols",
+    recorder: LatencyRecorder | None = None,
 ) -> PairSignal:
     """
     Generate signal from the latest available data.
     Uses the last train_lookback days to fit hedge ratio,
     then computes current z-score and position.
+
+    recorder: optional LatencyRecorder timing the slice / fit_hedge /
+              zscore / positions stages for this pair.
     """
-    px = prices[[y, x]].dropna().tail(train_lookback + lookback_z)
+    _check_hedge_method(hedge_method)
+    rec = recorder or NULL_RECORDER
+    name = f"{y}/{x}"
+
+    with rec.stage("slice", name):
+        px = prices[[y, x]].dropna().tail(train_lookback + lookback_z)
     if len(px) < train_lookback:
         return PairSignal(
             y_ticker=y, x_ticker=x, z_score=0.0, position=0.0,
@@ -41,15 +66,14 @@ def generate_live_signal(
 
     train = px.iloc[:train_lookback]
 
-    if hedge_method == "kalman":
-        from sarb.features.kalman import fit_hedge_ratio_kalman
-        alpha, beta = fit_hedge_ratio_kalman(train[y], train[x])
-    else:
-        alpha, beta = fit_hedge_ratio(train[y], train[x])
+    with rec.stage("fit_hedge", name):
+        alpha, beta = _fit_hedge(train[y], train[x], hedge_method)
 
-    spread = compute_spread(px[y], px[x], alpha, beta)
-    z = rolling_zscore(spread, lookback_z)
-    pos = generate_spread_positions(z, entry_z, exit_z)
+    with rec.stage("zscore", name):
+        spread = compute_spread(px[y], px[x], alpha, beta)
+        z = rolling_zscore(spread, lookback_z)
+    with rec.stage("positions", name):
+        pos = generate_spread_positions(z, entry_z, exit_z)
 
     return PairSignal(
         y_ticker=y,
@@ -60,3 +84,42 @@ def generate_live_signal(
         beta=beta,
         timestamp=px.index[-1],
     )
+
+
+def window_signal(
+    y: np.ndarray,
+    x: np.ndarray,
+    lookback_z: int = 60,
+    entry_z: float = 2.0,
+    exit_z: float = 0.5,
+    train_lookback: int = 504,
+    hedge_method: str = "ols",
+) -> tuple[float, float, float, float]:
+    """
+    Array version of generate_live_signal: (z_score, position, alpha, beta)
+    from the latest NaN-free rows of a pair (only the last
+    train_lookback + lookback_z are used). No DataFrame slicing, so replay
+    and restored live state can call it once per bar.
+    """
+    _check_hedge_method(hedge_method)
+    w = train_lookback + lookback_z
+    y, x = y[-w:], x[-w:]
+    if len(y) < train_lookback:
+        return 0.0, 0.0, 0.0, 0.0
+
+    alpha, beta = _fit_hedge(y[:train_lookback], x[:train_lookback], hedge_method)
+
+    spread = y - (alpha + beta * x)
+    if len(spread) < lookback_z:
+        return 0.0, 0.0, alpha, beta
+
+    win = sliding_window_view(spread, lookback_z)
+    mu = win.mean(axis=1)
+    sd = np.sqrt(((win - mu[:, None]) ** 2).mean(axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (spread[lookback_z - 1 :] - mu) / sd
+
+    # position is shifted by one bar: state after all but the last z
+    pos = final_spread_state(z[:-1], entry_z, exit_z)
+    z_last = float(z[-1])
+    return (z_last if z_last == z_last else 0.0), pos, alpha, beta
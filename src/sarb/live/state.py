@@ -0,0 +1,287 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+import numpy as np
+import pandas as pd
+
+from sarb.live.broker import BaseBroker
+from sarb.live.runner import LiveConfig, target_orders
+from sarb.live.signal import PairSignal, window_signal
+
+FORMAT_VERSION = 1
+_MAGIC = b"SARBSNAP"
+# magic, format version, meta length, payload length, crc32(meta + payload)
+_HEADER = struct.Struct("<8sIQQI")
+
+
+class SnapshotError(ValueError):
+    """Snapshot is corrupt, from another format version, or from another config."""
+
+
+@dataclass
+class PairState:
+    """Compact per-pair live state: the price window the signal needs, plus its last outputs."""
+
+    y: str
+    x: str
+    window: np.ndarray           # (n, 2) last NaN-free [y, x] rows, n <= train_lookback + lookback_z
+    alpha: float = 0.0
+    beta: float = 0.0
+    z_score: float = 0.0
+    position: float = 0.0        # hysteresis state carried to the next bar
+    timestamp: pd.Timestamp | None = None
+
+    def advance(self, y_px: float, x_px: float, ts: pd.Timestamp, config: LiveConfig) -> PairSignal:
+        """Append one bar (skipped for the pair if either leg is missing) and recompute the signal."""
+        if np.isfinite(y_px) and np.isfinite(x_px):
+            cap = config.train_lookback + config.lookback_z
+            self.window = np.vstack([self.window[-(cap - 1):], [[y_px, x_px]]])
+            self.timestamp = ts
+            self.z_score, self.position, self.alpha, self.beta = window_signal(
+                self.window[:, 0], self.window[:, 1],
+                lookback_z=config.lookback_z,
+                entry_z=config.entry_z,
+                exit_z=config.exit_z,
+                train_lookback=config.train_lookback,
+                hedge_method=config.hedge_method,
+            )
+        return self.signal()
+
+    def signal(self) -> PairSignal:
+        return PairSignal(
+            y_ticker=self.y, x_ticker=self.x, z_score=self.z_score, position=self.position,
+            alpha=self.alpha, beta=self.beta, timestamp=self.timestamp,
+        )
+
+
+@dataclass
+class LiveState:
+    config_key: str
+    timestamp: pd.Timestamp
+    pairs: list[PairState]
+    cash: float
+    positions: dict[str, float]
+
+
+def config_fingerprint(config: LiveConfig) -> str:
+    """Short hash of the config fields that shape the signal state."""
+    key = json.dumps(
+        {
+            "pairs": [list(p) for p in config.pairs],
+            "lookback_z": config.lookback_z,
+            "entry_z": config.entry_z,
+            "exit_z": config.exit_z,
+            "train_lookback": config.train_lookback,
+            "hedge_method": config.hedge_method,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def capture_live_state(prices: pd.DataFrame, config: LiveConfig, broker: BaseBroker) -> LiveState:
+    """Build the live state at the last bar of prices (broker must implement export_state)."""
+    cap = config.train_lookback + config.lookback_z
+    pairs = []
+    for y, x in config.pairs:
+        px = prices[[y, x]].dropna().tail(cap)
+        ps = PairState(y=y, x=x, window=px.to_numpy(dtype=np.float64))
+        if len(px):
+            ps.timestamp = px.index[-1]
+            ps.z_score, ps.position, ps.alpha, ps.beta = window_signal(
+                ps.window[:, 0], ps.window[:, 1],
+                lookback_z=config.lookback_z,
+                entry_z=config.entry_z,
+                exit_z=config.exit_z,
+                train_lookback=config.train_lookback,
+                hedge_method=config.hedge_method,
+            )
+        pairs.append(ps)
+
+    cash, positions = broker.export_state()
+    return LiveState(
+        config_key=config_fingerprint(config),
+        timestamp=prices.index[-1],
+        pairs=pairs,
+        cash=float(cash),
+        positions=dict(positions),
+    )
+
+
+def _ts(v) -> str | None:
+    return None if v is None else pd.Timestamp(v).isoformat()
+
+
+def save_snapshot(state: LiveState, path: str | os.PathLike) -> None:
+    """
+    Write the state to one binary file atomically: temp file in the same
+    directory, fsync, then os.replace. Layout: fixed header, JSON metadata
+    (padded to 8 bytes), then one float64 payload holding every pair window
+    followed by the position quantities.
+    """
+    tickers = list(state.positions)
+    meta = {
+        "config_key": state.config_key,
+        "timestamp": _ts(state.timestamp),
+        "saved_at": pd.Timestamp.now(tz="UTC").isoformat(),
+        "cash": state.cash,
+        "tickers": tickers,
+        "pairs": [
+            {
+                "y": p.y, "x": p.x, "n": int(len(p.window)),
+                "alpha": p.alpha, "beta": p.beta, "z_score": p.z_score,
+                "position": p.position, "timestamp": _ts(p.timestamp),
+            }
+            for p in state.pairs
+        ],
+    }
+    meta_b = json.dumps(meta).encode()
+    meta_b += b" " * (-(_HEADER.size + len(meta_b)) % 8)
+
+    parts = [np.ascontiguousarray(p.window, dtype=np.float64).ravel() for p in state.pairs]
+    parts.append(np.array([state.positions[t] for t in tickers], dtype=np.float64))
+    payload = np.concatenate(parts).tobytes() if parts else b""
+
+    crc = zlib.crc32(payload, zlib.crc32(meta_b))
+    header = _HEADER.pack(_MAGIC, FORMAT_VERSION, len(meta_b), len(payload), crc)
+
+    path = os.fspath(path)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".snap-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(meta_b)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _check_snapshot(
+    mm: mmap.mmap,
+    path: str | os.PathLike,
+    config: LiveConfig | None,
+    max_age: pd.Timedelta | None,
+) -> tuple[dict, int, int]:
+    """Validate a mapped snapshot; returns (meta, payload offset, payload length)."""
+    if len(mm) < _HEADER.size:
+        raise SnapshotError(f"{path}: truncated header")
+    magic, version, meta_len, payload_len, crc = _HEADER.unpack_from(mm, 0)
+    if magic != _MAGIC:
+        raise SnapshotError(f"{path}: not a live-state snapshot")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"{path}: format version {version}, expected {FORMAT_VERSION}")
+    meta_off = _HEADER.size
+    payload_off = meta_off + meta_len
+    if len(mm) != payload_off + payload_len:
+        raise SnapshotError(f"{path}: truncated snapshot")
+
+    with memoryview(mm) as view:
+        if zlib.crc32(view[payload_off:], zlib.crc32(view[meta_off:payload_off])) != crc:
+            raise SnapshotError(f"{path}: checksum mismatch")
+        meta = json.loads(bytes(view[meta_off:payload_off]))
+
+    if config is not None and meta["config_key"] != config_fingerprint(config):
+        raise SnapshotError(f"{path}: snapshot was taken with a different LiveConfig")
+    if max_age is not None:
+        age = pd.Timestamp.now(tz="UTC") - pd.Timestamp(meta["saved_at"])
+        if age > max_age:
+            raise SnapshotError(f"{path}: snapshot is {age} old (max {max_age})")
+    return meta, payload_off, payload_len
+
+
+def load_snapshot(
+    path: str | os.PathLike,
+    config: LiveConfig | None = None,
+    max_age: pd.Timedelta | None = None,
+) -> LiveState:
+    """
+    Memory-map a snapshot and rebuild the state; pair windows are read-only
+    views into the mapping. Raises SnapshotError if the magic, version or
+    checksum do not match, if config is given and its fingerprint differs,
+    or if the snapshot was saved longer than max_age ago; the mapping is
+    closed before raising.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            raise SnapshotError(f"{path}: empty snapshot")
+    try:
+        meta, payload_off, payload_len = _check_snapshot(mm, path, config, max_age)
+    except BaseException:
+        mm.close()
+        raise
+
+    data = np.frombuffer(mm, dtype=np.float64, offset=payload_off, count=payload_len // 8)
+    pairs = []
+    off = 0
+    for p in meta["pairs"]:
+        n = p["n"]
+        pairs.append(
+            PairState(
+                y=p["y"], x=p["x"],
+                window=data[off : off + 2 * n].reshape(n, 2),
+                alpha=p["alpha"], beta=p["beta"], z_score=p["z_score"], position=p["position"],
+                timestamp=None if p["timestamp"] is None else pd.Timestamp(p["timestamp"]),
+            )
+        )
+        off += 2 * n
+    qty = data[off:]
+
+    return LiveState(
+        config_key=meta["config_key"],
+        timestamp=None if meta["timestamp"] is None else pd.Timestamp(meta["timestamp"]),
+        pairs=pairs,
+        cash=meta["cash"],
+        positions={t: float(q) for t, q in zip(meta["tickers"], qty)},
+    )
+
+
+def restore_live_state(
+    path: str | os.PathLike,
+    config: LiveConfig,
+    broker: BaseBroker,
+    max_age: pd.Timedelta | None = None,
+) -> LiveState:
+    """Load a snapshot for config and put its cash/positions back into broker."""
+    state = load_snapshot(path, config=config, max_age=max_age)
+    broker.restore_state(state.cash, state.positions)
+    return state
+
+
+def run_live_step_from_state(
+    state: LiveState,
+    bar: pd.Series,
+    config: LiveConfig,
+    broker: BaseBroker,
+) -> list[PairSignal]:
+    """
+    Live step from saved state instead of a reloaded price history: bar is
+    one row of prices (name = timestamp). Advances every pair window,
+    submits netted orders and refreshes the state's broker fields, so the
+    state can be snapshotted again. Same signals/orders as run_live_step
+    on the full history ending at bar.
+    """
+    ts = pd.Timestamp(bar.name)
+    signals = [
+        ps.advance(float(bar[ps.y]), float(bar[ps.x]), ts, config)
+        for ps in state.pairs
+    ]
+    orders = target_orders(bar.to_frame().T, signals, config, broker.get_all_positions())
+    if orders:
+        broker.submit_orders(orders)
+
+    state.timestamp = ts
+    state.cash, state.positions = broker.export_state()
+    return signals
@@ -1,8 +1,9 @@
 from __future__ import annotations
+from dataclasses import dataclass
 import numpy as np
 import pandas as pd
 
-def sharpe(daily_returns: pd.Series, ann_factor: int = 252) -> float:
+def sharpe(daily_returns: pd.Series, ann_factor: float = 252) -> float:
     r = daily_returns.dropna()
     if r.std(ddof=0) == 0:
         return 0.0
@@ -14,10 +15,188 @@ def max_drawdown(equity: pd.Series) -> float:
     dd = (eq / peak) - 1.0
     return float(dd.min()) if len(dd) else 0.0
 
-def cagr(equity: pd.Series, ann_factor: int = 252) -> float:
+def cagr(equity: pd.Series, ann_factor: float = 252) -> float:
     eq = equity.dropna()
     if len(eq) < 2:
         return 0.0
     total = eq.iloc[-1] / eq.iloc[0]
     years = len(eq) / ann_factor
     return float(total ** (1 / years) - 1) if years > 0 else 0.0
+
+
+@dataclass
+class MetricsAccumulator:
+    """
+    Streaming Sharpe / max drawdown / CAGR / turnover / hit rate, O(1) per return.
+
+    Mean and variance use Welford's update; equity compounds the returns and
+    the running peak starts at the first equity point, so sharpe() and
+    max_drawdown() agree with the batch functions on (1 + r).cumprod().
+    cagr() is the annualized growth of all compounded returns.
+    NaN returns are skipped, like dropna() in the batch functions.
+
+    merge() combines accumulators from parallel workers; the other
+    accumulator is treated as the period that follows this one.
+    """
+
+    ann_factor: float = 252
+
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    equity: float = 1.0
+    peak: float = float("nan")
+    min_equity: float = float("nan")   # lowest equity seen, for exact merges
+    max_dd: float = 0.0
+    turnover_sum: float = 0.0
+    n_turnover: int = 0
+    n_pos: int = 0
+    n_nonzero: int = 0
+
+    def update(self, ret: float, turnover: float | None = None) -> None:
+        if turnover is not None and turnover == turnover:
+            self.turnover_sum += turnover
+            self.n_turnover += 1
+        if ret != ret:  # NaN
+            return
+
+        self.n += 1
+        delta = ret - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (ret - self.mean)
+
+        self.equity *= 1.0 + ret
+        if self.n == 1 or self.equity > self.peak:
+            self.peak = self.equity
+        if self.n == 1 or self.equity < self.min_equity:
+            self.min_equity = self.equity
+        dd = self.equity / self.peak - 1.0
+        if dd < self.max_dd:
+            self.max_dd = dd
+
+        if ret != 0.0:
+            self.n_nonzero += 1
+            if ret > 0.0:
+                self.n_pos += 1
+
+    def update_many(self, returns, turnover=None) -> None:
+        r = np.asarray(returns, dtype=np.float64)
+        if turnover is None:
+            for ri in r:
+                self.update(float(ri))
+        else:
+            for ri, ti in zip(r, np.asarray(turnover, dtype=np.float64)):
+                self.update(float(ri), float(ti))
+
+    def merge(self, other: MetricsAccumulator) -> MetricsAccumulator:
+        """Combine with the accumulator of the *following* period (Chan et al. for moments)."""
+        out = MetricsAccumulator(ann_factor=self.ann_factor)
+        out.turnover_sum = self.turnover_sum + other.turnover_sum
+        out.n_turnover = self.n_turnover + other.n_turnover
+        out.n_pos = self.n_pos + other.n_pos
+        out.n_nonzero = self.n_nonzero + other.n_nonzero
+
+        if self.n == 0 or other.n == 0:
+            src = other if self.n == 0 else self
+            for f in ("n", "mean", "m2", "equity", "peak", "min_equity", "max_dd"):
+                setattr(out, f, getattr(src, f))
+            return out
+
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        out.n = n
+        out.mean = self.mean + delta * other.n / n
+        out.m2 = self.m2 + other.m2 + delta * delta * self.n * other.n / n
+
+        # Other's path is scaled by our final equity. Its drawdown against the
+        # combined peak is min(own drawdown, its lowest point vs our peak).
+        out.equity = self.equity * other.equity
+        out.peak = max(self.peak, self.equity * other.peak)
+        out.min_equity = min(self.min_equity, self.equity * other.min_equity)
+        out.max_dd = min(
+            self.max_dd,
+            other.max_dd,
+            self.equity * other.min_equity / self.peak - 1.0,
+        )
+        return out
+
+    def sharpe(self) -> float:
+        if self.n == 0 or self.m2 <= 0.0:
+            return 0.0
+        return float(self.mean / np.sqrt(self.m2 / self.n) * np.sqrt(self.ann_factor))
+
+    def max_drawdown(self) -> float:
+        return float(self.max_dd)
+
+    def drawdown(self) -> float:
+        return float(self.equity / self.peak - 1.0) if self.n else 0.0
+
+    def cagr(self) -> float:
+        if self.n < 2 or self.equity <= 0.0:
+            return 0.0
+        return float(self.equity ** (self.ann_factor / self.n) - 1.0)
+
+    def avg_turnover(self) -> float:
+        return self.turnover_sum / self.n_turnover if self.n_turnover else 0.0
+
+    def hit_rate(self) -> float:
+        """Share of non-zero returns that were positive."""
+        return self.n_pos / self.n_nonzero if self.n_nonzero else 0.0
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "n": self.n,
+            "sharpe": self.sharpe(),
+            "max_drawdown": self.max_drawdown(),
+            "cagr": self.cagr(),
+            "avg_turnover": self.avg_turnover(),
+            "hit_rate": self.hit_rate(),
+        }
+
+
+def metrics_matrix(
+    returns: pd.DataFrame,
+    turnover: pd.DataFrame | None = None,
+    ann_factor: float = 252,
+) -> pd.DataFrame:
+    """
+    Batch variant of MetricsAccumulator: the same metrics for every column of
+    a returns matrix in one vectorized pass. Returns one row per column.
+    NaN returns are skipped (they leave equity unchanged).
+    """
+    R = returns.to_numpy(dtype=np.float64)
+    valid = np.isfinite(R)
+    n = valid.sum(axis=0)
+    R0 = np.where(valid, R, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = R0.sum(axis=0) / n
+        sd = np.sqrt((np.where(valid, R0 - mean, 0.0) ** 2).sum(axis=0) / n)
+        sh = np.where(sd > 0, mean / sd * np.sqrt(ann_factor), 0.0)
+
+        eq = np.cumprod(1.0 + R0, axis=0)
+        # running peak starts at each column's first valid observation
+        started = np.cumsum(valid, axis=0) > 0
+        peak = np.maximum.accumulate(np.where(started, eq, -np.inf), axis=0)
+        dd = np.where(started, eq / peak - 1.0, 0.0)
+        mdd = dd.min(axis=0) if len(R0) else np.zeros(R0.shape[1])
+
+        growth = eq[-1] if len(R0) else np.ones(R0.shape[1])
+        g = np.where((n >= 2) & (growth > 0), growth ** (ann_factor / n) - 1.0, 0.0)
+
+    nonzero = (R0 != 0.0).sum(axis=0)
+    hit = np.where(nonzero > 0, (R0 > 0.0).sum(axis=0) / np.maximum(nonzero, 1), 0.0)
+
+    out = pd.DataFrame(
+        {
+            "n": n,
+            "sharpe": np.nan_to_num(sh),
+            "max_drawdown": mdd,
+            "cagr": g,
+            "hit_rate": hit,
+        },
+        index=returns.columns,
+    )
+    if turnover is not None:
+        out["avg_turnover"] = turnover.mean(axis=0).fillna(0.0).reindex(returns.columns).values
+    return out
@@ -0,0 +1,159 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+from sarb.config import bars_per_day
+from sarb.risk.limits import RiskLimits, DrawdownState, _apply_position_limits_array
+
+
+@dataclass(frozen=True)
+class DailyPortfolioConfig:
+    # Vol targeting (per pair, EWMA vol of past pair returns)
+    use_vol_targeting: bool = True
+    target_daily_vol: float = 0.008
+    max_pair_scale: float = 3.0
+    vol_halflife: float = 63.0   # trading days
+    min_obs: int = 30            # trading days; same warmup as realized_vol
+    min_vol: float = 1e-6
+
+    # Correlation-aware weights from a streaming Ledoit-Wolf covariance
+    use_correlation_weights: bool = False
+    cov_halflife: float = 63.0   # trading days
+    max_weight: float = 0.5
+
+    # Position limits + streaming drawdown kill switch
+    risk_limits: RiskLimits | None = None
+
+    # Sampling of pair_returns; the day-denominated settings above are
+    # converted to bars with bars_per_day(bar_freq)
+    bar_freq: str = "1D"
+
+
+def run_daily_portfolio(
+    pair_returns: pd.DataFrame,
+    cfg: DailyPortfolioConfig = DailyPortfolioConfig(),
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Daily-rebalanced portfolio over a matrix of per-pair net returns.
+
+    pair_returns: dates x pairs, unscaled pair returns; NaN = pair not held
+                  that day (e.g. outside the quarter it was selected for).
+
+    Each day t, using only returns up to t-1:
+      - per-pair vol scale = target / EWMA vol (0 until min_obs returns seen)
+      - weights: equal across active pairs with a non-zero scale, or
+        correlation-aware from the streaming covariance of scaled returns
+      - position limits, then the drawdown kill switch (latches once hit)
+    then applies day t's returns and updates every state incrementally.
+    Vol, limits and drawdown are O(pairs) per day; the covariance update is
+    O(pairs^2) and only runs with use_correlation_weights.
+
+    With intraday bars (cfg.bar_freq) the target vol is rescaled per bar by
+    sqrt(bars_per_day) and the halflives and warm-up are counted in bars.
+
+    Returns (out, weights): out has ret_net, equity, drawdown, gross,
+    turnover, n_active, breaker; weights holds the effective per-pair
+    exposure (weight * vol scale) applied each day.
+    """
+    R = pair_returns.to_numpy(dtype=np.float64)
+    T, P = R.shape
+    active = np.isfinite(R)
+    R0 = np.where(active, R, 0.0)
+
+    bpd = bars_per_day(cfg.bar_freq)
+    target_vol = cfg.target_daily_vol / np.sqrt(bpd)
+    min_obs = int(np.ceil(cfg.min_obs * bpd))
+    lam = 0.5 ** (1.0 / (cfg.vol_halflife * bpd))
+    ew_w = np.zeros(P)      # sum of weights per pair
+    ew_m = np.zeros(P)      # EWMA mean
+    ew_v = np.zeros(P)      # EWMA variance (bias-uncorrected, like ddof=0)
+    n_obs = np.zeros(P, dtype=np.int64)
+
+    cov_est = None
+    if cfg.use_correlation_weights:
+        from sarb.risk.covariance import EWMCovariance, _correlation_aware_weights_array
+        cov_est = EWMCovariance(n_assets=P, halflife=cfg.cov_halflife * bpd)
+
+    dd_state = DrawdownState()
+    limits = cfg.risk_limits
+
+    port_ret = np.zeros(T)
+    drawdown = np.zeros(T)
+    gross = np.zeros(T)
+    turnover = np.zeros(T)
+    n_active = active.sum(axis=1)
+    breaker = np.zeros(T, dtype=bool)
+    exposures = np.zeros((T, P))
+    prev = np.zeros(P)
+
+    for t in range(T):
+        act = active[t]
+
+        # 1) vol scales from past returns only
+        if cfg.use_vol_targeting:
+            vol = np.sqrt(ew_v)
+            ok = (n_obs >= min_obs) & (vol >= cfg.min_vol)
+            scale = np.zeros(P)
+            np.divide(target_vol, vol, out=scale, where=ok)
+            np.clip(scale, 0.0, cfg.max_pair_scale, out=scale)
+        else:
+            scale = np.ones(P)
+
+        # 2) weights across active pairs past their vol warm-up (scale 0
+        #    pairs would otherwise take weight and contribute nothing)
+        w = np.zeros(P)
+        idx = np.flatnonzero(act & (scale > 0))
+        k = len(idx)
+        if k > 0:
+            if cov_est is not None and k >= 2 and cov_est.n_eff >= 2:
+                cov = cov_est.ledoit_wolf()[np.ix_(idx, idx)]
+                s = scale[idx]
+                w[idx] = _correlation_aware_weights_array(
+                    cov * np.outer(s, s), target_vol, cfg.max_weight,
+                )
+            else:
+                w[idx] = 1.0 / k
+
+        # 3) limits + drawdown kill switch
+        if limits is not None:
+            w = _apply_position_limits_array(w, limits)
+            if dd_state.breached(limits):
+                w[:] = 0.0
+                breaker[t] = True
+
+        expo = w * scale
+        port_ret[t] = float(expo @ R0[t])
+        turnover[t] = float(np.abs(expo - prev).sum())
+        gross[t] = float(np.abs(expo).sum())
+        exposures[t] = expo
+        prev = expo
+
+        # 4) incremental state updates with today's returns
+        drawdown[t] = dd_state.update(port_ret[t])
+
+        x = R0[t]
+        ew_w = np.where(act, lam * ew_w + 1.0, ew_w)
+        a = np.divide(1.0, ew_w, out=np.zeros(P), where=act)
+        delta = x - ew_m
+        ew_m = ew_m + a * delta
+        ew_v = np.where(act, (1.0 - a) * (ew_v + a * delta * delta), ew_v)
+        n_obs += act
+
+        if cov_est is not None:
+            cov_est.update(x)
+
+    out = pd.DataFrame(
+        {
+            "ret_net": port_ret,
+            "drawdown": drawdown,
+            "gross": gross,
+            "turnover": turnover,
+            "n_active": n_active,
+            "breaker": breaker,
+        },
+        index=pair_returns.index,
+    )
+    out["equity"] = (1.0 + out["ret_net"]).cumprod()
+    weights = pd.DataFrame(exposures, index=pair_returns.index, columns=pair_returns.columns)
+    return out, weights
@@ -29,3 +29,23 @@ def vol_target_scale(
     s = target_daily_vol / v
     s = float(np.clip(s, 0.0, max_scale))
     return s
+
+def vol_target_scales(
+    returns: np.ndarray,
+    target_daily_vol: float,
+    max_scale: float = 3.0,
+    min_vol: float = 1e-6,
+) -> np.ndarray:
+    """
+    vol_target_scale for every row of a (pairs x days) return matrix in one
+    array pass; NaN entries are missing days, like dropna() per series.
+    """
+    r = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    ok = ~np.isnan(r)
+    n = ok.sum(axis=1)
+    r0 = np.where(ok, r, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = r0.sum(axis=1) / n
+        v = np.sqrt((np.where(ok, r - mean[:, None], 0.0) ** 2).sum(axis=1) / n)
+        s = np.clip(target_daily_vol / v, 0.0, max_scale)
+    return np.where((n >= 30) & np.isfinite(v) & (v >= min_vol), s, 0.0)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from sarb.backtest.engine import backtest_basket
+from sarb.features.spread import rolling_zscore
+from sarb.research.context import ResearchData
+from sarb.stats.johansen import JohansenMoments, johansen_batch
+from sarb.strategy.pairs import generate_spread_positions
+
+
+@dataclass(frozen=True)
+class BasketResult:
+    tickers: tuple[str, ...]
+    weights: tuple[float, ...]   # leading cointegrating vector, first leg 1
+    trace_stat: float            # Johansen trace statistic, H0: rank 0
+    trace_ratio: float           # trace_stat / critical value at the search level
+    rank: int
+    eig: float
+
+
+class BasketSearch:
+    """
+    Johansen basket search over one training window. The cross-moment
+    cache (JohansenMoments) and leg correlations are built once for every
+    ticker complete over the window, so any number of searches (clusters,
+    sizes, thresholds) only gather sub-blocks and run batched eigen-solves.
+    """
+
+    def __init__(self, prices: pd.DataFrame | ResearchData, train_idx: pd.Index | slice, k_ar_diff: int = 1):
+        self.data = prices if isinstance(prices, ResearchData) else ResearchData.from_prices(prices)
+        train = self.data.rows(train_idx)
+        block = self.data.values[train]
+        complete = ~np.isnan(block).any(axis=0)
+        self.tickers = [t for t, ok in zip(self.data.tickers, complete) if ok]
+        self.columns = {t: i for i, t in enumerate(self.tickers)}
+        self.moments = JohansenMoments.from_prices(block[:, complete], k_ar_diff)
+        self.corr = self.moments.return_correlation()
+
+    def _seeds(self, members: np.ndarray, size: int, linked: np.ndarray, max_seeds: int) -> np.ndarray:
+        combos = [
+            c for c in itertools.combinations(members.tolist(), size)
+            if all(linked[i, j] for i, j in itertools.combinations(c, 2))
+        ]
+        if len(combos) > max_seeds:
+            # keep the most tightly linked: highest weakest-link |corr|
+            strength = [min(abs(self.corr[i, j]) for i, j in itertools.combinations(c, 2)) for c in combos]
+            keep = np.argsort(strength, kind="stable")[::-1][:max_seeds]
+            combos = [combos[i] for i in sorted(keep)]
+        return np.array(combos, dtype=np.intp).reshape(-1, size)
+
+    @staticmethod
+    def _extend(baskets: np.ndarray, members: np.ndarray, linked: np.ndarray) -> np.ndarray:
+        grown = set()
+        for b in baskets.tolist():
+            for m in members.tolist():
+                if m not in b and linked[m, b].all():
+                    grown.add(tuple(sorted((*b, m))))
+        return np.array(sorted(grown), dtype=np.intp).reshape(-1, baskets.shape[1] + 1)
+
+    def search(
+        self,
+        clusters: list[list[str]],
+        sizes: tuple[int, ...] = (3, 4, 5),
+        beam_width: int = 200,
+        min_abs_corr: float = 0.3,
+        max_seeds: int = 5000,
+        level: float = 0.95,
+        top_k: int = 20,
+    ) -> list[BasketResult]:
+        """
+        Cointegrated baskets of the given sizes inside each cluster (e.g.
+        ml_select.cluster_members). Pruning keeps the search tractable:
+          - legs come from one cluster and every pair of legs has
+            |corr| >= min_abs_corr (price-difference correlation);
+          - the smallest size starts from all such combinations (at most
+            max_seeds, most strongly linked first);
+          - each larger size only extends the beam_width best baskets of
+            the size below (by trace ratio) by one cluster member.
+        Returns baskets with cointegration rank >= 1 at `level`, best
+        trace ratio first.
+        """
+        linked = np.abs(self.corr) >= min_abs_corr
+        np.fill_diagonal(linked, True)
+        found: list[BasketResult] = []
+        for cluster in clusters:
+            members = np.array(sorted(self.columns[t] for t in cluster if t in self.columns), dtype=np.intp)
+            size = min(sizes)
+            if len(members) < size:
+                continue
+            baskets = self._seeds(members, size, linked, max_seeds)
+            while len(baskets) and size <= max(sizes):
+                res = johansen_batch(self.moments, baskets)
+                baskets = res.baskets  # singular baskets are dropped
+                ratio = res.trace_ratio(level)
+                if size in sizes:
+                    rank = res.rank(level)
+                    weights = res.weights()
+                    for i in np.flatnonzero(rank >= 1):
+                        found.append(BasketResult(
+                            tickers=tuple(self.tickers[j] for j in baskets[i]),
+                            weights=tuple(float(w) for w in weights[i]),
+                            trace_stat=float(res.trace_stat[i, 0]),
+                            trace_ratio=float(ratio[i]),
+                            rank=int(rank[i]),
+                            eig=float(res.eig[i, 0]),
+                        ))
+                if size == max(sizes):
+                    break
+                beam = baskets[np.argsort(-ratio, kind="stable")[:beam_width]]
+                baskets = self._extend(beam, members, linked)
+                size += 1
+        found.sort(key=lambda r: r.trace_ratio, reverse=True)
+        return found[:top_k]
+
+
+def search_baskets(
+    prices: pd.DataFrame | ResearchData,
+    clusters: list[list[str]],
+    train_idx: pd.Index | slice,
+    sizes: tuple[int, ...] = (3, 4, 5),
+    beam_width: int = 200,
+    min_abs_corr: float = 0.3,
+    k_ar_diff: int = 1,
+    level: float = 0.95,
+    top_k: int = 20,
+) -> list[BasketResult]:
+    """One-off BasketSearch(prices, train_idx).search(clusters, ...)."""
+    return BasketSearch(prices, train_idx, k_ar_diff).search(
+        clusters, sizes=sizes, beam_width=beam_width, min_abs_corr=min_abs_corr, level=level, top_k=top_k,
+    )
+
+
+def trade_basket(
+    prices: pd.DataFrame,
+    basket: BasketResult,
+    lookback_z: int,
+    entry_z: float,
+    exit_z: float,
+    fee_bps: float,
+    slippage_bps: float,
+    leverage: float = 1.0,
+) -> pd.DataFrame:
+    """Z-score the basket spread sum_i w_i * leg_i and run it through backtest_basket."""
+    legs = list(basket.tickers)
+    px = prices[legs].dropna()
+    spread = px @ np.asarray(basket.weights)
+    z = rolling_zscore(spread, lookback_z)
+    pos = generate_spread_positions(z, entry_z, exit_z)
+    bt = backtest_basket(px, legs, basket.weights, pos, fee_bps, slippage_bps, leverage)
+    bt.insert(0, "z", z)
+    return bt
@@ -0,0 +1,73 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class ResearchData:
+    """
+    Price frame converted once for the research loops: a C-contiguous float64
+    (dates x tickers) matrix, a ticker -> column map and the sorted date index.
+    Pair-level functions take row slices and column numbers into `values`, so
+    selecting a pair window is a NumPy view instead of a .loc lookup and copy.
+    """
+
+    values: np.ndarray
+    index: pd.DatetimeIndex
+    tickers: tuple[str, ...]
+    columns: dict[str, int]
+
+    @classmethod
+    def from_prices(cls, prices: pd.DataFrame) -> "ResearchData":
+        if not prices.index.is_monotonic_increasing:
+            prices = prices.sort_index()
+        values = np.ascontiguousarray(prices.to_numpy(dtype=np.float64))
+        tickers = tuple(prices.columns)
+        return cls(values, pd.DatetimeIndex(prices.index), tickers, {c: i for i, c in enumerate(tickers)})
+
+    @classmethod
+    def from_arrays(cls, values: np.ndarray, index: pd.DatetimeIndex, tickers: tuple[str, ...]) -> "ResearchData":
+        """
+        Wrap an already aligned, sorted (dates x tickers) float64 matrix
+        without copying, e.g. the views of sarb.data.shared.SharedPriceHandle.open().
+        """
+        tickers = tuple(tickers)
+        return cls(values, index, tickers, {c: i for i, c in enumerate(tickers)})
+
+    def rows(self, labels: pd.Index | slice) -> slice:
+        """
+        Row slice covering a run of consecutive dates (e.g. a rolling-window
+        label index). Slices pass through. O(log n): only the end points are
+        looked up, so the labels must be a contiguous run of this index.
+        """
+        if isinstance(labels, slice):
+            return slice(*labels.indices(len(self.index))[:2])
+        if len(labels) == 0:
+            return slice(0, 0)
+        start = int(self.index.searchsorted(labels[0], side="left"))
+        stop = start + len(labels)
+        if stop > len(self.index) or self.index[start] != labels[0] or self.index[stop - 1] != labels[-1]:
+            raise ValueError("labels are not a contiguous run of the research index")
+        return slice(start, stop)
+
+    def pair(self, rows: slice, col_y: int, col_x: int) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+        """
+        (y, x, kept) over `rows` with rows missing either leg dropped, like
+        prices.loc[rows, [y, x]].dropna(). y and x are views when nothing is
+        dropped; kept holds the absolute row numbers retained, or None if all.
+        """
+        block = self.values[rows]
+        y = block[:, col_y]
+        x = block[:, col_x]
+        ok = ~(np.isnan(y) | np.isnan(x))
+        if ok.all():
+            return y, x, None
+        return y[ok], x[ok], np.flatnonzero(ok) + rows.start
+
+    def frame(self, rows: slice, tickers: list[str] | None = None) -> pd.DataFrame:
+        """DataFrame over `rows` for code that still needs labels (e.g. ML prefilter)."""
+        tickers = list(self.tickers) if tickers is None else tickers
+        cols = [self.columns[t] for t in tickers]
+        return pd.DataFrame(self.values[rows][:, cols], index=self.index[rows], columns=tickers)
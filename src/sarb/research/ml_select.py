@@ -93,6 +93,17 @@ def cluster_pairs_dbscan(
     return pairs
 
 
+def cluster_members(scored: list[ClusterPairScore]) -> list[list[str]]:
+    """Ticker lists per cluster from cluster_pairs_* output (e.g. for basket search)."""
+    members: dict[int, list[str]] = {}
+    for p in scored:
+        group = members.setdefault(p.cluster_id, [])
+        for t in (p.y, p.x):
+            if t not in group:
+                group.append(t)
+    return [members[cid] for cid in sorted(members)]
+
+
 def ml_prefilter_pairs(
     prices: pd.DataFrame,
     tickers: list[str],
@@ -4,12 +4,13 @@ import itertools
 import numpy as np
 import pandas as pd
 
-from sarb.features.spread import fit_hedge_ratio, compute_spread, rolling_zscore
-from sarb.stats.cointegration import engle_granger_adf_pvalue, estimate_half_life
-from sarb.strategy.pairs import generate_spread_positions
-from sarb.backtest.engine import backtest_pairs
+from sarb.features.spread import fit_hedge_ratio, fit_hedge_ratios, compute_spread, rolling_zscore
+from sarb.stats.cointegration import adf_pvalues, engle_granger_adf_pvalue, estimate_half_life, half_lives
+from sarb.strategy.pairs import spread_states
+from sarb.backtest.engine import pair_net_returns
 from sarb.metrics.performance import sharpe
-from sarb.stats.multiple_testing import benjamini_hochberg
+from sarb.stats.multiple_testing import fdr_control
+from sarb.research.context import ResearchData
 
 
 @dataclass
@@ -24,19 +25,29 @@ class PairResult:
     val_sharpe: float
 
 
-def _pair_corr(train_px: pd.DataFrame, y: str, x: str) -> float:
-    r = train_px[[y, x]].pct_change().dropna()
-    if len(r) < 50:
+def _pair_corr_arrays(y: np.ndarray, x: np.ndarray) -> float:
+    """Correlation of the legs' simple returns (NaN-free price arrays)."""
+    if len(y) - 1 < 50:
         return float("nan")
-    return float(r[y].corr(r[x]))
+    ry = y[1:] / y[:-1] - 1.0
+    rx = x[1:] / x[:-1] - 1.0
+    return float(np.corrcoef(ry, rx)[0, 1])
 
 
-def evaluate_pair_on_val(
-    prices: pd.DataFrame,
-    y: str,
-    x: str,
-    train_idx: pd.Index,
-    val_idx: pd.Index,
+def shifted_positions(z: np.ndarray, entry_z: float, exit_z: float) -> np.ndarray:
+    """generate_spread_positions on an array (state shifted one bar, flat first)."""
+    pos = np.zeros(len(z))
+    if len(z) > 1:
+        pos[1:] = spread_states(z[:-1], entry_z, exit_z)
+    return pos
+
+
+def evaluate_pair_rows(
+    data: ResearchData,
+    col_y: int,
+    col_x: int,
+    train: slice,
+    val: slice,
     lookback_z: int,
     entry_z: float,
     exit_z: float,
@@ -44,56 +55,192 @@ def evaluate_pair_on_val(
     slippage_bps: float,
     leverage: float = 1.0,
 ) -> PairResult | None:
-    train_px = prices.loc[train_idx, [y, x]].dropna()
-    val_px = prices.loc[val_idx, [y, x]].dropna()
+    """
+    evaluate_pair_on_val on positional windows: train/val are row slices of
+    data.values and col_y/col_x its columns. Signals run over the rows
+    spanned by train and val.
+    """
+    ty, tx, _ = data.pair(train, col_y, col_x)
+    _, _, val_kept = data.pair(val, col_y, col_x)
+    n_val = (val.stop - val.start) if val_kept is None else len(val_kept)
 
-    if len(train_px) < 300 or len(val_px) < 100:
+    if len(ty) < 300 or n_val < 100:
         return None
 
     # Fit hedge ratio on TRAIN only
-    alpha, beta = fit_hedge_ratio(train_px[y], train_px[x])
+    alpha, beta = fit_hedge_ratio(ty, tx)
 
     # Spread diagnostics on TRAIN only
-    spread_train = compute_spread(train_px[y], train_px[x], alpha, beta)
+    spread_train = pd.Series(ty - (alpha + beta * tx))
     adf_p = engle_granger_adf_pvalue(spread_train)
     hl = estimate_half_life(spread_train)
-    corr = _pair_corr(train_px, y, x)
+    corr = _pair_corr_arrays(ty, tx)
 
-    # Build z-score on TRAIN+VAL (allowed), but execution is lookahead-safe via shift in positions
-    tv_idx = train_idx.union(val_idx)
-    px_tv = prices.loc[tv_idx, [y, x]].dropna()
-    spread_tv = compute_spread(px_tv[y], px_tv[x], alpha, beta)
-    z_tv = rolling_zscore(spread_tv, lookback_z)
-    pos_tv = generate_spread_positions(z_tv, entry_z, exit_z)
-
-    bt_tv = backtest_pairs(
-        prices=px_tv,
-        y=y,
-        x=x,
-        alpha=alpha,
-        beta=beta,
-        spread_pos=pos_tv,
-        fee_bps=fee_bps,
-        slippage_bps=slippage_bps,
-        leverage=leverage,
+    val_sh = _val_sharpe_rows(
+        data, col_y, col_x, alpha, beta, train, val,
+        lookback_z, entry_z, exit_z, fee_bps, slippage_bps, leverage,
     )
-
-    bt_val = bt_tv.loc[val_idx.intersection(bt_tv.index)]
-    if len(bt_val) < 50:
+    if val_sh is None:
         return None
 
-    val_sh = sharpe(bt_val["ret_net"])
-
     return PairResult(
-        y=y, x=x, beta=float(beta), alpha=float(alpha),
+        y=data.tickers[col_y], x=data.tickers[col_x], beta=float(beta), alpha=float(alpha),
         corr=corr, adf_p=float(adf_p), half_life=float(hl),
         val_sharpe=float(val_sh),
     )
 
 
-def scan_pairs(
+def _val_sharpe_rows(
+    data: ResearchData,
+    col_y: int,
+    col_x: int,
+    alpha: float,
+    beta: float,
+    train: slice,
+    val: slice,
+    lookback_z: int,
+    entry_z: float,
+    exit_z: float,
+    fee_bps: float,
+    slippage_bps: float,
+    leverage: float = 1.0,
+) -> float | None:
+    """Validation Sharpe of the pair traded with a train-fitted hedge; None if VAL is too short."""
+    # Build z-score on TRAIN+VAL (allowed), but execution is lookahead-safe via shift in positions
+    tv = slice(min(train.start, val.start), max(train.stop, val.stop))
+    y_tv, x_tv, kept = data.pair(tv, col_y, col_x)
+    z_tv = rolling_zscore(pd.Series(y_tv - (alpha + beta * x_tv)), lookback_z).to_numpy()
+    pos_tv = shifted_positions(z_tv, entry_z, exit_z)
+    ret_tv = pair_net_returns(y_tv, x_tv, beta, pos_tv, fee_bps, slippage_bps, leverage)
+
+    rows_tv = np.arange(tv.start, tv.stop) if kept is None else kept
+    ret_val = ret_tv[(rows_tv >= val.start) & (rows_tv < val.stop)]
+    if len(ret_val) < 50:
+        return None
+    return sharpe(pd.Series(ret_val))
+
+
+@dataclass
+class PairScreen:
+    """
+    Cheap TRAIN statistics for a batch of candidate pairs (screen_pairs),
+    one entry per candidate in the oriented regression y ~ x.
+    `eligible` marks candidates with enough TRAIN/VAL history and a finite
+    ADF p-value, i.e. the ones evaluate_pair_rows would not drop.
+    """
+
+    cols_y: np.ndarray
+    cols_x: np.ndarray
+    alpha: np.ndarray
+    beta: np.ndarray
+    adf_p: np.ndarray
+    half_life: np.ndarray
+    eligible: np.ndarray
+
+
+def screen_pairs(
+    data: ResearchData,
+    pairs: list[tuple[int, int]],
+    train: slice,
+    val: slice,
+    orientation: str = "given",
+) -> PairScreen:
+    """
+    Stage one of pair selection, without any backtest: hedge ratios from
+    one centered cross-product matrix of the TRAIN block (fit_hedge_ratios),
+    batched ADF p-values and half-lives of all residual series
+    (adf_pvalues, half_lives) and VAL coverage counts.
+
+    orientation "both" also regresses x on y and keeps, per pair, the
+    direction with the smaller ADF p-value. Pairs must be NaN-free over
+    TRAIN (scan_pairs drops incomplete tickers).
+    """
+    if orientation not in ("given", "both"):
+        raise ValueError(f"Unknown orientation: {orientation}")
+    m = len(pairs)
+    a, b = np.array(pairs, dtype=np.intp).reshape(m, 2).T
+    if m == 0 or train.stop - train.start < 300:
+        nan = np.full(m, np.nan)
+        return PairScreen(a, b, nan, nan, nan, nan, np.zeros(m, dtype=bool))
+    val_ok = ~np.isnan(data.values[val])
+    n_val = (val_ok[:, a] & val_ok[:, b]).sum(axis=0)
+
+    block = data.values[train]
+    ys, xs = (np.concatenate([a, b]), np.concatenate([b, a])) if orientation == "both" else (a, b)
+    alphas, betas = fit_hedge_ratios(block, ys, xs)
+    resid = block[:, ys] - (alphas + betas * block[:, xs])
+    pvals = adf_pvalues(resid)
+    hls = half_lives(resid)
+
+    pick = np.arange(m)
+    if orientation == "both":
+        flip = np.fmin(pvals[m:], np.inf) < np.fmin(pvals[:m], np.inf)  # NaN never wins
+        pick = np.where(flip, pick + m, pick)
+    eligible = (n_val >= 100) & np.isfinite(pvals[pick])
+    return PairScreen(ys[pick], xs[pick], alphas[pick], betas[pick], pvals[pick], hls[pick], eligible)
+
+
+def _screened_result(
+    data: ResearchData,
+    screen: PairScreen,
+    i: int,
+    train: slice,
+    val: slice,
+    lookback_z: int,
+    entry_z: float,
+    exit_z: float,
+    fee_bps: float,
+    slippage_bps: float,
+    leverage: float = 1.0,
+) -> PairResult | None:
+    """Stage two for one screened candidate: the VAL backtest and the PairResult."""
+    cy, cx = int(screen.cols_y[i]), int(screen.cols_x[i])
+    val_sh = _val_sharpe_rows(
+        data, cy, cx, screen.alpha[i], screen.beta[i], train, val,
+        lookback_z, entry_z, exit_z, fee_bps, slippage_bps, leverage,
+    )
+    if val_sh is None:
+        return None
+    block = data.values[train]
+    return PairResult(
+        y=data.tickers[cy], x=data.tickers[cx], beta=float(screen.beta[i]), alpha=float(screen.alpha[i]),
+        corr=_pair_corr_arrays(block[:, cy], block[:, cx]), adf_p=float(screen.adf_p[i]),
+        half_life=float(screen.half_life[i]), val_sharpe=float(val_sh),
+    )
+
+
+def evaluate_pairs_both_orientations(
+    data: ResearchData,
+    pairs: list[tuple[int, int]],
+    train: slice,
+    val: slice,
+    lookback_z: int,
+    entry_z: float,
+    exit_z: float,
+    fee_bps: float,
+    slippage_bps: float,
+    leverage: float = 1.0,
+) -> list[PairResult | None]:
+    """
+    evaluate_pair_rows for unordered pairs, trying both y~x and x~y
+    (screen_pairs with orientation="both"); each pair keeps the orientation
+    with the smaller ADF p-value and only that one is backtested on VAL.
+    Pairs must be NaN-free over TRAIN (scan_pairs drops incomplete tickers).
+    """
+    screen = screen_pairs(data, pairs, train, val, orientation="both")
+    return [
+        _screened_result(
+            data, screen, i, train, val,
+            lookback_z, entry_z, exit_z, fee_bps, slippage_bps, leverage,
+        ) if screen.eligible[i] else None
+        for i in range(len(pairs))
+    ]
+
+
+def evaluate_pair_on_val(
     prices: pd.DataFrame,
-    tickers: list[str],
+    y: str,
+    x: str,
     train_idx: pd.Index,
     val_idx: pd.Index,
     lookback_z: int,
@@ -102,36 +249,73 @@ def scan_pairs(
     fee_bps: float,
     slippage_bps: float,
     leverage: float = 1.0,
+) -> PairResult | None:
+    data = ResearchData.from_prices(prices.loc[train_idx.union(val_idx), [y, x]])
+    return evaluate_pair_rows(
+        data, 0, 1, data.rows(train_idx), data.rows(val_idx),
+        lookback_z, entry_z, exit_z, fee_bps, slippage_bps, leverage,
+    )
+
+
+def scan_pairs(
+    prices: pd.DataFrame | ResearchData,
+    tickers: list[str],
+    train_idx: pd.Index | slice,
+    val_idx: pd.Index | slice,
+    lookback_z: int,
+    entry_z: float,
+    exit_z: float,
+    fee_bps: float,
+    slippage_bps: float,
+    leverage: float = 1.0,
     corr_threshold: float = 0.6,
     max_pairs: int = 300,
     fdr_q: float = 0.10,
     top_k: int = 10,
     prefilter_method: str = "correlation",
+    fdr_method: str = "bh",
+    orientation: str = "given",
 ) -> list[PairResult]:
     """
     Pipeline:
     1) Prefilter pairs (correlation or ML clustering) on TRAIN returns
-    2) For candidates, compute ADF p-value (TRAIN) and val Sharpe (VAL)
+    2) For candidates, compute hedge ratio, ADF p-value and half-life on
+       TRAIN in one batch (screen_pairs)
     3) Apply BH-FDR on ADF p-values
-    4) Rank by validation Sharpe and return top_k
+    4) Backtest only the survivors on VAL, rank by validation Sharpe and
+       return top_k
 
     prefilter_method: "correlation" (default) or "ml" (OPTICS clustering)
+    fdr_method: "bh" (default), "by" or "storey" (see stats.multiple_testing.fdr_control)
+    orientation: "given" (default) regresses y on x in ticker order; "both"
+      evaluates each unordered pair once and keeps whichever of y~x / x~y
+      has the smaller ADF p-value (see evaluate_pairs_both_orientations)
+
+    prices may be a prebuilt ResearchData (with train_idx/val_idx as row
+    slices or label runs) so repeated scans share one matrix conversion.
     """
-    train_px = prices.loc[train_idx, tickers].dropna(axis=1, how="any")
-    tickers_ok = list(train_px.columns)
+    data = prices if isinstance(prices, ResearchData) else ResearchData.from_prices(prices)
+    train = data.rows(train_idx)
+    val = data.rows(val_idx)
+
+    cols = np.array([data.columns[t] for t in tickers], dtype=np.int64)
+    train_block = data.values[train][:, cols]
+    complete = ~np.isnan(train_block).any(axis=0)
+    tickers_ok = [t for t, ok in zip(tickers, complete) if ok]
 
     if prefilter_method == "ml":
         from sarb.research.ml_select import ml_prefilter_pairs
         ml_pairs = ml_prefilter_pairs(
-            prices=prices, tickers=tickers_ok, train_idx=train_idx,
-            method="optics", max_pairs=max_pairs,
+            prices=data.frame(train, tickers_ok), tickers=tickers_ok,
+            train_idx=data.index[train], method="optics", max_pairs=max_pairs,
         )
         candidates = [(y, x, 0.0) for y, x in ml_pairs]
     else:
         # Prefilter by correlation on TRAIN
+        train_cols = {t: train_block[:, j] for j, t in enumerate(tickers) if complete[j]}
         candidates = []
         for y, x in itertools.combinations(tickers_ok, 2):
-            c = _pair_corr(train_px, y, x)
+            c = _pair_corr_arrays(train_cols[y], train_cols[x])
             if np.isfinite(c) and abs(c) >= corr_threshold:
                 candidates.append((y, x, c))
 
@@ -139,30 +323,31 @@ def scan_pairs(
         candidates.sort(key=lambda t: abs(t[2]), reverse=True)
         candidates = candidates[:max_pairs]
 
-    results: list[PairResult] = []
-    for y, x, _c in candidates:
-        res = evaluate_pair_on_val(
-            prices=prices, y=y, x=x,
-            train_idx=train_idx, val_idx=val_idx,
-            lookback_z=lookback_z, entry_z=entry_z, exit_z=exit_z,
-            fee_bps=fee_bps, slippage_bps=slippage_bps,
-            leverage=leverage,
-        )
-        if res is not None and np.isfinite(res.adf_p):
-            results.append(res)
-
-    if not results:
+    # Stage 1: cheap TRAIN statistics for every candidate (no backtests)
+    screen = screen_pairs(
+        data, [(data.columns[y], data.columns[x]) for y, x, _c in candidates], train, val, orientation,
+    )
+    ok = np.flatnonzero(screen.eligible)
+    if len(ok) == 0:
         return []
 
     # Multiple testing control on ADF p-values
-    pvals = [r.adf_p for r in results]
-    keep_mask = benjamini_hochberg(pvals, q=fdr_q)
-
-    filtered = [r for r, keep in zip(results, keep_mask) if keep]
+    keep_mask, _ = fdr_control(screen.adf_p[ok], q=fdr_q, method=fdr_method)
+    survivors = ok[keep_mask]
 
     # If FDR keeps none, fall back to strongest stationarity evidence (smallest p-values)
-    if not filtered:
-        filtered = sorted(results, key=lambda r: r.adf_p)[:top_k]
+    if len(survivors) == 0:
+        survivors = ok[np.argsort(screen.adf_p[ok], kind="stable")[:top_k]]
+
+    # Stage 2: VAL backtests for the survivors only
+    filtered = [
+        _screened_result(
+            data, screen, i, train, val,
+            lookback_z, entry_z, exit_z, fee_bps, slippage_bps, leverage,
+        )
+        for i in survivors
+    ]
+    filtered = [r for r in filtered if r is not None]
 
     # Rank by validation Sharpe (research-style selection)
     filtered.sort(key=lambda r: r.val_sharpe, reverse=True)
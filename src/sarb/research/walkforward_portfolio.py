@@ -3,18 +3,23 @@ from dataclasses import dataclass
 import numpy as np
 import pandas as pd
 
-from sarb.research.select_pairs import scan_pairs
-from sarb.features.spread import fit_hedge_ratio, compute_spread, rolling_zscore
-from sarb.strategy.pairs import generate_spread_positions
-from sarb.backtest.engine import backtest_pairs
-from sarb.portfolio.vol_target import vol_target_scale
+from sarb.config import bars_per_day, periods_per_year
+from sarb.research.context import ResearchData
+from sarb.research.select_pairs import scan_pairs, shifted_positions
+from sarb.features.spread import fit_hedge_ratio, rolling_zscore
+from sarb.backtest.engine import pair_net_returns
+from sarb.portfolio.vol_target import vol_target_scales
 
 
-def _fit_hedge(y: pd.Series, x: pd.Series, method: str = "ols") -> tuple[float, float]:
+def _fit_hedge(y: np.ndarray, x: np.ndarray, method: str = "ols") -> tuple[float, float]:
     if method == "kalman":
-        from sarb.features.kalman import fit_hedge_ratio_kalman
-        return fit_hedge_ratio_kalman(y, x)
-    return fit_hedge_ratio(y, x)
+        from sarb.features.kalman import KalmanConfig, kalman_filter_arrays
+        kc = KalmanConfig()
+        alphas, betas, _, _, _ = kalman_filter_arrays(
+            y, x, np.array([kc.initial_alpha, kc.initial_beta]), np.eye(2), kc
+        )
+        return float(alphas[-1]), float(betas[-1])
+    return fit_hedge_ratio(y, x, method)
 
 
 @dataclass
@@ -23,6 +28,8 @@ class WFConfig:
     corr_threshold: float = 0.6
     max_pairs: int = 300
     fdr_q: float = 0.10
+    fdr_method: str = "bh"  # "bh", "by" or "storey"
+    pair_orientation: str = "given"  # "given" or "both" (keep the better of y~x / x~y)
 
     z_lookback: int = 60
     entry_z: float = 2.0
@@ -38,12 +45,55 @@ class WFConfig:
     max_pair_scale: float = 3.0       # cap leverage multiplier
 
     # Hedge method
-    hedge_method: str = "ols"  # "ols" or "kalman"
+    hedge_method: str = "ols"  # "ols", "tls" or "kalman"
 
     # Risk management
     use_correlation_weights: bool = False
     risk_limits: object = None  # RiskLimits | None
 
+    bar_freq: str = "1D"  # sampling of the price index; drives annualization
+
+    @property
+    def ann_factor(self) -> float:
+        return periods_per_year(self.bar_freq)
+
+    @property
+    def target_bar_vol(self) -> float:
+        """target_daily_vol restated per bar (sqrt-time scaling)."""
+        return self.target_daily_vol / np.sqrt(bars_per_day(self.bar_freq))
+
+
+def pair_window_returns(
+    data: ResearchData,
+    col_y: int,
+    col_x: int,
+    train: slice,
+    window: slice,
+    cfg: WFConfig,
+) -> np.ndarray:
+    """
+    Daily net returns of one pair over the rows in `window`, with alpha/beta
+    fitted on the `train` rows only (positional views into data.values).
+    Rows where a leg is missing, or all rows when train is too short, are 0.
+    """
+    out = np.zeros(window.stop - window.start)
+    ty, tx, _ = data.pair(train, col_y, col_x)
+    if len(ty) < 200:
+        return out
+
+    alpha, beta = _fit_hedge(ty, tx, cfg.hedge_method)
+
+    wy, wx, kept = data.pair(window, col_y, col_x)
+    z = rolling_zscore(pd.Series(wy - (alpha + beta * wx)), cfg.z_lookback).to_numpy()
+    pos = shifted_positions(z, cfg.entry_z, cfg.exit_z)
+    r = pair_net_returns(wy, wx, beta, pos, cfg.fee_bps, cfg.slippage_bps, cfg.leverage)
+
+    if kept is None:
+        out[:] = r
+    else:
+        out[kept - window.start] = r
+    return out
+
 
 def trade_one_pair_window(
     prices: pd.DataFrame,
@@ -58,32 +108,11 @@ def trade_one_pair_window(
     Returns daily net returns on trade window for one pair, trained only on train_idx.
     Signals computed on all_idx_for_signals (train+val+trade) but execution is lookahead-safe via shift.
     """
-    px_train = prices.loc[train_idx, [y, x]].dropna()
-    if len(px_train) < 200:
-        return pd.Series(index=trade_idx, data=0.0)
-
-    alpha, beta = _fit_hedge(px_train[y], px_train[x], cfg.hedge_method)
-
-    px_sig = prices.loc[all_idx_for_signals, [y, x]].dropna()
-    spread = compute_spread(px_sig[y], px_sig[x], alpha, beta)
-    z = rolling_zscore(spread, cfg.z_lookback)
-    pos = generate_spread_positions(z, cfg.entry_z, cfg.exit_z)
-
-    bt = backtest_pairs(
-        prices=px_sig,
-        y=y,
-        x=x,
-        alpha=alpha,
-        beta=beta,
-        spread_pos=pos,
-        fee_bps=cfg.fee_bps,
-        slippage_bps=cfg.slippage_bps,
-        leverage=cfg.leverage,
-    )
-
-    # return only trade window
-    out = bt.loc[trade_idx.intersection(bt.index), "ret_net"].copy()
-    return out.reindex(trade_idx).fillna(0.0)
+    data = ResearchData.from_prices(prices.loc[all_idx_for_signals.union(train_idx), [y, x]])
+    sig = data.rows(all_idx_for_signals)
+    trade = data.rows(trade_idx)
+    r = pair_window_returns(data, 0, 1, data.rows(train_idx), sig, cfg)
+    return pd.Series(r[trade.start - sig.start : trade.stop - sig.start], index=trade_idx)
 
 def pair_returns_on_window(
     prices: pd.DataFrame,
@@ -97,31 +126,207 @@ def pair_returns_on_window(
     Compute pair net returns on a historical window (e.g., train+val),
     using alpha/beta fitted on TRAIN only. This is what we use to estimate vol.
     """
-    px_train = prices.loc[train_idx, [y, x]].dropna()
-    if len(px_train) < 200:
-        return pd.Series(index=window_idx, data=0.0)
+    data = ResearchData.from_prices(prices.loc[window_idx.union(train_idx), [y, x]])
+    r = pair_window_returns(data, 0, 1, data.rows(train_idx), data.rows(window_idx), cfg)
+    return pd.Series(r, index=window_idx)
+
+# WFConfig fields that change which pairs get selected or how they trade.
+# Configs that agree on these share selection, hedge fits and pair returns;
+# everything else (scaling, weighting, breaker) is portfolio construction.
+_SIGNAL_FIELDS = (
+    "top_k", "corr_threshold", "max_pairs", "fdr_q", "fdr_method", "pair_orientation",
+    "z_lookback", "entry_z", "exit_z",
+    "fee_bps", "slippage_bps", "leverage",
+    "hedge_method",
+)
+
 
-    alpha, beta = _fit_hedge(px_train[y], px_train[x], cfg.hedge_method)
+def _signal_key(cfg: WFConfig) -> tuple:
+    return tuple(getattr(cfg, f) for f in _SIGNAL_FIELDS)
 
-    px_win = prices.loc[window_idx, [y, x]].dropna()
-    spread = compute_spread(px_win[y], px_win[x], alpha, beta)
-    z = rolling_zscore(spread, cfg.z_lookback)
-    pos = generate_spread_positions(z, cfg.entry_z, cfg.exit_z)
 
-    bt = backtest_pairs(
-        prices=px_win,
-        y=y,
-        x=x,
-        alpha=alpha,
-        beta=beta,
-        spread_pos=pos,
+def _select_and_trade_quarter(
+    data: ResearchData,
+    tickers: list[str],
+    train: slice,
+    val: slice,
+    trade: slice,
+    cfg: WFConfig,
+) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """
+    Shared stage for one quarter: select pairs on train+val, then run one
+    backtest per pair over train+val+trade. Returns the pair names and two
+    (pairs x days) views of those returns: train+val (the past-only history
+    for vol estimates) and the trade window. Signals are causal, so the
+    history rows equal a separate train+val backtest.
+    Windows are row slices of data; depends only on the _SIGNAL_FIELDS of cfg.
+    """
+    # selection uses train & val only
+    selected = scan_pairs(
+        prices=data,
+        tickers=tickers,
+        train_idx=train,
+        val_idx=val,
+        lookback_z=cfg.z_lookback,
+        entry_z=cfg.entry_z,
+        exit_z=cfg.exit_z,
         fee_bps=cfg.fee_bps,
         slippage_bps=cfg.slippage_bps,
         leverage=cfg.leverage,
+        corr_threshold=cfg.corr_threshold,
+        max_pairs=cfg.max_pairs,
+        fdr_q=cfg.fdr_q,
+        top_k=cfg.top_k,
+        fdr_method=cfg.fdr_method,
+        orientation=cfg.pair_orientation,
     )
 
-    r = bt["ret_net"].reindex(window_idx).fillna(0.0)
-    return r
+    # signals can use train+val+trade (still time-safe due to shift),
+    # but parameters (alpha/beta) are train-only
+    sig = slice(train.start, trade.stop)
+    rets = np.zeros((len(selected), sig.stop - sig.start))
+    for i, r in enumerate(selected):
+        rets[i] = pair_window_returns(data, data.columns[r.y], data.columns[r.x], train, sig, cfg)
+
+    pair_names = [f"{r.y}/{r.x}" for r in selected]
+    hist_rets = rets[:, : val.stop - sig.start]   # past only, used for vol estimate
+    trade_rets = rets[:, trade.start - sig.start :]
+    return pair_names, hist_rets, trade_rets
+
+
+def _construct_quarter(
+    portfolio_ret: pd.Series,
+    trade_idx: pd.Index,
+    pair_names: list[str],
+    hist_rets: np.ndarray,
+    trade_rets: np.ndarray,
+    cfg: WFConfig,
+) -> dict:
+    """
+    Portfolio-construction stage for one quarter: scale, weight and apply the
+    drawdown breaker, writing into portfolio_ret. Returns the meta row.
+    """
+    if not pair_names:
+        return {"quarter_start": trade_idx[0], "n_pairs": 0, "pairs": ""}
+
+    # 1) Estimate scales from TRAIN+VAL returns, all pairs at once
+    if cfg.use_vol_targeting:
+        pair_scales = vol_target_scales(
+            hist_rets,
+            target_daily_vol=cfg.target_bar_vol,
+            max_scale=cfg.max_pair_scale,
+        )
+    else:
+        pair_scales = np.ones(len(pair_names))
+
+    # 2) Trade in next quarter, then scale returns
+    R = pd.DataFrame((trade_rets * pair_scales[:, None]).T, index=trade_idx, columns=pair_names)
+
+    # 3) Combine pair returns
+    if cfg.use_correlation_weights and R.shape[1] >= 2:
+        from sarb.risk.covariance import correlation_aware_weights
+        from sarb.risk.limits import apply_position_limits
+        w = correlation_aware_weights(R, target_vol=cfg.target_bar_vol)
+        if cfg.risk_limits is not None:
+            w = apply_position_limits(w, cfg.risk_limits)
+        port_q = (R * w).sum(axis=1)
+    else:
+        port_q = R.mean(axis=1)
+
+    # Drawdown breaker: if triggered, zero out this quarter
+    if cfg.risk_limits is not None:
+        from sarb.risk.limits import check_drawdown_breaker
+        cum_eq = (1.0 + portfolio_ret.loc[portfolio_ret.index < trade_idx[0]]).cumprod()
+        if len(cum_eq) > 10 and check_drawdown_breaker(cum_eq, cfg.risk_limits):
+            port_q = port_q * 0.0
+
+    portfolio_ret.loc[trade_idx] = port_q.values
+
+    return {
+        "quarter_start": trade_idx[0],
+        "n_pairs": len(pair_names),
+        "pairs": ", ".join(pair_names),
+        "scales": ", ".join([f"{s:.2f}" for s in pair_scales]),
+    }
+
+
+def walkforward_quarterly_portfolio_multi(
+    prices: pd.DataFrame | ResearchData,
+    tickers: list[str],
+    windows: list[tuple[pd.Index, pd.Index, pd.Index]],
+    cfgs: list[WFConfig],
+) -> list[tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Run walkforward_quarterly_portfolio for several configs in one pass.
+    windows may be label tuples (rolling_windows_by_quarter) or positional
+    slices (plan_rolling_windows); prices is converted to a ResearchData once
+    (or passed as one, e.g. ResearchData.from_arrays over a SharedPriceMatrix
+    view in a worker).
+
+    Configs are grouped by the fields that affect selection and signals; each
+    group runs selection, hedge fits and per-pair returns once per quarter and
+    fans out only the portfolio-construction step. Returns one (port, meta)
+    per config, in the order of cfgs.
+    """
+    data = prices if isinstance(prices, ResearchData) else ResearchData.from_prices(prices)
+    idx_all = data.index
+    plan = [tuple(data.rows(w) for w in window) for window in windows]
+    portfolio_rets = [pd.Series(index=idx_all, data=0.0) for _ in cfgs]
+    meta_rows: list[list[dict]] = [[] for _ in cfgs]
+
+    groups: dict[tuple, list[int]] = {}
+    for i, cfg in enumerate(cfgs):
+        groups.setdefault(_signal_key(cfg), []).append(i)
+
+    for members in groups.values():
+        lead = cfgs[members[0]]
+
+        for train, val, trade in plan:
+            pair_names, hist_rets, trade_rets = _select_and_trade_quarter(
+                data, tickers, train, val, trade, lead,
+            )
+            for i in members:
+                meta_rows[i].append(
+                    _construct_quarter(
+                        portfolio_rets[i], idx_all[trade],
+                        pair_names, hist_rets, trade_rets, cfgs[i],
+                    )
+                )
+
+    results = []
+    for portfolio_ret, rows in zip(portfolio_rets, meta_rows):
+        out = pd.DataFrame({"ret_net": portfolio_ret})
+        out["equity"] = (1.0 + out["ret_net"]).cumprod()
+        results.append((out, pd.DataFrame(rows)))
+    return results
+
+
+def walkforward_pair_return_matrix(
+    prices: pd.DataFrame,
+    tickers: list[str],
+    windows: list[tuple[pd.Index, pd.Index, pd.Index]],
+    cfg: WFConfig,
+) -> pd.DataFrame:
+    """
+    Unscaled daily net returns of every pair selected in any quarter, one
+    column per pair, NaN on days the pair is not held. This is the input
+    for sarb.portfolio.daily.run_daily_portfolio, which re-weights daily
+    instead of freezing scales and weights for the quarter.
+    """
+    data = ResearchData.from_prices(prices)
+    idx_all = data.index
+    cols: dict[str, np.ndarray] = {}
+
+    for window in windows:
+        train, val, trade = (data.rows(w) for w in window)
+        pair_names, _hist, trade_rets = _select_and_trade_quarter(
+            data, tickers, train, val, trade, cfg,
+        )
+        for name, r in zip(pair_names, trade_rets):
+            cols.setdefault(name, np.full(len(idx_all), np.nan))[trade] = r
+
+    return pd.DataFrame(cols, index=idx_all)
+
 
 def walkforward_quarterly_portfolio(
     prices: pd.DataFrame,
@@ -135,115 +340,4 @@ def walkforward_quarterly_portfolio(
       - trade selected pairs in next quarter
       - combine returns equally across pairs (simple, defensible baseline)
     """
-    idx_all = pd.DatetimeIndex(prices.index).sort_values()
-    portfolio_ret = pd.Series(index=idx_all, data=0.0)
-    meta_rows = []
-
-    for k, (train_idx, val_idx, trade_idx) in enumerate(windows):
-        # selection uses train & val only
-        selected = scan_pairs(
-            prices=prices,
-            tickers=tickers,
-            train_idx=train_idx,
-            val_idx=val_idx,
-            lookback_z=cfg.z_lookback,
-            entry_z=cfg.entry_z,
-            exit_z=cfg.exit_z,
-            fee_bps=cfg.fee_bps,
-            slippage_bps=cfg.slippage_bps,
-            leverage=cfg.leverage,
-            corr_threshold=cfg.corr_threshold,
-            max_pairs=cfg.max_pairs,
-            fdr_q=cfg.fdr_q,
-            top_k=cfg.top_k,
-        )
-
-        if not selected:
-            meta_rows.append(
-                {"quarter_start": trade_idx[0], "n_pairs": 0, "pairs": ""}
-            )
-            continue
-
-        # signals can use train+val+trade (still time-safe due to shift),
-        # but parameters (alpha/beta) are train-only
-        all_sig_idx = train_idx.union(val_idx).union(trade_idx)
-
-        pair_rets = []
-        pair_names = []
-        pair_scales = []
-
-        hist_idx = train_idx.union(val_idx)  # past only, used for vol estimate
-        all_sig_idx = hist_idx.union(trade_idx)
-
-        for r in selected:
-            name = f"{r.y}/{r.x}"
-
-            # 1) Estimate scale from TRAIN+VAL returns (alpha/beta trained on TRAIN only)
-            if cfg.use_vol_targeting:
-                hist_r = pair_returns_on_window(
-                    prices=prices,
-                    y=r.y, x=r.x,
-                    train_idx=train_idx,
-                    window_idx=hist_idx,
-                    cfg=cfg,
-                )
-                scale = vol_target_scale(
-                    hist_r,
-                    target_daily_vol=cfg.target_daily_vol,
-                    max_scale=cfg.max_pair_scale,
-                )
-            else:
-                scale = 1.0
-
-            # 2) Trade in next quarter, then scale returns
-            pr_trade = trade_one_pair_window(
-                prices=prices,
-                y=r.y,
-                x=r.x,
-                train_idx=train_idx,
-                all_idx_for_signals=all_sig_idx,
-                trade_idx=trade_idx,
-                cfg=cfg,
-            )
-
-            pair_rets.append(pr_trade * scale)
-            pair_names.append(name)
-            pair_scales.append(scale)
-
-        # 3) Combine pair returns
-        R = pd.concat(pair_rets, axis=1).fillna(0.0)
-        R.columns = pair_names
-
-        if cfg.use_correlation_weights and R.shape[1] >= 2:
-            from sarb.risk.covariance import correlation_aware_weights
-            from sarb.risk.limits import apply_position_limits
-            w = correlation_aware_weights(R, target_vol=cfg.target_daily_vol)
-            if cfg.risk_limits is not None:
-                w = apply_position_limits(w, cfg.risk_limits)
-            port_q = (R * w).sum(axis=1)
-        else:
-            port_q = R.mean(axis=1)
-
-        # Drawdown breaker: if triggered, zero out this quarter
-        if cfg.risk_limits is not None:
-            from sarb.risk.limits import check_drawdown_breaker
-            cum_eq = (1.0 + portfolio_ret.loc[portfolio_ret.index < trade_idx[0]]).cumprod()
-            if len(cum_eq) > 10 and check_drawdown_breaker(cum_eq, cfg.risk_limits):
-                port_q = port_q * 0.0
-
-        portfolio_ret.loc[trade_idx] = port_q.values
-
-        meta_rows.append(
-            {
-                "quarter_start": trade_idx[0],
-                "n_pairs": len(pair_names),
-                "pairs": ", ".join(pair_names),
-                "scales": ", ".join([f"{s:.2f}" for s in pair_scales]),
-            }
-        )
-
-
-    out = pd.DataFrame({"ret_net": portfolio_ret})
-    out["equity"] = (1.0 + out["ret_net"]).cumprod()
-    meta = pd.DataFrame(meta_rows)
-    return out, meta
+    return walkforward_quarterly_portfolio_multi(prices, tickers, windows, [cfg])[0]
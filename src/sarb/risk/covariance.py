@@ -1,57 +1,244 @@
 from __future__ import annotations
+from dataclasses import dataclass, field
 import numpy as np
 import pandas as pd
 
 
+def _lw_from_moments(S: np.ndarray, fourth_mean: float, n_eff: float) -> np.ndarray:
+    """
+    Ledoit-Wolf (2004) shrinkage toward mu*I from precomputed moments.
+
+    S:           sample covariance (1/n normalization, demeaned)
+    fourth_mean: mean of ||x_k - mean||^4 over observations
+    n_eff:       (effective) number of observations
+
+    Uses sum_k ||x_k x_k' - S||_F^2 = sum_k ||x_k||^4 - n ||S||_F^2,
+    so no p x p x n intermediate is ever formed.
+    """
+    p = S.shape[0]
+    mu = np.trace(S) / p
+    S_sq = float((S * S).sum())
+    d2 = S_sq - p * mu**2  # ||S - mu*I||_F^2
+    if d2 <= 0.0 or n_eff <= 0:
+        return mu * np.eye(p)
+
+    b2_bar = (fourth_mean - S_sq) / n_eff
+    b2 = min(max(b2_bar, 0.0), d2)
+    shrink = b2 / d2
+    return shrink * mu * np.eye(p) + (1.0 - shrink) * S
+
+
 def ledoit_wolf_shrinkage(returns: pd.DataFrame) -> pd.DataFrame:
     """
     Ledoit-Wolf shrinkage estimator for covariance matrix.
-    Shrinks sample covariance toward scaled identity (constant correlation model).
+    Shrinks sample covariance toward scaled identity with the optimal
+    (asymptotically MSE-minimizing) intensity from Ledoit & Wolf (2004).
     """
     X = returns.values
     n, p = X.shape
     if n < 2 or p < 2:
         return pd.DataFrame(np.eye(p), index=returns.columns, columns=returns.columns)
 
-    S = np.cov(X, rowvar=False, ddof=1)
+    Xc = X - X.mean(axis=0)
+    S = (Xc.T @ Xc) / n
+    fourth_mean = float(((Xc * Xc).sum(axis=1) ** 2).mean())
 
-    # Shrinkage target: scaled identity
-    mu = np.trace(S) / p
-    F = mu * np.eye(p)
-
-    # Compute optimal shrinkage intensity (simplified Ledoit-Wolf)
-    # Use a fixed reasonable shrinkage intensity for robustness
-    gamma_hat = np.linalg.norm(S - F, "fro") ** 2
-    if gamma_hat == 0:
-        alpha = 1.0
-    else:
-        # Approximate shrinkage: scales with 1/n for large samples
-        alpha = min(max(p / (n * gamma_hat / mu**2), 0.0), 1.0)
-
-    Sigma = alpha * F + (1.0 - alpha) * S
+    Sigma = _lw_from_moments(S, fourth_mean, n)
     return pd.DataFrame(Sigma, index=returns.columns, columns=returns.columns)
 
 
+@dataclass
+class _StreamingMoments:
+    """
+    Weighted raw moments of a stream of return rows, enough to rebuild the
+    demeaned covariance and the Ledoit-Wolf fourth-moment term in O(p^2):
+      W = sum w, W2 = sum w^2, s1 = sum w x, M = sum w x x',
+      a1 = sum w |x|^2, a2 = sum w |x|^4, ax = sum w |x|^2 x
+    """
+
+    n_assets: int
+
+    _W: float = field(init=False, default=0.0)
+    _W2: float = field(init=False, default=0.0)
+    _s1: np.ndarray = field(init=False, repr=False)
+    _M: np.ndarray = field(init=False, repr=False)
+    _a1: float = field(init=False, default=0.0)
+    _a2: float = field(init=False, default=0.0)
+    _ax: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        p = self.n_assets
+        self._W = 0.0
+        self._W2 = 0.0
+        self._s1 = np.zeros(p)
+        self._M = np.zeros((p, p))
+        self._a1 = 0.0
+        self._a2 = 0.0
+        self._ax = np.zeros(p)
+
+    def _accumulate(self, x: np.ndarray, w: float) -> None:
+        a = float(x @ x)
+        self._W += w
+        self._W2 += w * abs(w)  # w = -1 removes a row's unit weight
+        self._s1 += w * x
+        self._M += w * np.outer(x, x)
+        self._a1 += w * a
+        self._a2 += w * a * a
+        self._ax += (w * a) * x
+
+    def _scale(self, lam: float) -> None:
+        self._W *= lam
+        self._W2 *= lam * lam
+        self._s1 *= lam
+        self._M *= lam
+        self._a1 *= lam
+        self._a2 *= lam
+        self._ax *= lam
+
+    @staticmethod
+    def _as_row(row, p: int) -> np.ndarray:
+        x = np.asarray(row, dtype=np.float64).reshape(-1)
+        if x.shape[0] != p:
+            raise ValueError(f"Expected a row of {p} returns, got {x.shape[0]}.")
+        # Missing pair returns are treated as flat, as in the portfolio combiners
+        return np.where(np.isfinite(x), x, 0.0)
+
+    @property
+    def n_eff(self) -> float:
+        return self._W**2 / self._W2 if self._W2 > 0 else 0.0
+
+    def mean(self) -> np.ndarray:
+        return self._s1 / self._W if self._W > 0 else np.zeros(self.n_assets)
+
+    def covariance(self) -> np.ndarray:
+        """Demeaned covariance (1/W normalization)."""
+        if self._W <= 0:
+            return np.zeros((self.n_assets, self.n_assets))
+        m = self.mean()
+        S = self._M / self._W - np.outer(m, m)
+        return (S + S.T) / 2.0
+
+    def ledoit_wolf(self) -> np.ndarray:
+        """Ledoit-Wolf shrunk covariance of the current window, O(p^2)."""
+        p = self.n_assets
+        if self.n_eff < 2 or p < 2:
+            return np.eye(p)
+        m = self.mean()
+        c = float(m @ m)
+        W = self._W
+        # sum w |x - m|^4 expanded into the maintained raw moments
+        fourth = (
+            self._a2
+            + 4.0 * float(m @ self._M @ m)
+            + W * c * c
+            - 4.0 * float(self._ax @ m)
+            + 2.0 * c * self._a1
+            - 4.0 * c * float(self._s1 @ m)
+        )
+        return _lw_from_moments(self.covariance(), fourth / W, self.n_eff)
+
+
+@dataclass
+class RollingCovariance(_StreamingMoments):
+    """
+    Fixed-window covariance updated one return row at a time.
+    Each update adds the new row and removes the one leaving the window, O(p^2).
+    Moments are rebuilt from the ring buffer once per full window to stop
+    floating-point drift, which keeps the amortized cost O(p^2).
+    ledoit_wolf() matches ledoit_wolf_shrinkage on the last `window` rows.
+    """
+
+    window: int = 126
+
+    _buf: np.ndarray = field(init=False, repr=False)
+    _count: int = field(init=False, default=0)
+    _head: int = field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        if self.window < 2:
+            raise ValueError("window must be >= 2.")
+        super().__post_init__()
+        self._buf = np.zeros((self.window, self.n_assets))
+
+    def update(self, row) -> None:
+        x = self._as_row(row, self.n_assets)
+        if self._count == self.window:
+            self._accumulate(self._buf[self._head], -1.0)
+        else:
+            self._count += 1
+        self._buf[self._head] = x
+        self._accumulate(x, 1.0)
+        self._head = (self._head + 1) % self.window
+
+        if self._head == 0:
+            self._reset()
+            for r in self._buf[: self._count]:
+                self._accumulate(r, 1.0)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+
+@dataclass
+class EWMCovariance(_StreamingMoments):
+    """
+    Exponentially weighted covariance updated one return row at a time, O(p^2).
+    Weights decay by 0.5 ** (1 / halflife) per update; Ledoit-Wolf shrinkage
+    uses the effective sample size (sum w)^2 / sum w^2.
+    """
+
+    halflife: float = 63.0
+
+    def __post_init__(self) -> None:
+        if self.halflife <= 0:
+            raise ValueError("halflife must be positive.")
+        super().__post_init__()
+
+    def update(self, row) -> None:
+        x = self._as_row(row, self.n_assets)
+        self._scale(0.5 ** (1.0 / self.halflife))
+        self._accumulate(x, 1.0)
+
+
 def correlation_aware_weights(
     pair_returns: pd.DataFrame,
     target_vol: float = 0.008,
     max_weight: float = 0.5,
+    cov: pd.DataFrame | None = None,
 ) -> pd.Series:
     """
     Compute portfolio weights using inverse-vol adjusted by correlation.
     Uses Ledoit-Wolf covariance for stability.
+
+    cov: optional precomputed covariance (e.g. RollingCovariance.ledoit_wolf())
+         aligned with pair_returns.columns; skips re-estimation from history.
     """
     if pair_returns.shape[1] < 2:
         return pd.Series(1.0, index=pair_returns.columns)
 
-    cov = ledoit_wolf_shrinkage(pair_returns)
-    diag = np.diag(cov.values)
+    if cov is None:
+        cov = ledoit_wolf_shrinkage(pair_returns)
+    w = _correlation_aware_weights_array(np.asarray(cov, dtype=np.float64), target_vol, max_weight)
+    return pd.Series(w, index=pair_returns.columns)
+
+
+def _correlation_aware_weights_array(
+    cov: np.ndarray,
+    target_vol: float,
+    max_weight: float,
+) -> np.ndarray:
+    """Array core of correlation_aware_weights (no pandas overhead, for daily loops)."""
+    diag = np.diag(cov)
     diag = np.maximum(diag, 1e-12)
     inv_vol = 1.0 / np.sqrt(diag)
     w = inv_vol / inv_vol.sum()
 
     # Scale to target vol
-    port_vol = float(np.sqrt(w @ cov.values @ w))
+    port_vol = float(np.sqrt(w @ cov @ w))
     if port_vol > 1e-12:
         w = w * (target_vol / port_vol)
 
@@ -61,4 +248,4 @@ def correlation_aware_weights(
     if total > 0:
         w = w / total
 
-    return pd.Series(w, index=pair_returns.columns)
+    return w
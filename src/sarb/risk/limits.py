@@ -1,5 +1,5 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import numpy as np
 import pandas as pd
 
@@ -24,6 +24,15 @@ def apply_position_limits(
     return w
 
 
+def _apply_position_limits_array(w: np.ndarray, limits: RiskLimits) -> np.ndarray:
+    """Array core of apply_position_limits (no pandas overhead, for daily loops)."""
+    w = np.clip(w, -limits.max_position_size, limits.max_position_size)
+    gross = np.abs(w).sum()
+    if gross > limits.max_gross_exposure:
+        w = w * (limits.max_gross_exposure / gross)
+    return w
+
+
 def check_drawdown_breaker(
     equity: pd.Series,
     limits: RiskLimits,
@@ -34,11 +43,44 @@ def check_drawdown_breaker(
     return bool(dd.min() < -limits.max_drawdown_pct)
 
 
+@dataclass
+class DrawdownState:
+    """
+    Streaming drawdown tracker: O(1) per return instead of re-cumprod-ing
+    the whole equity history. Agrees with check_drawdown_breaker on an
+    equity curve that starts at `equity`.
+    """
+
+    equity: float = 1.0
+    peak: float = field(init=False, default=0.0)
+    max_drawdown: float = field(init=False, default=0.0)
+
+    def __post_init__(self) -> None:
+        self.peak = self.equity
+
+    def update(self, ret: float) -> float:
+        """Apply one period's return; returns the current drawdown (<= 0)."""
+        self.equity *= 1.0 + ret
+        if self.equity > self.peak:
+            self.peak = self.equity
+        dd = self.drawdown
+        if dd < self.max_drawdown:
+            self.max_drawdown = dd
+        return dd
+
+    @property
+    def drawdown(self) -> float:
+        return self.equity / self.peak - 1.0 if self.peak > 0 else -1.0
+
+    def breached(self, limits: RiskLimits) -> bool:
+        return self.max_drawdown < -limits.max_drawdown_pct
+
+
 def compute_short_borrow_cost(
     short_notional: pd.Series,
     borrow_cost_bps: float,
-    ann_factor: int = 252,
+    ann_factor: float = 252,
 ) -> pd.Series:
-    """Daily cost of carrying short positions."""
-    daily_rate = borrow_cost_bps / 1e4 / ann_factor
-    return short_notional.abs() * daily_rate
+    """Per-bar cost of carrying short positions; ann_factor is bars per year."""
+    bar_rate = borrow_cost_bps / 1e4 / ann_factor
+    return short_notional.abs() * bar_rate
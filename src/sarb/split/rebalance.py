@@ -1,6 +1,12 @@
 from __future__ import annotations
+from typing import NamedTuple, Sequence
+
+import numpy as np
 import pandas as pd
 
+# offset-style aliases people reach for, mapped to the period alias to_period expects
+_PERIOD_ALIASES = {"QS": "Q", "QE": "Q", "MS": "M", "ME": "M", "YS": "Y", "YE": "Y"}
+
 def quarter_boundaries(index: pd.DatetimeIndex) -> list[pd.Timestamp]:
     """
     Returns quarter start timestamps present in index.
@@ -12,10 +18,74 @@ def quarter_boundaries(index: pd.DatetimeIndex) -> list[pd.Timestamp]:
     first_dates = idx.to_series().groupby(q).min()
     return list(first_dates.values)
 
+def rebalance_starts(index: pd.DatetimeIndex, freq: str | Sequence = "Q") -> np.ndarray:
+    """
+    Positions of the first bar of each rebalance period in a sorted index.
+
+    freq: a pandas period alias ("Q", "M", "W", "W-FRI", ...) or a custom
+    calendar of rebalance timestamps; each calendar date starts a period at
+    the first bar on or after it.
+    """
+    idx = pd.DatetimeIndex(index)
+    if len(idx) == 0:
+        return np.empty(0, dtype=np.int64)
+    if isinstance(freq, str):
+        if idx.tz is not None:
+            idx = idx.tz_localize(None)
+        codes = idx.to_period(_PERIOD_ALIASES.get(freq, freq)).asi8
+        return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    cal = pd.DatetimeIndex(freq).sort_values()
+    pos = np.unique(idx.searchsorted(cal, side="left"))
+    return pos[pos < len(idx)]
+
+
+class WindowSlices(NamedTuple):
+    """Positional (train, val, trade) window; slice the price array or .iloc with it."""
+
+    train: slice
+    val: slice
+    trade: slice
+
+    def labels(self, index: pd.Index) -> tuple[pd.Index, pd.Index, pd.Index]:
+        return index[self.train], index[self.val], index[self.trade]
+
+
+def plan_rolling_windows(
+    index: pd.DatetimeIndex,
+    train_days: int = 504,
+    val_days: int = 126,
+    freq: str | Sequence = "Q",
+    bars_per_day: float = 1,
+    min_trade_days: int = 20,
+) -> list[WindowSlices]:
+    """
+    Rolling walk-forward windows as integer slices into a sorted index, one
+    per rebalance period (see rebalance_starts): trade = [t_k, t_{k+1}),
+    val = the val_days bars before t_k, train = the train_days bars before
+    that. The final period (no following boundary) is not traded, and periods
+    without enough history or with fewer than min_trade_days are skipped.
+    """
+    idx = pd.DatetimeIndex(index)
+    if not idx.is_monotonic_increasing:
+        raise ValueError("index must be sorted ascending")
+    n_train = int(train_days * bars_per_day)
+    n_val = int(val_days * bars_per_day)
+    min_trade = min_trade_days * bars_per_day
+
+    starts = rebalance_starts(idx, freq)
+    t0, t1 = starts[:-1], starts[1:]
+    ok = (t1 - t0 >= min_trade) & (t0 >= n_val + n_train)
+    return [
+        WindowSlices(slice(a - n_val - n_train, a - n_val), slice(a - n_val, a), slice(a, b))
+        for a, b in zip(t0[ok].tolist(), t1[ok].tolist())
+    ]
+
+
 def rolling_windows_by_quarter(
     prices: pd.DataFrame,
     train_days: int = 504,   # ~2 years
     val_days: int = 126,     # ~6 months
+    bars_per_day: float = 1,
 ) -> list[tuple[pd.Index, pd.Index, pd.Index]]:
     """
     For each quarter start t:
@@ -23,30 +93,10 @@ def rolling_windows_by_quarter(
       - val   = [t - val_days, t)
       - trade = [t, next_quarter_start)
     Returns (train_idx, val_idx, trade_idx) windows. All time-safe.
+    train_days/val_days are trading days; with intraday bars pass bars_per_day
+    so the windows are counted in bars. Label view of plan_rolling_windows;
+    use that directly for positional, copy-free slicing.
     """
     idx = pd.DatetimeIndex(prices.index).sort_values()
-    q_starts = quarter_boundaries(idx)
-
-    windows = []
-    for i, t0 in enumerate(q_starts[:-1]):
-        t1 = q_starts[i + 1]
-        # trade window
-        trade_idx = idx[(idx >= t0) & (idx < t1)]
-        if len(trade_idx) < 20:
-            continue
-
-        end_val = t0
-        start_val = idx[idx < end_val][-val_days] if (idx < end_val).sum() >= val_days else None
-        if start_val is None:
-            continue
-        val_idx = idx[(idx >= start_val) & (idx < end_val)]
-
-        end_train = start_val
-        if (idx < end_train).sum() < train_days:
-            continue
-        start_train = idx[idx < end_train][-train_days]
-        train_idx = idx[(idx >= start_train) & (idx < end_train)]
-
-        windows.append((train_idx, val_idx, trade_idx))
-
-    return windows
+    plan = plan_rolling_windows(idx, train_days, val_days, freq="Q", bars_per_day=bars_per_day)
+    return [w.labels(idx) for w in plan]
@@ -1,4 +1,8 @@
 from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
 import numpy as np
 import pandas as pd
 
@@ -16,7 +20,7 @@ def bootstrap_mean_ci(daily_returns: pd.Series, n_boot: int = 5000, alpha: float
     hi = np.quantile(means, 1 - alpha / 2)
     return {"mean": float(r.mean()), "ci_low": float(lo), "ci_high": float(hi)}
 
-def bootstrap_sharpe_ci(daily_returns: pd.Series, n_boot: int = 5000, alpha: float = 0.05, seed: int = 42, ann_factor: int = 252):
+def bootstrap_sharpe_ci(daily_returns: pd.Series, n_boot: int = 5000, alpha: float = 0.05, seed: int = 42, ann_factor: float = 252):
     r = daily_returns.dropna().values
     if len(r) == 0:
         return {"sharpe": 0.0, "ci_low": 0.0, "ci_high": 0.0}
@@ -34,3 +38,165 @@ def bootstrap_sharpe_ci(daily_returns: pd.Series, n_boot: int = 5000, alpha: flo
     base_sd = r.std(ddof=0)
     base_sh = 0.0 if base_sd == 0 else (r.mean() / base_sd) * np.sqrt(ann_factor)
     return {"sharpe": float(base_sh), "ci_low": float(lo), "ci_high": float(hi)}
+
+
+DEFAULT_SKETCH_BINS = 1 << 15
+_CHUNK_CELLS = 1 << 21   # resampled returns drawn per chunk (~16 MB of float64)
+
+
+@dataclass
+class QuantileSketch:
+    """
+    Mergeable fixed-grid histogram over [lo, hi) for streaming quantiles.
+
+    Memory is O(bins) however many values are added; values outside the
+    grid land in under/overflow cells bounded by the exact min/max seen.
+    quantile() matches np.quantile (linear) to within one bin width.
+    merge() only adds integer counts, so any grouping of updates merges
+    to exactly the same sketch.
+    """
+
+    lo: float
+    hi: float
+    bins: int = DEFAULT_SKETCH_BINS
+    counts: np.ndarray = field(default=None, repr=False)
+    vmin: float = float("inf")
+    vmax: float = float("-inf")
+
+    def __post_init__(self):
+        if not self.hi > self.lo:
+            raise ValueError("QuantileSketch needs hi > lo")
+        if self.counts is None:
+            self.counts = np.zeros(self.bins + 2, dtype=np.int64)
+
+    @property
+    def n(self) -> int:
+        return int(self.counts.sum())
+
+    def update(self, values) -> None:
+        v = np.asarray(values, dtype=np.float64).ravel()
+        if v.size == 0:
+            return
+        cell = np.floor((v - self.lo) * (self.bins / (self.hi - self.lo)))
+        cell = np.clip(cell, -1, self.bins).astype(np.intp) + 1
+        self.counts += np.bincount(cell, minlength=self.bins + 2)
+        self.vmin = min(self.vmin, float(v.min()))
+        self.vmax = max(self.vmax, float(v.max()))
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if (other.lo, other.hi, other.bins) != (self.lo, self.hi, self.bins):
+            raise ValueError("can only merge sketches with the same grid")
+        self.counts += other.counts
+        self.vmin = min(self.vmin, other.vmin)
+        self.vmax = max(self.vmax, other.vmax)
+
+    def quantile(self, q: float) -> float:
+        n = self.n
+        if n == 0:
+            return float("nan")
+        rank = q * (n - 1)
+        if rank <= 0 or rank >= n - 1:
+            return self.vmin if rank <= 0 else self.vmax
+        cum = np.cumsum(self.counts)
+        j = int(np.searchsorted(cum, rank, side="right"))
+        before = cum[j - 1] if j > 0 else 0
+        frac = (rank - before + 0.5) / self.counts[j]
+        width = (self.hi - self.lo) / self.bins
+        if j == 0:
+            left, right = self.vmin, self.lo
+        elif j == self.bins + 1:
+            left, right = self.hi, self.vmax
+        else:
+            left = self.lo + (j - 1) * width
+            right = left + width
+        return float(np.clip(left + frac * (right - left), self.vmin, self.vmax))
+
+
+def _bootstrap_chunks(task) -> tuple[QuantileSketch, QuantileSketch]:
+    """Mean and Sharpe sketches for a run of resample chunks (one worker task)."""
+    r, seqs, sizes, ann_factor, mean_grid, sharpe_grid, bins = task
+    means, sharpes = QuantileSketch(*mean_grid, bins), QuantileSketch(*sharpe_grid, bins)
+    for seq, size in zip(seqs, sizes):
+        rng = np.random.default_rng(seq)
+        samp = r[rng.integers(0, len(r), size=(size, len(r)))]
+        mu = samp.mean(axis=1)
+        sd = samp.std(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sh = np.where(sd == 0, 0.0, mu / sd * np.sqrt(ann_factor))
+        means.update(mu)
+        sharpes.update(sh)
+    return means, sharpes
+
+
+def bootstrap_cis(
+    returns: dict[str, pd.Series] | pd.DataFrame,
+    n_boot: int = 5000,
+    alpha: float = 0.05,
+    seed: int = 42,
+    ann_factor: float = 252,
+    jobs: int = 1,
+    chunk_size: int | None = None,
+    bins: int = DEFAULT_SKETCH_BINS,
+) -> pd.DataFrame:
+    """
+    Mean and Sharpe bootstrap CIs for many return series (e.g. every
+    selected pair) in one pass, with the same estimates as
+    bootstrap_mean_ci / bootstrap_sharpe_ci.
+
+    Resamples are drawn in fixed chunks (chunk_size rows, default ~2M
+    draws per chunk); series i, chunk c uses the stream
+    SeedSequence(seed).spawn(n_series)[i].spawn(n_chunks)[c], so the output
+    depends on seed, series order and chunk_size but not on `jobs`.
+    Each chunk streams into QuantileSketch grids centred on the point
+    estimate (+-20 analytic standard errors), so memory stays flat in
+    n_boot. jobs > 1 (0 = all CPUs) splits chunks across processes.
+
+    Returns one row per series: mean, mean_ci_low, mean_ci_high, sharpe,
+    sharpe_ci_low, sharpe_ci_high.
+    """
+    if n_boot < 1:
+        raise ValueError(f"n_boot must be at least 1, got {n_boot}")
+    series = dict(returns.items()) if isinstance(returns, pd.DataFrame) else dict(returns)
+    jobs = jobs or os.cpu_count() or 1
+    streams = np.random.SeedSequence(seed).spawn(len(series))
+
+    rows, tasks, owners = {}, [], []
+    for (name, s), stream in zip(series.items(), streams):
+        r = np.asarray(pd.Series(s).dropna(), dtype=np.float64)
+        mu, sd = (float(r.mean()), float(r.std(ddof=0))) if len(r) else (0.0, 0.0)
+        sh = 0.0 if sd == 0 else mu / sd * np.sqrt(ann_factor)
+        rows[name] = {"mean": mu, "mean_ci_low": mu, "mean_ci_high": mu,
+                      "sharpe": sh, "sharpe_ci_low": sh, "sharpe_ci_high": sh}
+        if len(r) == 0 or sd == 0:
+            continue
+        size = chunk_size or max(1, _CHUNK_CELLS // len(r))
+        sizes = [size] * (n_boot // size) + ([n_boot % size] if n_boot % size else [])
+        seqs = stream.spawn(len(sizes))
+        se_mean = sd / np.sqrt(len(r))
+        se_sharpe = np.sqrt((1.0 + 0.5 * (mu / sd) ** 2) / len(r) * ann_factor)
+        mean_grid = (mu - 20 * se_mean, mu + 20 * se_mean)
+        sharpe_grid = (sh - 20 * se_sharpe, sh + 20 * se_sharpe)
+        for part in np.array_split(np.arange(len(sizes)), min(jobs, len(sizes))):
+            tasks.append((r, [seqs[c] for c in part], [sizes[c] for c in part],
+                          ann_factor, mean_grid, sharpe_grid, bins))
+            owners.append(name)
+
+    if jobs == 1 or len(tasks) <= 1:
+        parts = list(map(_bootstrap_chunks, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            parts = list(pool.map(_bootstrap_chunks, tasks))
+
+    merged: dict[str, tuple[QuantileSketch, QuantileSketch]] = {}
+    for name, (m, s) in zip(owners, parts):
+        if name in merged:
+            merged[name][0].merge(m)
+            merged[name][1].merge(s)
+        else:
+            merged[name] = (m, s)
+    for name, (m, s) in merged.items():
+        rows[name].update(
+            mean_ci_low=m.quantile(alpha / 2), mean_ci_high=m.quantile(1 - alpha / 2),
+            sharpe_ci_low=s.quantile(alpha / 2), sharpe_ci_high=s.quantile(1 - alpha / 2),
+        )
+    return pd.DataFrame.from_dict(rows, orient="index")
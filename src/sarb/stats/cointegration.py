@@ -1,14 +1,14 @@
 from __future__ import annotations
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
-from statsmodels.tsa.stattools import adfuller
 
 def engle_granger_adf_pvalue(spread: pd.Series, maxlag: int | None = None) -> float:
     """
     Engle–Granger style check: if spread is stationary, pair is (often) cointegrated.
     We run ADF on spread (residual). Lower p-value => stronger evidence of stationarity.
     """
+    from statsmodels.tsa.stattools import adfuller
+
     s = spread.dropna().values
     if len(s) < 50:
         return float("nan")
@@ -22,6 +22,8 @@ def estimate_half_life(spread: pd.Series) -> float:
     half-life = -ln(2) / b  (when b < 0)
     Returns NaN if not mean reverting.
     """
+    import statsmodels.api as sm
+
     s = spread.dropna()
     if len(s) < 50:
         return float("nan")
@@ -40,3 +42,95 @@ def estimate_half_life(spread: pd.Series) -> float:
 
     hl = -np.log(2) / b
     return float(hl)
+
+
+def _mackinnon_pvalues(stat: np.ndarray) -> np.ndarray:
+    """statsmodels' mackinnonp (constant-only regression, N=1) on an array of ADF statistics."""
+    from statsmodels.tsa.adfvalues import mackinnonp
+
+    stat = np.asarray(stat, dtype=np.float64)
+    p = np.vectorize(mackinnonp, otypes=[np.float64])(stat, regression="c", N=1)
+    return np.where(np.isnan(stat), np.nan, p)
+
+
+def _adf_design(s: np.ndarray, ds: np.ndarray, lags: int) -> tuple[np.ndarray, np.ndarray]:
+    """ADF regressors [level, dlag_1..dlag_lags, const] and target for each column: (n, nobs, k), (n, nobs)."""
+    n_obs = ds.shape[0] - lags
+    s, ds = s.T, ds.T  # series-major, so each regressor is a contiguous row slice
+    X = np.empty((s.shape[0], n_obs, lags + 2))
+    X[:, :, 0] = s[:, lags:-1]
+    for j in range(1, lags + 1):
+        X[:, :, j] = ds[:, lags - j : ds.shape[1] - j]
+    X[:, :, -1] = 1.0
+    return X, ds[:, -n_obs:]
+
+
+def adf_pvalues(series: np.ndarray, maxlag: int | None = None) -> np.ndarray:
+    """
+    engle_granger_adf_pvalue for every column of a (T x n) matrix of
+    equal-length, NaN-free series in one batched pass: the same constant-only
+    ADF regression, AIC lag search over 0..maxlag (Schwert default) on a
+    common sample, refit at the chosen lag and MacKinnon p-value. The 2x2..
+    kxk normal equations of all columns are solved together instead of one
+    statsmodels OLS per lag per series. Constant columns give NaN.
+    """
+    s = np.asarray(series, dtype=np.float64)
+    if s.ndim == 1:
+        s = s[:, None]
+    T, n = s.shape
+    out = np.full(n, np.nan)
+    if T < 50 or n == 0:
+        return out
+    if maxlag is None:
+        maxlag = min(T // 2 - 2, int(np.ceil(12.0 * np.power(T / 100.0, 0.25))))
+    ok = np.ptp(s, axis=0) > 0
+    s = s[:, ok]
+    ds = np.diff(s, axis=0)
+
+    # AIC search: every lag order on the same (last T-1-maxlag) observations
+    X, y = _adf_design(s, ds, maxlag)
+    n_obs = X.shape[1]
+    order = [X.shape[2] - 1, 0, *range(1, maxlag + 1)]  # const, level, lags: nested prefixes
+    X = X[:, :, order]
+    Xt = X.transpose(0, 2, 1)
+    G = Xt @ X
+    Xy = (Xt @ y[..., None])[..., 0]
+    yy = np.einsum("nt,nt->n", y, y)
+    aic = np.empty((maxlag + 1, s.shape[1]))
+    for lag in range(maxlag + 1):
+        k = lag + 2
+        b = np.linalg.solve(G[:, :k, :k], Xy[:, :k, None])[..., 0]
+        ssr = yy - np.einsum("ni,ni->n", b, Xy[:, :k])
+        aic[lag] = n_obs * np.log(ssr / n_obs) + 2 * k
+    best = np.argmin(aic, axis=0)  # first minimum: smallest lag on ties, like statsmodels
+
+    # refit at the chosen lag on all available observations; t-stat of the level term
+    stat = np.empty(s.shape[1])
+    for lag in np.unique(best):
+        members = np.flatnonzero(best == lag)
+        X, y = _adf_design(s[:, members], ds[:, members], int(lag))
+        Xt = X.transpose(0, 2, 1)
+        Ginv = np.linalg.inv(Xt @ X)
+        b = (Ginv @ (Xt @ y[..., None]))[..., 0]
+        resid = y - (X @ b[..., None])[..., 0]
+        sigma2 = np.einsum("nt,nt->n", resid, resid) / (X.shape[1] - X.shape[2])
+        stat[members] = b[:, 0] / np.sqrt(sigma2 * Ginv[:, 0, 0])
+
+    out[ok] = _mackinnon_pvalues(stat)
+    return out
+
+
+def half_lives(series: np.ndarray) -> np.ndarray:
+    """estimate_half_life for every column of a (T x n) matrix of NaN-free series."""
+    s = np.asarray(series, dtype=np.float64)
+    if s.ndim == 1:
+        s = s[:, None]
+    out = np.full(s.shape[1], np.nan)
+    if s.shape[0] < 50:
+        return out
+    lag = s[:-1] - s[:-1].mean(axis=0)
+    ds = np.diff(s, axis=0)
+    ds = ds - ds.mean(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        b = np.einsum("ti,ti->i", lag, ds) / np.einsum("ti,ti->i", lag, lag)
+        return np.where(b < 0, -np.log(2) / b, np.nan)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class JohansenMoments:
+    """
+    Centered cross-products of every block the Johansen regression needs
+    (differences, lagged levels, lagged differences) for a whole universe
+    over one sample, computed once. A basket's moment matrices are then
+    sub-blocks of `m`, so thousands of candidate baskets cost an index
+    gather each instead of a pass over the data.
+
+    Column layout of m: [dx (N) | levels (N) | dx lag 1 (N) | ... | dx lag k (N)].
+    """
+
+    m: np.ndarray
+    n_assets: int
+    k_ar_diff: int
+    nobs: int
+
+    @classmethod
+    def from_prices(cls, values: np.ndarray, k_ar_diff: int = 1) -> "JohansenMoments":
+        """values: NaN-free (T x N) price (or log-price) matrix."""
+        v = np.asarray(values, dtype=np.float64)
+        if np.isnan(v).any():
+            raise ValueError("Johansen moments need a NaN-free block")
+        T, n = v.shape
+        k = int(k_ar_diff)
+        dx = np.diff(v, axis=0)
+        nobs = T - 1 - k
+        # same sample alignment as statsmodels' coint_johansen
+        blocks = [dx[k:], v[1 : T - k]] + [dx[k - j : T - 1 - j] for j in range(1, k + 1)]
+        c = np.concatenate(blocks, axis=1)
+        c -= c.mean(axis=0)
+        return cls(c.T @ c, n, k, nobs)
+
+    def return_correlation(self) -> np.ndarray:
+        """(N x N) correlation of the price differences, from the cached block."""
+        s = self.m[: self.n_assets, : self.n_assets]
+        d = np.sqrt(np.diag(s))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return s / np.outer(d, d)
+
+    def _blocks(self, baskets: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n = self.n_assets
+        b = baskets
+        zi = np.concatenate([b + n * (2 + j) for j in range(self.k_ar_diff)], axis=1)
+        return b, b + n, zi
+
+
+@dataclass(frozen=True)
+class JohansenBatch:
+    """coint_johansen results for a batch of equal-size baskets (det_order=0)."""
+
+    baskets: np.ndarray        # (B, k) column indices into the moments' universe
+    eig: np.ndarray            # (B, k) eigenvalues, descending
+    evec: np.ndarray           # (B, k, k) cointegrating vectors in columns, evec' Skk evec = I
+    trace_stat: np.ndarray     # (B, k) trace statistic for H0: rank <= r
+    max_eig_stat: np.ndarray   # (B, k)
+    trace_crit: np.ndarray     # (k, 3) critical values at 90/95/99%
+    max_eig_crit: np.ndarray   # (k, 3)
+
+    def rank(self, level: float = 0.95) -> np.ndarray:
+        """Cointegration rank per basket from the sequential trace test."""
+        col = {0.90: 0, 0.95: 1, 0.99: 2}[level]
+        passed = self.trace_stat > self.trace_crit[:, col]
+        return np.cumprod(passed, axis=1).sum(axis=1)
+
+    def trace_ratio(self, level: float = 0.95) -> np.ndarray:
+        """Trace statistic for rank 0 over its critical value (> 1 rejects no cointegration)."""
+        col = {0.90: 0, 0.95: 1, 0.99: 2}[level]
+        return self.trace_stat[:, 0] / self.trace_crit[0, col]
+
+    def weights(self) -> np.ndarray:
+        """Leading cointegrating vector per basket, scaled so the first leg is 1."""
+        v = self.evec[:, :, 0]
+        return v / v[:, :1]
+
+
+def johansen_batch(moments: JohansenMoments, baskets) -> JohansenBatch:
+    """
+    statsmodels coint_johansen(det_order=0) for many baskets at once. Each
+    basket's S00, S0k and Skk are Schur complements of cached blocks
+    (partialling out the lagged differences), and the reduced-rank problem
+    Skk^-1 Sk0 S00^-1 S0k is solved in its symmetric Cholesky form with one
+    stacked eigh call, which is real and ordered by construction.
+
+    Baskets whose moment matrix is not numerically positive definite (a
+    constant or exactly collinear leg) have no test and are dropped: the
+    result's `baskets` holds only the rows that were solved.
+    """
+    from statsmodels.tsa.coint_tables import c_sja, c_sjt
+
+    b = np.atleast_2d(np.asarray(baskets, dtype=np.intp))
+    n_b, k = b.shape
+    m = moments.m
+
+    def block(rows, cols):
+        return m[rows[:, :, None], cols[:, None, :]]
+
+    # a constant or exactly collinear leg makes the basket's joint moment
+    # matrix singular (and with it Mzz, S00 or Skk, whose Schur complements
+    # are PD whenever the joint matrix is); screen those out up front so one
+    # bad basket cannot fail the stacked solves for the whole batch
+    joint = np.concatenate(moments._blocks(b), axis=1)
+    b = b[_positive_definite(block(joint, joint))]
+    i0, ik, iz = moments._blocks(b)
+
+    m00, m0k, mkk = block(i0, i0), block(i0, ik), block(ik, ik)
+    if iz.shape[1]:
+        mzz = block(iz, iz)
+        mz0, mzk = block(iz, i0), block(iz, ik)
+        a0 = np.linalg.solve(mzz, mz0)
+        ak = np.linalg.solve(mzz, mzk)
+        m00 = m00 - mz0.transpose(0, 2, 1) @ a0
+        m0k = m0k - mz0.transpose(0, 2, 1) @ ak
+        mkk = mkk - mzk.transpose(0, 2, 1) @ ak
+    t = moments.nobs
+    s00, s0k, skk = m00 / t, m0k / t, mkk / t
+
+    # Skk = L L'; eigenvalues of L^-1 Sk0 S00^-1 S0k L^-T equal those of Skk^-1 Sk0 S00^-1 S0k
+    L = np.linalg.cholesky(skk)
+    w = np.linalg.solve(L, s0k.transpose(0, 2, 1))               # L^-1 Sk0
+    c = w @ np.linalg.solve(s00, w.transpose(0, 2, 1))            # symmetric
+    eig, v = np.linalg.eigh((c + c.transpose(0, 2, 1)) / 2.0)
+    eig, v = eig[:, ::-1], v[:, :, ::-1]
+    evec = np.linalg.solve(L.transpose(0, 2, 1), v)              # L^-T v, so evec' Skk evec = I
+
+    log1m = np.log1p(-eig)
+    trace = -t * np.cumsum(log1m[:, ::-1], axis=1)[:, ::-1]
+    max_eig = -t * log1m
+    trace_crit = np.array([c_sjt(k - i, 0) for i in range(k)])
+    max_eig_crit = np.array([c_sja(k - i, 0) for i in range(k)])
+    return JohansenBatch(b, eig, evec, trace, max_eig, trace_crit, max_eig_crit)
+
+
+def _positive_definite(s: np.ndarray, rcond: float = 1e-12) -> np.ndarray:
+    """Per-matrix mask for a stack of symmetric matrices: all eigenvalues above rcond * the largest."""
+    if len(s) == 0:
+        return np.zeros(0, dtype=bool)
+    ev = np.linalg.eigvalsh(s)
+    return np.isfinite(ev).all(axis=1) & (ev[:, 0] > rcond * np.abs(ev[:, -1]))
@@ -1,26 +1,90 @@
 from __future__ import annotations
 import numpy as np
 
-def benjamini_hochberg(pvals: list[float], q: float = 0.10) -> list[bool]:
+FDR_METHODS = ("bh", "by", "storey")
+
+
+def _sorted_with_ranks(p: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Sort along the last axis (NaNs last); return order, sorted p, ranks 1..m and per-row m."""
+    order = np.argsort(p, axis=-1, kind="stable")
+    ranked = np.take_along_axis(p, order, axis=-1)
+    m = np.sum(~np.isnan(p), axis=-1, keepdims=True)
+    k = np.arange(1, p.shape[-1] + 1, dtype=float)
+    return order, ranked, k, m
+
+
+def storey_pi0(pvals, lambda_: float = 0.5) -> np.ndarray:
     """
-    Benjamini–Hochberg procedure (FDR control).
-    Returns a boolean list indicating which hypotheses are rejected.
+    Storey's estimate of the share of true nulls per row (last axis):
+    #(p > lambda) / (m * (1 - lambda)), kept in [1/m, 1].
     """
-    p = np.array(pvals, dtype=float)
-    m = len(p)
-    if m == 0:
-        return []
+    p = np.asarray(pvals, dtype=float)
+    m = np.sum(~np.isnan(p), axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pi0 = np.sum(p > lambda_, axis=-1) / (m * (1.0 - lambda_))
+        return np.clip(pi0, 1.0 / np.maximum(m, 1), 1.0)
 
-    order = np.argsort(p)
-    ranked = p[order]
 
-    thresh = q * (np.arange(1, m + 1) / m)
-    passed = ranked <= thresh
+def fdr_control(
+    pvals,
+    q: float = 0.10,
+    method: str = "bh",
+    lambda_: float = 0.5,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Step-up FDR control over the last axis of `pvals`, any leading shape
+    (e.g. quarters x candidates, or configs x quarters x candidates), in one
+    vectorized pass. NaN entries are ignored (they pad ragged rows) and are
+    never rejected.
+
+    method:
+      "bh"     Benjamini-Hochberg (independent / PRDS tests)
+      "by"     Benjamini-Yekutieli (arbitrary dependence; q / sum(1/i))
+      "storey" Storey q-values (BH scaled by the estimated null share pi0)
 
-    if not passed.any():
-        return [False] * m
+    Returns (reject mask, adjusted p-values / q-values), both shaped like pvals.
+    """
+    if method not in FDR_METHODS:
+        raise ValueError(f"Unknown FDR method: {method}")
+    p = np.asarray(pvals, dtype=float)
+    if p.ndim == 0 or p.shape[-1] == 0:
+        return np.zeros(p.shape, dtype=bool), p.copy()
 
-    k = np.max(np.where(passed)[0])  # last index that passes
-    cutoff = ranked[k]
+    order, ranked, k, m = _sorted_with_ranks(p)
+    if method == "by":
+        # harmonic correction c(m) = sum_{i<=m} 1/i, per row
+        scale = m * np.concatenate([[0.0], np.cumsum(1.0 / k)])[m]
+    elif method == "storey":
+        scale = m * storey_pi0(p, lambda_)[..., None]
+    else:
+        scale = m.astype(float)
 
-    return [bool(pi <= cutoff) for pi in p]
+    # reject everything up to the largest rank with p_(k) <= q * k / scale
+    with np.errstate(invalid="ignore", divide="ignore"):
+        passed = ranked <= q * (k / scale)
+    last = np.where(passed, k, 0.0).max(axis=-1, keepdims=True)
+    reject_sorted = (k <= last) & ~np.isnan(ranked)
+
+    # adjusted values: running minimum from the largest rank down, capped at 1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        adj = np.where(np.isnan(ranked), np.inf, scale * ranked / k)
+    adj = np.minimum.accumulate(adj[..., ::-1], axis=-1)[..., ::-1]
+    adj = np.where(np.isnan(ranked), np.nan, np.minimum(adj, 1.0))
+
+    reject = np.empty(p.shape, dtype=bool)
+    adjusted = np.empty(p.shape)
+    np.put_along_axis(reject, order, reject_sorted, axis=-1)
+    np.put_along_axis(adjusted, order, adj, axis=-1)
+    return reject, adjusted
+
+
+def benjamini_hochberg(pvals: list[float], q: float = 0.10) -> list[bool]:
+    """
+    Benjamini–Hochberg procedure (FDR control).
+    Returns a boolean list indicating which hypotheses are rejected.
+    """
+    p = np.array(pvals, dtype=float)
+    if len(p) == 0:
+        return []
+    reject, _ = fdr_control(p, q=q, method="bh")
+    return reject.tolist()
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 
 def generate_spread_positions(z: pd.Series, entry_z: float, exit_z: float) -> pd.Series:
@@ -8,25 +9,85 @@ def generate_spread_positions(z: pd.Series, entry_z: float, exit_z: float) -> pd
       -1 = short spread (short y, long x)
        0 = flat
     """
-    pos = pd.Series(index=z.index, data=0.0)
-
-    state = 0.0
-    for t in range(len(z)):
-        zi = z.iloc[t]
-        if pd.isna(zi):
-            pos.iloc[t] = state
-            continue
-
-        if state == 0.0:
-            if zi <= -entry_z:
-                state = +1.0
-            elif zi >= entry_z:
-                state = -1.0
-        else:
-            if abs(zi) <= exit_z:
-                state = 0.0
-
-        pos.iloc[t] = state
+    state = spread_states(z.to_numpy(dtype=np.float64), entry_z, exit_z)
+    pos = pd.Series(state, index=z.index)
 
     # shift by 1 to trade next day (avoid lookahead)
     return pos.shift(1).fillna(0.0)
+
+
+def spread_states(z: np.ndarray, entry_z: float, exit_z: float, initial: float = 0.0) -> np.ndarray:
+    """
+    Unshifted hysteresis state after each z, starting from `initial`:
+    enter +1 on z <= -entry_z / -1 on z >= entry_z when flat, exit on
+    |z| <= exit_z, hold on NaN. Vectorized (O(n) in NumPy) when the entry and
+    exit bands are disjoint, so it scales to intraday-length series;
+    `initial` lets chunked callers carry the state across blocks.
+    """
+    z = np.asarray(z, dtype=np.float64)
+    n = len(z)
+    if entry_z <= exit_z:
+        out = np.empty(n)
+        state = initial
+        for t in range(n):
+            zi = z[t]
+            if zi == zi:
+                if state == 0.0:
+                    if zi <= -entry_z:
+                        state = +1.0
+                    elif zi >= entry_z:
+                        state = -1.0
+                elif abs(zi) <= exit_z:
+                    state = 0.0
+            out[t] = state
+        return out
+
+    exit_ev = np.abs(z) <= exit_z
+    entry_ev = (z <= -entry_z) | (z >= entry_z)
+    # Only the first entry after the latest exit changes the state; later
+    # entries in the same flat-to-exit segment are ignored by the machine.
+    n_entries = np.cumsum(entry_ev)
+    seg_base = np.maximum.accumulate(np.where(exit_ev, n_entries, 0))
+    effective = entry_ev & (n_entries - seg_base == 1)
+    if initial != 0.0:
+        # already in a position at the start: no entry counts until the first exit
+        effective &= np.cumsum(exit_ev) > 0
+
+    marks = np.full(n, np.nan)
+    marks[exit_ev] = 0.0
+    marks[effective] = np.where(z[effective] <= -entry_z, 1.0, -1.0)
+    idx = np.where(np.isnan(marks), -1, np.arange(n))
+    last = np.maximum.accumulate(idx) if n else idx
+    return np.where(last >= 0, marks[np.maximum(last, 0)], initial)
+
+
+def final_spread_state(z: np.ndarray, entry_z: float, exit_z: float) -> float:
+    """
+    State of the generate_spread_positions machine after the last z (unshifted),
+    starting flat. Vectorized: the state is the sign of the first entry signal
+    after the last exit signal, or 0 if there is none. Used by streaming/replay
+    paths that only need today's position.
+    """
+    z = np.asarray(z, dtype=np.float64)
+    if entry_z <= exit_z:
+        # entry and exit bands overlap: fall back to the sequential machine
+        state = 0.0
+        for zi in z:
+            if zi != zi:
+                continue
+            if state == 0.0:
+                if zi <= -entry_z:
+                    state = +1.0
+                elif zi >= entry_z:
+                    state = -1.0
+            elif abs(zi) <= exit_z:
+                state = 0.0
+        return state
+
+    exits = np.flatnonzero(np.abs(z) <= exit_z)
+    start = exits[-1] + 1 if len(exits) else 0
+    tail = z[start:]
+    entries = np.flatnonzero((tail <= -entry_z) | (tail >= entry_z))
+    if not len(entries):
+        return 0.0
+    return 1.0 if tail[entries[0]] <= -entry_z else -1.0
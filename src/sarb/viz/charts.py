@@ -1,21 +1,115 @@
 from __future__ import annotations
+from typing import TYPE_CHECKING
+
 import numpy as np
 import pandas as pd
 
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+_plt = None
+
+
+def _pyplot():
+    """pyplot on the Agg backend, imported on first plot rather than at module import."""
+    global _plt
+    if _plt is None:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        _plt = plt
+    return _plt
+
+# Line plots keep at most this many points by default; a 10-inch figure at
+# 150 dpi is ~1500 px wide, so more points only cost render time.
+DEFAULT_MAX_POINTS = 4000
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Positions to keep when drawing y with at most ~max_points points: the
+    first/last point plus the min and max of each of max_points/2 buckets, so
+    spikes and drawdown troughs survive. All positions if y is short enough.
+    """
+    n = len(y)
+    if max_points is None or n <= max_points or max_points < 4:
+        return np.arange(n)
+    inner = np.asarray(y[1:-1], dtype=np.float64)
+    n_buckets = (max_points - 2) // 2
+    width = -(-len(inner) // n_buckets)
+    pad = n_buckets * width - len(inner)
+    hi = np.pad(np.where(np.isnan(inner), -np.inf, inner), (0, pad), constant_values=-np.inf)
+    lo = np.pad(np.where(np.isnan(inner), np.inf, inner), (0, pad), constant_values=np.inf)
+    offsets = np.arange(n_buckets) * width
+    i_max = offsets + hi.reshape(n_buckets, width).argmax(axis=1)
+    i_min = offsets + lo.reshape(n_buckets, width).argmin(axis=1)
+    keep = np.concatenate((i_min, i_max))
+    keep = keep[(keep < len(inner)) & ~np.isnan(inner[np.minimum(keep, len(inner) - 1)])]
+    return np.unique(np.concatenate(([0], keep + 1, [n - 1])))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling (Steinarsson 2013): keeps the
+    point per bucket that spans the largest triangle with its neighbours,
+    which preserves visual shape better than min/max for smooth series.
+    """
+    n = len(y)
+    if max_points is None or n <= max_points or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    out = np.empty(max_points, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nlo, nhi = edges[b + 1], edges[b + 2] if b + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+
+DOWNSAMPLERS = ("minmax", "lttb")
+
+
+def downsample_indices(s: pd.Series, max_points: int | None, method: str = "minmax") -> np.ndarray:
+    """
+    Positions of s to draw with at most ~max_points points: "minmax" keeps
+    every bucket's extremes (spikes, drawdown troughs), "lttb" the points
+    that best preserve the shape of smooth series (x = timestamps for a
+    DatetimeIndex, else positions).
+    """
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"downsample must be one of {DOWNSAMPLERS}, got {method!r}")
+    y = s.to_numpy(dtype=np.float64)
+    if method == "lttb":
+        x = s.index.asi8 if isinstance(s.index, pd.DatetimeIndex) else np.arange(len(s))
+        return lttb_indices(x, y, max_points)
+    return minmax_indices(y, max_points)
+
+
+def _thin(s: pd.Series, max_points: int | None, method: str = "minmax") -> pd.Series:
+    if max_points is None or len(s) <= max_points:
+        return s
+    return s.iloc[downsample_indices(s, max_points, method)]
 
 
 def plot_equity_curve(
     equity: pd.Series,
     title: str = "Equity Curve",
     benchmark: pd.Series | None = None,
+    max_points: int | None = DEFAULT_MAX_POINTS,
+    downsample: str = "minmax",
 ) -> Figure:
-    fig, ax = plt.subplots(figsize=(10, 5))
+    fig, ax = _pyplot().subplots(figsize=(10, 5))
+    equity = _thin(equity, max_points, downsample)
     ax.plot(equity.index, equity.values, label="Strategy", linewidth=1.2)
     if benchmark is not None:
+        benchmark = _thin(benchmark, max_points, downsample)
         ax.plot(benchmark.index, benchmark.values, label="Benchmark", linewidth=1.0, alpha=0.7)
         ax.legend()
     ax.set_title(title)
@@ -25,11 +119,16 @@ def plot_equity_curve(
     return fig
 
 
-def plot_drawdown(equity: pd.Series, title: str = "Drawdown") -> Figure:
+def plot_drawdown(
+    equity: pd.Series,
+    title: str = "Drawdown",
+    max_points: int | None = DEFAULT_MAX_POINTS,
+    downsample: str = "minmax",
+) -> Figure:
     peak = equity.cummax()
-    dd = (equity / peak) - 1.0
+    dd = _thin((equity / peak) - 1.0, max_points, downsample)
 
-    fig, ax = plt.subplots(figsize=(10, 4))
+    fig, ax = _pyplot().subplots(figsize=(10, 4))
     ax.fill_between(dd.index, dd.values, 0, alpha=0.5, color="red")
     ax.set_title(title)
     ax.set_ylabel("Drawdown")
@@ -44,8 +143,12 @@ def plot_spread(
     entry_z: float = 2.0,
     exit_z: float = 0.5,
     title: str = "Spread & Z-Score",
+    max_points: int | None = DEFAULT_MAX_POINTS,
+    downsample: str = "minmax",
 ) -> Figure:
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 7), sharex=True)
+    fig, (ax1, ax2) = _pyplot().subplots(2, 1, figsize=(10, 7), sharex=True)
+    spread = _thin(spread, max_points, downsample)
+    z_score = _thin(z_score, max_points, downsample)
 
     ax1.plot(spread.index, spread.values, linewidth=0.8)
     ax1.set_title(title)
@@ -72,8 +175,15 @@ def plot_zscore(
     exit_z: float = 0.5,
     positions: pd.Series | None = None,
     title: str = "Z-Score",
+    max_points: int | None = DEFAULT_MAX_POINTS,
+    downsample: str = "minmax",
 ) -> Figure:
-    fig, ax = plt.subplots(figsize=(10, 4))
+    fig, ax = _pyplot().subplots(figsize=(10, 4))
+    if max_points is not None and len(z) > max_points:
+        keep = downsample_indices(z, max_points, downsample)
+        z = z.iloc[keep]
+        if positions is not None:
+            positions = positions.reindex(z.index)
     ax.plot(z.index, z.values, linewidth=0.8, label="Z-Score")
     ax.axhline(entry_z, color="red", linestyle="--", alpha=0.6)
     ax.axhline(-entry_z, color="green", linestyle="--", alpha=0.6)
@@ -94,8 +204,14 @@ def plot_zscore(
     return fig
 
 
-def plot_rolling_beta(beta_series: pd.Series, title: str = "Rolling Hedge Ratio") -> Figure:
-    fig, ax = plt.subplots(figsize=(10, 4))
+def plot_rolling_beta(
+    beta_series: pd.Series,
+    title: str = "Rolling Hedge Ratio",
+    max_points: int | None = DEFAULT_MAX_POINTS,
+    downsample: str = "minmax",
+) -> Figure:
+    fig, ax = _pyplot().subplots(figsize=(10, 4))
+    beta_series = _thin(beta_series, max_points, downsample)
     ax.plot(beta_series.index, beta_series.values, linewidth=1.0)
     ax.set_title(title)
     ax.set_ylabel("Beta (Hedge Ratio)")
@@ -104,27 +220,47 @@ def plot_rolling_beta(beta_series: pd.Series, title: str = "Rolling Hedge Ratio"
     return fig
 
 
-def plot_correlation_heatmap(returns: pd.DataFrame, title: str = "Return Correlation") -> Figure:
+def plot_correlation_heatmap(
+    returns: pd.DataFrame,
+    title: str = "Return Correlation",
+    annotate_max: int = 30,
+    max_tick_labels: int = 60,
+) -> Figure:
+    """
+    Correlation matrix as a single raster image. Cell values are written only
+    up to annotate_max tickers (one text artist per cell is O(N^2)), and at
+    most max_tick_labels ticker labels are drawn per axis.
+    """
     corr = returns.corr()
-    fig, ax = plt.subplots(figsize=(8, 6))
-    im = ax.imshow(corr.values, cmap="RdBu_r", vmin=-1, vmax=1)
+    n = corr.shape[0]
+    fig, ax = _pyplot().subplots(figsize=(8, 6) if n <= annotate_max else (10, 9))
+    im = ax.imshow(corr.values, cmap="RdBu_r", vmin=-1, vmax=1, interpolation="nearest", rasterized=True)
     fig.colorbar(im, ax=ax, shrink=0.8)
 
     tickers = list(corr.columns)
-    ax.set_xticks(range(len(tickers)))
-    ax.set_yticks(range(len(tickers)))
-    ax.set_xticklabels(tickers, rotation=45, ha="right")
-    ax.set_yticklabels(tickers)
+    step = max(1, int(np.ceil(n / max_tick_labels)))
+    ticks = range(0, n, step)
+    ax.set_xticks(ticks)
+    ax.set_yticks(ticks)
+    ax.set_xticklabels(tickers[::step], rotation=45 if step == 1 else 90, ha="right" if step == 1 else "center")
+    ax.set_yticklabels(tickers[::step])
 
-    for i in range(len(tickers)):
-        for j in range(len(tickers)):
-            ax.text(j, i, f"{corr.values[i, j]:.2f}", ha="center", va="center", fontsize=8)
+    if n <= annotate_max:
+        for i in range(n):
+            for j in range(n):
+                ax.text(j, i, f"{corr.values[i, j]:.2f}", ha="center", va="center", fontsize=8)
 
     ax.set_title(title)
     fig.tight_layout()
     return fig
 
 
-def save_figure(fig: Figure, path: str, dpi: int = 150) -> None:
-    fig.savefig(path, dpi=dpi, bbox_inches="tight")
-    plt.close(fig)
+def save_figure(fig: Figure, path: str, dpi: int = 150, fast: bool = False) -> None:
+    # fast: skip the second layout pass of bbox_inches="tight" (plot_* figures
+    # are already tight_layout()-ed) and use light PNG compression
+    if fast:
+        kwargs = {"pil_kwargs": {"compress_level": 1}} if str(path).endswith(".png") else {}
+        fig.savefig(path, dpi=dpi, **kwargs)
+    else:
+        fig.savefig(path, dpi=dpi, bbox_inches="tight")
+    _pyplot().close(fig)
@@ -1,8 +1,14 @@
 from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable
+
 import pandas as pd
 
 from sarb.viz.charts import (
+    DEFAULT_MAX_POINTS,
     plot_equity_curve,
     plot_drawdown,
     plot_spread,
@@ -19,35 +25,96 @@ def save_backtest_report(
     exit_z: float,
     output_dir: str | Path = "reports/figures",
     prefix: str = "pair",
+    max_points: int | None = DEFAULT_MAX_POINTS,
+    dpi: int = 150,
+    fast: bool = False,
+    downsample: str = "minmax",
 ) -> list[str]:
-    """Generate and save standard backtest plots. Returns list of saved file paths."""
+    """
+    Generate and save standard backtest plots. Returns list of saved file paths.
+    Series longer than max_points are downsampled before drawing, by bucket
+    min/max ("minmax") or largest-triangle-three-buckets ("lttb").
+    """
     out = Path(output_dir)
     out.mkdir(parents=True, exist_ok=True)
     saved: list[str] = []
 
     # Equity curve
-    fig = plot_equity_curve(bt["equity"], title=f"{prefix} — Equity Curve")
+    fig = plot_equity_curve(bt["equity"], title=f"{prefix} — Equity Curve", max_points=max_points, downsample=downsample)
     p = str(out / f"{prefix}_equity.png")
-    save_figure(fig, p)
+    save_figure(fig, p, dpi=dpi, fast=fast)
     saved.append(p)
 
     # Drawdown
-    fig = plot_drawdown(bt["equity"], title=f"{prefix} — Drawdown")
+    fig = plot_drawdown(bt["equity"], title=f"{prefix} — Drawdown", max_points=max_points, downsample=downsample)
     p = str(out / f"{prefix}_drawdown.png")
-    save_figure(fig, p)
+    save_figure(fig, p, dpi=dpi, fast=fast)
     saved.append(p)
 
     # Spread & z-score
-    fig = plot_spread(spread, z, entry_z, exit_z, title=f"{prefix} — Spread & Z-Score")
+    fig = plot_spread(
+        spread, z, entry_z, exit_z, title=f"{prefix} — Spread & Z-Score",
+        max_points=max_points, downsample=downsample,
+    )
     p = str(out / f"{prefix}_spread_zscore.png")
-    save_figure(fig, p)
+    save_figure(fig, p, dpi=dpi, fast=fast)
     saved.append(p)
 
     # Rolling beta (if available)
     if "beta" in bt.columns:
-        fig = plot_rolling_beta(bt["beta"], title=f"{prefix} — Rolling Hedge Ratio")
+        fig = plot_rolling_beta(
+            bt["beta"], title=f"{prefix} — Rolling Hedge Ratio", max_points=max_points, downsample=downsample,
+        )
         p = str(out / f"{prefix}_rolling_beta.png")
-        save_figure(fig, p)
+        save_figure(fig, p, dpi=dpi, fast=fast)
         saved.append(p)
 
     return saved
+
+
+@dataclass(frozen=True)
+class PairReport:
+    """Inputs of save_backtest_report for one pair, as shipped to a worker."""
+
+    prefix: str
+    bt: pd.DataFrame
+    spread: pd.Series
+    z: pd.Series
+    entry_z: float = 2.0
+    exit_z: float = 0.5
+
+
+def _render_one(args: tuple) -> tuple[str, list[str]]:
+    item, output_dir, max_points, dpi, downsample = args
+    paths = save_backtest_report(
+        item.bt, item.spread, item.z, item.entry_z, item.exit_z,
+        output_dir=output_dir, prefix=item.prefix, max_points=max_points, dpi=dpi, fast=True,
+        downsample=downsample,
+    )
+    return item.prefix, paths
+
+
+def save_backtest_reports(
+    items: Iterable[PairReport],
+    output_dir: str | Path = "reports/figures",
+    jobs: int = 0,
+    max_points: int | None = DEFAULT_MAX_POINTS,
+    dpi: int = 150,
+    downsample: str = "minmax",
+) -> dict[str, list[str]]:
+    """
+    Batch save_backtest_report over many pairs in a process pool (matplotlib
+    is single-threaded, so processes are what scale). jobs=0 (the default)
+    uses all CPUs, as in bootstrap_cis and the CLI; jobs=1 renders
+    in-process. Figures are saved with save_figure(fast=True); downsample
+    picks the line downsampler ("minmax" or "lttb", see
+    save_backtest_report). Returns {prefix: saved paths}.
+    """
+    items = list(items)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    tasks = [(item, output_dir, max_points, dpi, downsample) for item in items]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(tasks) <= 1:
+        return dict(map(_render_one, tasks))
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        return dict(pool.map(_render_one, tasks, chunksize=max(1, len(tasks) // (4 * jobs))))
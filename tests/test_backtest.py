@@ -1,5 +1,6 @@
 from __future__ import annotations
 import pandas as pd
+import pytest
 
 from sarb.features.spread import fit_hedge_ratio, compute_spread, rolling_zscore
 from sarb.strategy.pairs import generate_spread_positions
@@ -50,3 +51,85 @@ def test_backtest_pairs_flat_position(synthetic_prices):
     )
 
     assert (bt["ret_net"] == 0.0).all()
+
+
+def test_backtest_pairs_borrow_scales_with_ann_factor(synthetic_prices):
+    alpha, beta = fit_hedge_ratio(synthetic_prices["Y"], synthetic_prices["X"])
+    z = rolling_zscore(compute_spread(synthetic_prices["Y"], synthetic_prices["X"], alpha, beta), 60)
+    pos = generate_spread_positions(z, entry_z=1.0, exit_z=0.2)
+    kw = dict(y="Y", x="X", alpha=alpha, beta=beta, spread_pos=pos, fee_bps=0.0, slippage_bps=0.0)
+
+    daily = backtest_pairs(synthetic_prices, short_borrow_cost_bps=100.0, **kw)
+    hourly = backtest_pairs(synthetic_prices, short_borrow_cost_bps=100.0, ann_factor=252 * 6.5, **kw)
+
+    assert daily["costs"].sum() > 0
+    assert abs(hourly["costs"].sum() * 6.5 - daily["costs"].sum()) < 1e-12
+
+
+def test_streaming_pair_backtest_matches_in_memory(synthetic_prices):
+    import numpy as np
+    from sarb.backtest.streaming import StreamingPairBacktest
+
+    alpha, beta = fit_hedge_ratio(synthetic_prices["Y"], synthetic_prices["X"])
+    z = rolling_zscore(compute_spread(synthetic_prices["Y"], synthetic_prices["X"], alpha, beta), 30)
+    pos = generate_spread_positions(z, entry_z=1.5, exit_z=0.3)
+    ref = backtest_pairs(
+        synthetic_prices, "Y", "X", alpha, beta, pos,
+        fee_bps=1.0, slippage_bps=0.5, short_borrow_cost_bps=50.0,
+    )
+
+    bt = StreamingPairBacktest(
+        "Y", "X", alpha, beta, lookback_z=30, entry_z=1.5, exit_z=0.3,
+        fee_bps=1.0, slippage_bps=0.5, short_borrow_cost_bps=50.0,
+    )
+    chunks = (synthetic_prices.iloc[i:i + 37] for i in range(0, len(synthetic_prices), 37))
+    out = pd.concat(bt.run(chunks))
+
+    assert (out["pos"].to_numpy() == pos.to_numpy()).all()
+    for col in ref.columns:
+        np.testing.assert_allclose(out[col], ref[col], atol=1e-12)
+
+
+def test_chunked_walkforward_matches_in_memory(synthetic_prices, tmp_path):
+    import numpy as np
+    from sarb.backtest.walkforward import walkforward_pairs_backtest, walkforward_pairs_backtest_chunked
+    from sarb.data.columnar import read_column_store
+
+    prices = synthetic_prices[["Y", "X"]].iloc[:320]
+    for method in ["ols", "tls", "kalman"]:
+        kw = dict(
+            y="Y", x="X", train_lookback=120, z_lookback=30, entry_z=1.5, exit_z=0.3,
+            fee_bps=1.0, slippage_bps=0.5, hedge_method=method,
+        )
+        ref = walkforward_pairs_backtest(prices, **kw)
+        path = walkforward_pairs_backtest_chunked(prices, out_path=tmp_path / method, chunk_size=53, **kw)
+        out = read_column_store(path)
+
+        assert list(out.columns) == list(ref.columns)
+        assert (out.index == ref.index).all()
+        assert ref["pos"].abs().sum() > 0
+        np.testing.assert_array_equal(out["pos"], ref["pos"])
+        for col in ref.columns:
+            np.testing.assert_allclose(out[col], ref[col].astype(float), rtol=1e-7, atol=1e-9)
+
+    with pytest.raises(ValueError):
+        walkforward_pairs_backtest(prices, **{**kw, "hedge_method": "lad"})
+    with pytest.raises(ValueError):
+        walkforward_pairs_backtest_chunked(prices, out_path=tmp_path / "bad", **{**kw, "hedge_method": "lad"})
+
+
+def test_backtest_basket_reproduces_pairs(synthetic_prices):
+    from sarb.backtest.engine import backtest_basket
+
+    y, x = "Y", "X"
+    alpha, beta = fit_hedge_ratio(synthetic_prices[y], synthetic_prices[x])
+    z = rolling_zscore(compute_spread(synthetic_prices[y], synthetic_prices[x], alpha, beta), 60)
+    pos = generate_spread_positions(z, entry_z=2.0, exit_z=0.5)
+    kw = dict(fee_bps=1.0, slippage_bps=0.5, leverage=2.0, short_borrow_cost_bps=30.0)
+
+    pair = backtest_pairs(synthetic_prices, y, x, alpha, beta, pos, **kw)
+    basket = backtest_basket(synthetic_prices, [y, x], [1.0, -beta], pos, **kw)
+
+    for col in ("turnover", "ret_gross", "costs", "ret_net", "equity"):
+        pd.testing.assert_series_equal(basket[col], pair[col], check_names=False, atol=1e-14)
+    pd.testing.assert_series_equal(basket["w_X"], pair["w_x"], check_names=False)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sarb.cli import main, run_portfolios, sweep_grid, wf_config, ResultCache
+from sarb.data.store import PriceStore
+from sarb.research.walkforward_portfolio import walkforward_quarterly_portfolio
+from sarb.split.rebalance import rolling_windows_by_quarter
+
+
+def _universe(n: int = 900) -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    idx = pd.bdate_range("2018-01-01", periods=n)
+    common = np.cumsum(rng.normal(0, 1.0, (n, 2)), axis=0)
+    cols = {}
+    for i, name in enumerate(["A", "B", "C", "D"]):
+        cols[name] = 100 + common[:, i % 2] * (1 + 0.1 * i) + rng.normal(0, 0.6, n)
+    return pd.DataFrame(cols, index=idx)
+
+
+@pytest.fixture
+def cli_setup(tmp_path):
+    prices = _universe()
+    PriceStore(tmp_path / "store").write(prices)
+    cfg = {
+        "data": {"store": str(tmp_path / "store")},
+        "scan": {"corr_threshold": 0.3, "fdr_q": 0.5, "top_k": 3},
+        "walkforward": {
+            "train_days": 252, "val_days": 126, "corr_threshold": 0.3, "fdr_q": 0.5, "top_k": 2,
+            "variants": {"ew": {"use_vol_targeting": False}, "vt": {"use_vol_targeting": True}},
+        },
+        "sweep": {"grid": {"entry_z": [1.5, 2.0], "use_vol_targeting": [False, True]}},
+        "replay": {"pairs": [["A", "C"]], "train_lookback": 252},
+    }
+    path = tmp_path / "sarb.json"
+    path.write_text(json.dumps(cfg))
+    return prices, path, tmp_path
+
+
+def test_price_store_merges_and_reads(tmp_path):
+    prices = _universe(300)
+    store = PriceStore(tmp_path)
+    store.write(prices.iloc[:200, :2])
+    fp = store.fingerprint()
+    store.write(prices.iloc[150:, :])  # overlapping dates, new tickers
+
+    assert store.tickers == ["A", "B", "C", "D"]
+    assert store.fingerprint() != fp
+    out = store.read(["A", "B"], start=prices.index[10], end=prices.index[250])
+    expected = prices.iloc[10:251, :2]
+    expected.index = expected.index.as_unit("ns")
+    pd.testing.assert_frame_equal(out, expected, check_freq=False)
+    assert store.read(["C"]).iloc[:150].isna().all().all()
+    with pytest.raises(KeyError):
+        store.read(["ZZZ"])
+
+
+def test_wf_config_and_sweep_grid():
+    cfg = wf_config({"top_k": 3, "risk_limits": {"max_drawdown_pct": 0.2}})
+    assert cfg.top_k == 3 and cfg.risk_limits.max_drawdown_pct == 0.2
+    with pytest.raises(ValueError):
+        wf_config({"no_such_field": 1})
+    assert sweep_grid({"a": [1, 2], "b": [3]}) == [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
+
+
+def test_run_portfolios_matches_library_parallel_and_cached(tmp_path):
+    prices = _universe()
+    base = {"corr_threshold": 0.3, "fdr_q": 0.5, "top_k": 2}
+    cfgs = [wf_config({**base, "entry_z": e, "use_vol_targeting": v}) for e in (1.5, 2.0) for v in (False, True)]
+    window = {"train_days": 252, "val_days": 126}
+    cache = ResultCache(tmp_path / "cache")
+
+    parallel = run_portfolios(prices, cfgs, window, jobs=2, cache=cache, cache_key={"k": 1})
+    windows = rolling_windows_by_quarter(prices, **window)
+    for cfg, (port, _meta) in zip(cfgs, parallel):
+        ref, _ = walkforward_quarterly_portfolio(prices, list(prices.columns), windows, cfg)
+        pd.testing.assert_frame_equal(port, ref)
+
+    n_files = len(list((tmp_path / "cache").iterdir()))
+    assert n_files == len(cfgs)
+    cached = run_portfolios(prices, cfgs, window, jobs=1, cache=cache, cache_key={"k": 1})
+    for (a, _), (b, _) in zip(parallel, cached):
+        pd.testing.assert_frame_equal(a, b)
+
+
+def test_cli_commands_end_to_end(cli_setup, capsys):
+    prices, config, tmp = cli_setup
+    out = tmp / "out"
+    common = ["-c", str(config), "--out", str(out), "--cache-dir", str(tmp / "cache")]
+
+    assert main(["scan", *common]) == 0
+    assert (out / "scan.csv").exists()
+
+    assert main(["walkforward", *common, "--jobs", "2"]) == 0
+    summary = pd.read_csv(out / "walkforward_summary.csv")
+    assert list(summary["variant"]) == ["ew", "vt"]
+    port = pd.read_csv(out / "walkforward_ew.csv", index_col=0, parse_dates=True)
+    assert np.isclose(port["equity"].iloc[-1], (1 + port["ret_net"]).prod())
+
+    assert main(["sweep", *common, "--profile"]) == 0
+    sweep = pd.read_csv(out / "sweep.csv")
+    assert len(sweep) == 4 and {"entry_z", "use_vol_targeting", "sharpe"} <= set(sweep.columns)
+    assert (out / "sweep.prof").exists()
+
+    assert main(["replay", *common, "--profile"]) == 0
+    assert (out / "replay_account.csv").exists()
+    latency = pd.read_csv(out / "replay_latency.csv")
+    assert {"signal", "orders", "broker", "step"} <= set(latency["stage"])
+    assert "Replayed" in capsys.readouterr().out
@@ -1,5 +1,7 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
+import pytest
 
 from sarb.data.ingest import load_csv_prices
 
@@ -18,3 +20,97 @@ def test_load_csv_prices(tmp_path):
     assert list(px.columns) == ["A", "B"]
     assert len(px) == 50
     assert px.isna().sum().sum() == 0
+
+
+def test_load_intraday_prices_resamples_to_bars(tmp_path):
+    from sarb.data.intraday import load_intraday_prices
+
+    ts = pd.date_range("2024-01-02 09:30", periods=120, freq="1min")
+    for tkr, base in [("A", 100.0), ("B", 50.0)]:
+        pd.DataFrame({"timestamp": ts, "close": base + np.arange(120)}).to_csv(tmp_path / f"{tkr}.csv", index=False)
+
+    paths = {"A": str(tmp_path / "A.csv"), "B": str(tmp_path / "B.csv")}
+    px = load_intraday_prices(paths, bar_freq="5min")
+
+    assert list(px.columns) == ["A", "B"]
+    assert len(px) == 24
+    assert px["A"].iloc[0] == 104.0  # last print of the first 5-minute bar
+
+
+def test_streaming_bar_resampler_matches_pandas_ohlc():
+    from sarb.data.intraday import StreamingBarResampler
+
+    rng = np.random.default_rng(3)
+    n = 5000
+    offsets = np.sort(rng.integers(0, 6 * 3600 * 10**9, n))
+    ts = pd.Timestamp("2024-01-02 09:30") + pd.to_timedelta(offsets)
+    px = pd.Series(100 + np.cumsum(rng.normal(0, 0.01, n)), index=ts)
+    size = pd.Series(rng.integers(1, 100, n).astype(float), index=ts)
+
+    res = StreamingBarResampler("5min")
+    parts = [res.update(ts[b], px.to_numpy()[b], size.to_numpy()[b]) for b in np.array_split(np.arange(n), 11)]
+    bars = pd.concat(parts + [res.flush()])
+
+    expected = px.resample("5min").ohlc().dropna()
+    expected["volume"] = size.resample("5min").sum()
+    pd.testing.assert_frame_equal(bars, expected.loc[bars.index], check_freq=False)
+    assert len(bars) == len(expected)
+
+    # tz-aware ticks bucket on local wall-clock time, as pandas does
+    offsets = np.sort(rng.integers(0, 10 * 86400 * 10**9, n))
+    ts = pd.Timestamp("2024-01-02 09:30", tz="America/New_York") + pd.to_timedelta(offsets)
+    px = pd.Series(100 + np.cumsum(rng.normal(0, 0.01, n)), index=ts)
+    for freq in ("4h", "1D"):
+        res = StreamingBarResampler(freq)
+        parts = [res.update(ts[b], px.to_numpy()[b]) for b in np.array_split(np.arange(n), 7)]
+        bars = pd.concat(parts + [res.flush()])[["open", "high", "low", "close"]]
+        expected = px.resample(freq).ohlc().dropna()
+        pd.testing.assert_frame_equal(bars, expected, check_freq=False)
+
+
+def test_column_store_roundtrip(tmp_path):
+    from sarb.data.columnar import ColumnStoreWriter, read_column_store
+
+    idx = pd.date_range("2024-01-02 09:30", periods=10, freq="1min", tz="America/New_York").as_unit("ns")
+    df = pd.DataFrame({"a": np.arange(10.0), "b": np.linspace(0, 1, 10)}, index=idx)
+    with ColumnStoreWriter(tmp_path / "store", ["a", "b"]) as w:
+        w.append(df.iloc[:4])
+        w.append(df.iloc[4:])
+
+    pd.testing.assert_frame_equal(read_column_store(tmp_path / "store"), df, check_freq=False)
+    assert list(read_column_store(tmp_path / "store", columns=["b"]).columns) == ["b"]
+
+
+def _shared_column_sums(handle):
+    values, index, tickers = handle.open()
+    return tickers, index[-1], np.nansum(values, axis=0)
+
+
+def test_shared_price_matrix_views_and_cleanup():
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    from sarb.data.shared import SharedPriceMatrix
+
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2021-01-01", periods=120, tz="America/New_York")
+    prices = pd.DataFrame(rng.normal(100, 1, (120, 3)), index=idx, columns=["A", "B", "C"]).iloc[::-1]
+    prices.iloc[5, 1] = np.nan
+
+    with SharedPriceMatrix(prices) as shared:
+        values, index, tickers = shared.open()
+        ordered = prices.sort_index()
+        pd.testing.assert_frame_equal(
+            pd.DataFrame(values, index=index, columns=list(tickers)), ordered, check_freq=False,
+        )
+        assert np.shares_memory(values, shared.handle.open()[0])
+        assert not values.flags.writeable
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            out = list(pool.map(_shared_column_sums, [shared.handle] * 4))
+        for tickers, last, sums in out:
+            assert tickers == ("A", "B", "C") and last == idx[-1]
+            np.testing.assert_allclose(sums, np.nansum(ordered.to_numpy(), axis=0))
+        name = shared.handle.name
+
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
@@ -2,7 +2,9 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
-from sarb.features.spread import fit_hedge_ratio, compute_spread, rolling_zscore
+import pytest
+
+from sarb.features.spread import fit_hedge_ratio, fit_hedge_ratios, compute_spread, rolling_zscore
 
 
 def test_fit_hedge_ratio(synthetic_prices):
@@ -12,6 +14,54 @@ def test_fit_hedge_ratio(synthetic_prices):
     assert abs(alpha - 0.5) < 5.0  # alpha absorbs level differences
 
 
+def _statsmodels_ols(y, x):
+    import statsmodels.api as sm
+    params = sm.OLS(np.asarray(y), sm.add_constant(np.asarray(x), has_constant="add")).fit().params
+    return float(params[0]), float(params[1])
+
+
+def test_fit_hedge_ratio_matches_statsmodels(synthetic_prices):
+    px = synthetic_prices
+    for y, x in [("Y", "X"), ("X", "Y"), ("Y", "Z"), ("Z", "X")]:
+        np.testing.assert_allclose(fit_hedge_ratio(px[y], px[x]), _statsmodels_ols(px[y], px[x]), rtol=1e-9)
+    # degenerate constant regressor: same minimum-norm answer as statsmodels' pinv
+    const = np.full(len(px), 3.0)
+    np.testing.assert_allclose(fit_hedge_ratio(px["Y"], const), _statsmodels_ols(px["Y"], const), rtol=1e-9)
+    with pytest.raises(ValueError):
+        fit_hedge_ratio(px["Y"], px["X"], method="lad")
+
+
+def test_fit_hedge_ratio_tls_is_symmetric(synthetic_prices):
+    y, x = synthetic_prices["Y"].to_numpy(), synthetic_prices["X"].to_numpy()
+    a_yx, b_yx = fit_hedge_ratio(y, x, method="tls")
+    a_xy, b_xy = fit_hedge_ratio(x, y, method="tls")
+    assert b_yx == pytest.approx(1.0 / b_xy, rel=1e-12)
+    assert a_yx == pytest.approx(-a_xy / b_xy, rel=1e-9)
+    # major axis of the centered scatter
+    _, _, vt = np.linalg.svd(np.column_stack([x - x.mean(), y - y.mean()]), full_matrices=False)
+    assert b_yx == pytest.approx(vt[0, 1] / vt[0, 0], rel=1e-10)
+
+
+def test_fit_hedge_ratio_tls_uncorrelated_legs():
+    x = np.array([1.0, 2.0, 3.0, 4.0])
+    wiggle = np.array([1.0, -1.0, -1.0, 1.0])  # zero covariance with x
+    assert fit_hedge_ratio(5.0 + wiggle, x, method="tls") == (5.0, 0.0)  # x spreads more: flat axis
+    alpha, beta = fit_hedge_ratio(5.0 + 3.0 * wiggle, x, method="tls")   # y spreads more: vertical axis
+    assert np.isnan(alpha) and np.isnan(beta)
+
+
+def test_fit_hedge_ratios_batched(synthetic_prices):
+    px = synthetic_prices.copy()
+    px.iloc[:7, 2] = np.nan  # Z has a gap: its pairs fall back to per-pair dropna
+    values = px.to_numpy()
+    cy, cx = np.array([0, 1, 0, 2]), np.array([1, 0, 2, 1])
+    for method in ("ols", "tls"):
+        alphas, betas = fit_hedge_ratios(values, cy, cx, method=method)
+        for a, b, i, j in zip(alphas, betas, cy, cx):
+            pair = px.iloc[:, [i, j]].dropna()
+            np.testing.assert_allclose((a, b), fit_hedge_ratio(pair.iloc[:, 0], pair.iloc[:, 1], method), rtol=1e-10)
+
+
 def test_compute_spread(synthetic_prices):
     alpha, beta = fit_hedge_ratio(synthetic_prices["Y"], synthetic_prices["X"])
     spread = compute_spread(synthetic_prices["Y"], synthetic_prices["X"], alpha, beta)
@@ -31,3 +81,20 @@ def test_rolling_zscore(synthetic_prices):
     z_valid = z.dropna()
     assert len(z_valid) > 0
     assert z_valid.abs().mean() < 5.0
+
+
+def test_streaming_zscore_and_hedge_accumulator(synthetic_prices):
+    from sarb.features.spread import StreamingZScore, HedgeRatioAccumulator
+
+    y, x = synthetic_prices["Y"], synthetic_prices["X"]
+    blocks = np.array_split(np.arange(len(y)), 9)
+
+    acc = HedgeRatioAccumulator()
+    for b in blocks:
+        acc.update(y.to_numpy()[b], x.to_numpy()[b])
+    np.testing.assert_allclose(acc.fit(), fit_hedge_ratio(y, x), rtol=1e-10)
+
+    spread = compute_spread(y, x, *acc.fit())
+    sz = StreamingZScore(40)
+    z = np.concatenate([sz.update(spread.to_numpy()[b]) for b in blocks])
+    np.testing.assert_allclose(z, rolling_zscore(spread, 40).to_numpy(), atol=1e-9, equal_nan=True)
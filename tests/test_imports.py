@@ -0,0 +1,51 @@
+from __future__ import annotations
+import json
+import subprocess
+import sys
+
+# Heavy optional/scientific dependencies must load on first use, not on import.
+HEAVY = ("matplotlib", "statsmodels", "yfinance", "sklearn", "scipy")
+
+MODULES = [
+    "sarb.config",
+    "sarb.cli",
+    "sarb.data.store",
+    "sarb.data.shared",
+    "sarb.data.ingest",
+    "sarb.data.intraday",
+    "sarb.features.spread",
+    "sarb.features.kalman",
+    "sarb.stats.cointegration",
+    "sarb.stats.multiple_testing",
+    "sarb.stats.johansen",
+    "sarb.backtest.walkforward",
+    "sarb.research.select_pairs",
+    "sarb.research.walkforward_portfolio",
+    "sarb.research.baskets",
+    "sarb.viz.charts",
+    "sarb.viz.report",
+    "sarb.live.runner",
+    "sarb.live.replay",
+]
+
+# Seconds on top of numpy + pandas for importing every module above.
+IMPORT_BUDGET = 1.0
+
+_PROBE = """
+import importlib, json, sys, time
+import numpy, pandas
+t0 = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"elapsed": elapsed, "heavy": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def test_import_time_budget_and_lazy_heavy_deps():
+    code = _PROBE.format(modules=MODULES, heavy=HEAVY)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+
+    assert result["heavy"] == [], f"imported eagerly: {result['heavy']}"
+    assert result["elapsed"] < IMPORT_BUDGET, f"sarb imports took {result['elapsed']:.2f}s"
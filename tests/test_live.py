@@ -1,10 +1,12 @@
 from __future__ import annotations
 from datetime import datetime
+import numpy as np
 import pandas as pd
+import pytest
 
 from sarb.live.broker import Order
 from sarb.live.paper_broker import PaperBroker
-from sarb.live.signal import generate_live_signal, PairSignal
+from sarb.live.signal import generate_live_signal, window_signal, PairSignal
 from sarb.live.runner import LiveConfig, run_live_step
 
 
@@ -57,6 +59,22 @@ def test_generate_live_signal(synthetic_prices):
     assert isinstance(sig.beta, float)
 
 
+def test_live_signal_honours_hedge_method(synthetic_prices):
+    from sarb.features.spread import fit_hedge_ratio
+
+    kw = dict(lookback_z=60, entry_z=2.0, exit_z=0.5, train_lookback=300)
+    px = synthetic_prices[["Y", "X"]].dropna().tail(360)
+    sig = generate_live_signal(px, y="Y", x="X", hedge_method="tls", **kw)
+    assert (sig.alpha, sig.beta) == fit_hedge_ratio(px["Y"].iloc[:300], px["X"].iloc[:300], "tls")
+    z, pos, alpha, beta = window_signal(px["Y"].to_numpy(), px["X"].to_numpy(), hedge_method="tls", **kw)
+    assert (alpha, beta) == (sig.alpha, sig.beta) and pos == sig.position
+    assert z == pytest.approx(sig.z_score, rel=1e-9)
+    with pytest.raises(ValueError):
+        generate_live_signal(px, y="Y", x="X", hedge_method="lad", **kw)
+    with pytest.raises(ValueError):
+        window_signal(px["Y"].to_numpy(), px["X"].to_numpy(), hedge_method="lad", **kw)
+
+
 def test_run_live_step(synthetic_prices):
     broker = PaperBroker(initial_capital=100_000.0)
     config = LiveConfig(
@@ -74,3 +92,315 @@ def test_run_live_step(synthetic_prices):
     assert isinstance(signals, list)
     assert len(signals) == 1
     assert isinstance(signals[0], PairSignal)
+
+
+def test_run_live_step_async_nets_shared_legs(synthetic_prices):
+    import asyncio
+    from sarb.live.async_runner import run_live_step_async
+    from sarb.live.paper_broker import AsyncPaperBroker
+
+    px = synthetic_prices.iloc[:400]
+    broker = AsyncPaperBroker(broker=PaperBroker(initial_capital=100_000.0), latency=0.001)
+    broker.set_current_prices({t: float(px[t].iloc[-1]) for t in px.columns})
+    config = LiveConfig(
+        pairs=[("Y", "X"), ("Z", "X")], train_lookback=300, entry_z=0.0, exit_z=0.0,
+    )
+
+    signals, report = asyncio.run(run_live_step_async(px, config, broker))
+    assert len(signals) == 2
+    assert all(s.position != 0.0 for s in signals)
+    tickers = [o.ticker for o in report.orders]
+    assert len(tickers) == len(set(tickers))  # one order per ticker, X netted
+    assert report.n_failed == 0
+
+    expected_x = sum(
+        s.position * (-s.beta) * config.notional_per_pair / px["X"].iloc[-1] for s in signals
+    )
+    assert abs(broker.broker.get_position("X") - expected_x) < 0.02
+
+
+def test_submit_orders_concurrently_bounded():
+    import asyncio
+    import time
+    from sarb.live.async_runner import AsyncExecutionConfig, submit_orders_concurrently
+    from sarb.live.paper_broker import AsyncPaperBroker
+
+    tickers = [f"T{i}" for i in range(20)]
+    broker = AsyncPaperBroker(latency=0.05)
+    broker.set_current_prices({t: 10.0 for t in tickers})
+    orders = [Order(ticker=t, quantity=1.0) for t in tickers]
+
+    t0 = time.perf_counter()
+    report = asyncio.run(
+        submit_orders_concurrently(broker, orders, AsyncExecutionConfig(max_concurrency=10))
+    )
+    elapsed = time.perf_counter() - t0
+
+    assert all(f is not None for f in report.fills)
+    assert broker.max_in_flight == 10
+    assert elapsed < 0.05 * len(orders) / 2  # far below the serial 1.0s
+
+
+def test_submit_orders_retries_and_timeouts():
+    import asyncio
+    from sarb.live.async_runner import AsyncExecutionConfig, submit_orders_concurrently
+    from sarb.live.paper_broker import AsyncPaperBroker
+
+    orders = [Order(ticker="A", quantity=1.0) for _ in range(10)]
+
+    flaky = AsyncPaperBroker(failure_rate=0.5, seed=1)
+    flaky.set_current_prices({"A": 10.0})
+    cfg = AsyncExecutionConfig(max_retries=20, retry_backoff=0.0)
+    report = asyncio.run(submit_orders_concurrently(flaky, orders, cfg))
+    assert report.n_failed == 0
+    assert report.n_retries > 0
+    assert flaky.broker.get_position("A") == 10.0
+
+    slow = AsyncPaperBroker(latency=0.2)
+    slow.set_current_prices({"A": 10.0})
+    cfg = AsyncExecutionConfig(timeout=0.01, max_retries=0)
+    report = asyncio.run(submit_orders_concurrently(slow, orders, cfg))
+    assert report.n_failed == len(orders)
+    assert all(f is None for f in report.fills)
+
+
+def test_paper_broker_submit_orders_matches_sequential():
+    prices = {"A": 100.0, "B": 50.0}
+    orders = [
+        Order(ticker="A", quantity=10.0, timestamp=datetime(2024, 1, 1)),
+        Order(ticker="B", quantity=-20.0, timestamp=datetime(2024, 1, 1)),
+        Order(ticker="A", quantity=-10.0, timestamp=datetime(2024, 1, 1)),
+        Order(ticker="MISSING", quantity=5.0, timestamp=datetime(2024, 1, 1)),
+    ]
+    seq = PaperBroker(initial_capital=10_000.0)
+    seq.set_current_prices(prices)
+    seq_fills = [seq.submit_order(o) for o in orders]
+
+    batch = PaperBroker(initial_capital=10_000.0)
+    batch.set_current_prices(prices)
+    batch_fills = batch.submit_orders(orders)
+
+    assert batch_fills == seq_fills
+    assert batch_fills[-1] is None
+    assert batch.get_all_positions() == seq.get_all_positions() == {"B": -20.0}
+    assert abs(batch.get_account_value() - seq.get_account_value()) < 1e-9
+
+
+def test_run_live_step_nets_shared_leg(synthetic_prices):
+    broker = PaperBroker(initial_capital=100_000.0)
+    config = LiveConfig(
+        pairs=[("Y", "X"), ("Z", "X")], train_lookback=300, entry_z=0.0, exit_z=0.0,
+    )
+    px = synthetic_prices.iloc[:400]
+    broker.set_current_prices({t: float(px[t].iloc[-1]) for t in px.columns})
+
+    signals = run_live_step(px, config, broker)
+    fills = broker.get_fill_history()
+    assert len(fills) == len({f.ticker for f in fills}) == 3  # X traded once
+
+    expected_x = sum(
+        s.position * (-s.beta) * config.notional_per_pair / px["X"].iloc[-1] for s in signals
+    )
+    assert abs(broker.get_position("X") - expected_x) < 1e-9
+
+    # Re-running on the same bar is a no-op: holdings already match targets
+    run_live_step(px, config, broker)
+    assert len(broker.get_fill_history()) == 3
+
+
+def test_array_paper_broker_matches_paper_broker():
+    from sarb.live.array_broker import ArrayPaperBroker
+
+    rng = np.random.default_rng(0)
+    tickers = [f"T{i}" for i in range(20)]
+    fast = ArrayPaperBroker(initial_capital=50_000.0, fill_capacity=4)
+    ref = PaperBroker(initial_capital=50_000.0)
+
+    for _ in range(50):
+        px = {t: float(50 + 10 * rng.random()) for t in tickers}
+        fast.set_current_prices(px)
+        ref.set_current_prices(px)
+        orders = [
+            Order(ticker=tickers[rng.integers(20)], quantity=float(rng.integers(-5, 6)),
+                  timestamp=datetime(2024, 1, 1))
+            for _ in range(8)
+        ]
+        assert fast.submit_orders(orders) == ref.submit_orders(orders)
+
+    assert fast.get_all_positions() == ref.get_all_positions()
+    assert abs(fast.get_account_value() - ref.get_account_value()) < 1e-6
+    assert fast.get_fill_history() == ref.get_fill_history()
+    assert fast.submit_order(Order(ticker="UNPRICED", quantity=1.0)) is None
+
+
+def test_array_paper_broker_fill_frame():
+    from sarb.live.array_broker import ArrayPaperBroker
+
+    broker = ArrayPaperBroker(tickers=["A", "B"], fill_capacity=2)
+    broker.set_price_array(np.array([100.0, 50.0]))
+    for day in range(10):
+        mask = broker.submit_order_arrays(np.array([0, 1]), np.array([1.0, -2.0]), timestamp=datetime(2024, 1, day + 1))
+        assert mask.all()
+
+    df = broker.fill_history_frame()
+    assert list(df.columns) == ["ticker", "quantity", "fill_price", "timestamp", "commission"]
+    assert len(df) == 20
+    assert (df["ticker"].iloc[:2] == ["A", "B"]).all()
+    assert broker.get_position("A") == 10.0
+    assert broker.get_position("B") == -20.0
+
+
+def _legacy_replay(prices, config, broker, start):
+    """The day-by-day loop from scripts/run_live.py before replay_live existed."""
+    tickers = list(dict.fromkeys(t for p in config.pairs for t in p))
+    signals = []
+    for i in range(start, len(prices)):
+        daily = prices.iloc[: i + 1]
+        broker.set_current_prices({t: float(daily[t].iloc[-1]) for t in tickers})
+        signals.extend(run_live_step(daily, config, broker))
+    return signals
+
+
+def test_replay_live_matches_step_loop(synthetic_prices):
+    from sarb.live.array_broker import ArrayPaperBroker
+    from sarb.live.replay import replay_live
+
+    config = LiveConfig(pairs=[("Y", "X"), ("Z", "X")], train_lookback=300, entry_z=1.0, exit_z=0.2)
+    start = 420
+    ref = PaperBroker()
+    ref_signals = _legacy_replay(synthetic_prices, config, ref, start)
+    ref_fills = ref.get_fill_history()
+    assert len(ref_fills) > 0
+
+    for broker in (PaperBroker(), ArrayPaperBroker()):
+        report = replay_live(synthetic_prices, config, broker, start=start)
+        assert report.n_bars == len(synthetic_prices) - start
+        assert report.bars_per_second > 0
+
+        sig = report.signals
+        assert list(sig["position"]) == [s.position for s in ref_signals]
+        np.testing.assert_allclose(sig["beta"], [s.beta for s in ref_signals], rtol=1e-9)
+        np.testing.assert_allclose(sig["z_score"], [s.z_score for s in ref_signals], rtol=1e-7, atol=1e-9)
+
+        fills = broker.get_fill_history()
+        assert [(f.ticker, f.timestamp) for f in fills] == [(f.ticker, f.timestamp) for f in ref_fills]
+        np.testing.assert_allclose([f.quantity for f in fills], [f.quantity for f in ref_fills], rtol=1e-9)
+        assert abs(report.account_value.iloc[-1] - ref.get_account_value()) < 1e-6
+
+
+def test_replay_live_late_starting_leg(synthetic_prices):
+    from sarb.live.array_broker import ArrayPaperBroker
+    from sarb.live.replay import replay_live
+
+    px = synthetic_prices.copy()
+    px["W"] = px["Z"].where(np.arange(len(px)) >= 450)   # leg listed mid-replay
+    px["V"] = np.nan                                     # never trades
+    config = LiveConfig(pairs=[("Y", "X"), ("W", "X"), ("V", "X")], train_lookback=300)
+    for broker in (PaperBroker(), ArrayPaperBroker()):
+        sig = replay_live(px, config, broker, start=420).signals
+        bar = np.repeat(px.index[420:], 3)
+        stamped = sig["timestamp"].notna()
+        assert (sig.loc[stamped, "timestamp"] <= bar[stamped.to_numpy()]).all()
+        late = sig[sig["y"] == "W"]
+        assert late["timestamp"].iloc[:30].isna().all() and (late["position"].iloc[:30] == 0.0).all()
+        assert late["timestamp"].iloc[30] == px.index[450]
+        assert sig.loc[sig["y"] == "V", "timestamp"].isna().all()
+
+
+def test_live_state_snapshot_resume_matches_step_loop(synthetic_prices, tmp_path):
+    from sarb.live.state import (
+        capture_live_state,
+        save_snapshot,
+        restore_live_state,
+        run_live_step_from_state,
+    )
+
+    px = synthetic_prices
+    config = LiveConfig(pairs=[("Y", "X"), ("Z", "X")], train_lookback=300, entry_z=1.0, exit_z=0.2)
+    ref = PaperBroker()
+    _legacy_replay(px.iloc[:440], config, ref, start=400)
+
+    path = tmp_path / "live.snap"
+    save_snapshot(capture_live_state(px.iloc[:440], config, ref), path)
+
+    restored = PaperBroker()
+    state = restore_live_state(path, config, restored)
+    assert state.timestamp == px.index[439]
+    assert restored.get_all_positions() == ref.get_all_positions()
+    assert abs(restored.export_state()[0] - ref.export_state()[0]) < 1e-9
+
+    for i in range(440, len(px)):
+        daily = px.iloc[: i + 1]
+        current = {t: float(px[t].iloc[i]) for t in px.columns}
+        ref.set_current_prices(current)
+        expected = run_live_step(daily, config, ref)
+        restored.set_current_prices(current)
+        got = run_live_step_from_state(state, px.iloc[i], config, restored)
+        assert [s.position for s in got] == [s.position for s in expected]
+
+    for t, q in ref.get_all_positions().items():
+        assert abs(restored.get_position(t) - q) < 1e-6
+
+
+def test_live_state_snapshot_rejects_stale(synthetic_prices, tmp_path):
+    import dataclasses
+    import pytest
+    from sarb.live.state import SnapshotError, capture_live_state, save_snapshot, load_snapshot
+
+    config = LiveConfig(pairs=[("Y", "X")], train_lookback=300)
+    path = tmp_path / "live.snap"
+    save_snapshot(capture_live_state(synthetic_prices, config, PaperBroker()), path)
+    assert load_snapshot(path, config).pairs[0].window.shape == (360, 2)
+
+    with pytest.raises(SnapshotError):
+        load_snapshot(path, dataclasses.replace(config, entry_z=1.5))
+
+    raw = bytearray(path.read_bytes())
+    raw[-3] ^= 0xFF
+    path.write_bytes(bytes(raw))
+    with pytest.raises(SnapshotError):
+        load_snapshot(path, config)
+
+
+def test_latency_histogram_quantiles():
+    from sarb.live.latency import LatencyHistogram
+
+    rng = np.random.default_rng(0)
+    samples = rng.lognormal(mean=np.log(200_000), sigma=0.5, size=5000).astype(int)  # ~200us
+    h = LatencyHistogram()
+    for ns in samples:
+        h.record(int(ns))
+    assert h.n == 5000
+    assert h.max_ns == samples.max()
+    for q in (0.5, 0.99):
+        exact = np.quantile(samples, q)
+        # bucket upper edge: never below the true quantile, at most one bucket (~19%) above
+        assert exact <= h.quantile_ns(q) <= exact * 1.2
+
+    merged = h.merge(h)
+    assert merged.n == 10_000
+    assert merged.quantile_ns(0.5) == h.quantile_ns(0.5)
+
+
+def test_run_live_step_latency_recorder(synthetic_prices):
+    from sarb.live.latency import LatencyRecorder
+
+    rec = LatencyRecorder()
+    broker = PaperBroker()
+    config = LiveConfig(pairs=[("Y", "X"), ("Z", "X")], train_lookback=300)
+    for i in range(400, 405):
+        px = synthetic_prices.iloc[: i + 1]
+        broker.set_current_prices({t: float(px[t].iloc[-1]) for t in px.columns})
+        run_live_step(px, config, broker, recorder=rec)
+
+    snap = rec.snapshot()
+    stages = set(snap["stage"])
+    assert {"slice", "fit_hedge", "zscore", "positions", "orders", "broker", "step"} <= stages
+    per_pair = snap[(snap["stage"] == "fit_hedge") & (snap["pair"] != "ALL")]
+    assert set(per_pair["pair"]) == {"Y/X", "Z/X"}
+    agg = snap[(snap["stage"] == "fit_hedge") & (snap["pair"] == "ALL")].iloc[0]
+    assert agg["count"] == 10
+    assert (snap["p50_us"] <= snap["p99_us"]).all()
+    assert "step p50=" in rec.log_line()
+    assert rec.check_budget({"step": 1e9}) == []
+    assert rec.check_budget({"step": 0.0}) != []
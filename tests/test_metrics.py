@@ -2,7 +2,13 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
-from sarb.metrics.performance import sharpe, max_drawdown, cagr
+from sarb.metrics.performance import (
+    sharpe,
+    max_drawdown,
+    cagr,
+    MetricsAccumulator,
+    metrics_matrix,
+)
 
 
 def test_sharpe_zero_returns():
@@ -41,3 +47,48 @@ def test_cagr_known():
 def test_cagr_flat():
     eq = pd.Series([1.0] * 100)
     assert cagr(eq) == 0.0
+
+
+def _returns_with_gap() -> pd.Series:
+    rng = np.random.default_rng(3)
+    r = pd.Series(rng.normal(0.0004, 0.01, 600))
+    r.iloc[0] = -0.02
+    r.iloc[5] = np.nan
+    return r
+
+
+def test_metrics_accumulator_matches_batch():
+    r = _returns_with_gap()
+    acc = MetricsAccumulator()
+    acc.update_many(r)
+    eq = (1.0 + r.dropna()).cumprod()
+
+    assert acc.n == r.notna().sum()
+    assert abs(acc.sharpe() - sharpe(r)) < 1e-12
+    assert abs(acc.max_drawdown() - max_drawdown(eq)) < 1e-12
+    assert abs(acc.cagr() - (eq.iloc[-1] ** (252 / len(eq)) - 1.0)) < 1e-12
+    assert 0.0 < acc.hit_rate() < 1.0
+
+
+def test_metrics_accumulator_merge():
+    r = _returns_with_gap()
+    full = MetricsAccumulator()
+    full.update_many(r, turnover=np.full(len(r), 0.1))
+    for k in (1, 50, 300):
+        a, b = MetricsAccumulator(), MetricsAccumulator()
+        a.update_many(r.iloc[:k], turnover=np.full(k, 0.1))
+        b.update_many(r.iloc[k:], turnover=np.full(len(r) - k, 0.1))
+        m = a.merge(b)
+        for key, val in full.summary().items():
+            assert abs(m.summary()[key] - val) < 1e-12
+
+
+def test_metrics_matrix_matches_accumulator():
+    rng = np.random.default_rng(4)
+    R = pd.DataFrame({"a": _returns_with_gap(), "b": rng.normal(0, 0.01, 600)})
+    out = metrics_matrix(R)
+    for col in R.columns:
+        acc = MetricsAccumulator()
+        acc.update_many(R[col])
+        for key in ("n", "sharpe", "max_drawdown", "cagr", "hit_rate"):
+            assert abs(out.loc[col, key] - acc.summary()[key]) < 1e-12
@@ -7,6 +7,7 @@ from sarb.research.ml_select import (
     cluster_pairs_dbscan,
     ml_prefilter_pairs,
     ClusterPairScore,
+    cluster_members,
 )
 
 
@@ -55,3 +56,12 @@ def test_ml_prefilter_pairs():
     assert isinstance(result, list)
     assert len(result) >= 1
     assert all(isinstance(p, tuple) and len(p) == 2 for p in result)
+
+
+def test_cluster_members_groups_tickers():
+    scored = [
+        ClusterPairScore("A", "B", 1, 0.1),
+        ClusterPairScore("C", "D", 0, 0.2),
+        ClusterPairScore("B", "E", 1, 0.3),
+    ]
+    assert cluster_members(scored) == [["C", "D"], ["A", "B", "E"]]
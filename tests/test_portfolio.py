@@ -1,8 +1,10 @@
 from __future__ import annotations
+import warnings
+
 import numpy as np
 import pandas as pd
 
-from sarb.portfolio.vol_target import realized_vol, vol_target_scale
+from sarb.portfolio.vol_target import realized_vol, vol_target_scale, vol_target_scales
 
 
 def test_realized_vol():
@@ -35,3 +37,100 @@ def test_vol_target_scale_capped():
     r = pd.Series(rng.normal(0, 0.001, 252))
     scale = vol_target_scale(r, target_daily_vol=0.01, max_scale=3.0)
     assert scale == 3.0
+
+
+def test_vol_target_scales_match_per_series():
+    rng = np.random.default_rng(1)
+    R = rng.normal(0, 0.01, (5, 200)) * rng.uniform(0.05, 2.0, (5, 1))
+    R[1, :180] = np.nan   # too few observations
+    R[2] = 0.0            # no vol
+    R[3, ::7] = np.nan
+    scales = vol_target_scales(R, target_daily_vol=0.008, max_scale=3.0)
+    expected = [vol_target_scale(pd.Series(r), target_daily_vol=0.008, max_scale=3.0) for r in R]
+    np.testing.assert_array_equal(scales, expected)
+    assert scales[1] == 0.0 and scales[2] == 0.0
+
+
+def _pair_return_matrix() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    R = pd.DataFrame(
+        rng.normal(0.0003, 0.01, (300, 4)),
+        index=pd.bdate_range("2020-01-01", periods=300),
+        columns=["P1", "P2", "P3", "P4"],
+    )
+    R.iloc[:100, 3] = np.nan  # P4 only held from day 100
+    return R
+
+
+def test_daily_portfolio_equal_weight():
+    from sarb.portfolio.daily import DailyPortfolioConfig, run_daily_portfolio
+
+    R = _pair_return_matrix()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)  # P4 inactive for 100 days
+        out, w = run_daily_portfolio(R, DailyPortfolioConfig(use_vol_targeting=False))
+    np.testing.assert_allclose(out["ret_net"].values, R.mean(axis=1).values, atol=1e-15)
+    assert (w["P4"].iloc[:100] == 0.0).all()
+    assert out["n_active"].iloc[0] == 3 and out["n_active"].iloc[-1] == 4
+
+
+def test_daily_portfolio_vol_scale_uses_past_only():
+    from sarb.portfolio.daily import DailyPortfolioConfig, run_daily_portfolio
+
+    R = _pair_return_matrix()[["P1"]]
+    cfg = DailyPortfolioConfig(vol_halflife=20.0, min_obs=30)
+    _, w = run_daily_portfolio(R, cfg)
+    assert (w["P1"].iloc[:30] == 0.0).all()
+
+    ew_vol = np.sqrt(R["P1"].ewm(halflife=20.0).var(bias=True)).shift(1)
+    expected = (cfg.target_daily_vol / ew_vol).clip(0.0, cfg.max_pair_scale)
+    np.testing.assert_allclose(w["P1"].iloc[30:].values, expected.iloc[30:].values, rtol=1e-10)
+
+
+def test_daily_portfolio_skips_pairs_in_warmup():
+    from sarb.portfolio.daily import DailyPortfolioConfig, run_daily_portfolio
+
+    R = _pair_return_matrix()   # P4 joins on day 100
+    for corr in (False, True):
+        cfg = DailyPortfolioConfig(min_obs=30, use_correlation_weights=corr)
+        _, w = run_daily_portfolio(R, cfg)
+        _, w3 = run_daily_portfolio(R[["P1", "P2", "P3"]], cfg)
+        # while P4 warms up it takes no weight away from the other pairs
+        warm = slice(100, 130)
+        assert (w["P4"].iloc[warm] == 0.0).all()
+        np.testing.assert_allclose(w[["P1", "P2", "P3"]].iloc[warm].values, w3.iloc[warm].values, rtol=1e-12)
+        assert (w["P4"].iloc[130:] > 0.0).all()
+
+
+def test_daily_portfolio_counts_days_in_bars():
+    from sarb.portfolio.daily import DailyPortfolioConfig, run_daily_portfolio
+
+    R = _pair_return_matrix()
+    # 195-minute bars: two per 390-minute session
+    intraday = DailyPortfolioConfig(vol_halflife=20.0, min_obs=15, cov_halflife=30.0,
+                                    use_correlation_weights=True, bar_freq="195min")
+    in_bars = DailyPortfolioConfig(vol_halflife=40.0, min_obs=30, cov_halflife=60.0,
+                                   use_correlation_weights=True, target_daily_vol=0.008 / np.sqrt(2.0))
+    out_i, w_i = run_daily_portfolio(R, intraday)
+    out_b, w_b = run_daily_portfolio(R, in_bars)
+    np.testing.assert_allclose(w_i.values, w_b.values, rtol=1e-12)
+    np.testing.assert_allclose(out_i["ret_net"].values, out_b["ret_net"].values, rtol=1e-12)
+
+
+def test_daily_portfolio_risk_managed():
+    from sarb.portfolio.daily import DailyPortfolioConfig, run_daily_portfolio
+    from sarb.risk.limits import RiskLimits
+
+    R = _pair_return_matrix()
+    R.iloc[150:160] = -0.05  # crash trips the breaker
+    limits = RiskLimits(max_position_size=0.4, max_drawdown_pct=0.05)
+    cfg = DailyPortfolioConfig(use_correlation_weights=True, risk_limits=limits)
+    out, w = run_daily_portfolio(R, cfg)
+
+    assert np.isfinite(out["ret_net"]).all()
+    assert out["breaker"].any()
+    first = out.index[out["breaker"]][0]
+    # kill switch latches: flat from the first breach onwards
+    assert (out.loc[first:, "ret_net"] == 0.0).all()
+    assert (w.loc[first:] == 0.0).all().all()
+    assert out["drawdown"].min() < -limits.max_drawdown_pct
@@ -1,7 +1,12 @@
 from __future__ import annotations
+import pytest
+import numpy as np
 import pandas as pd
 
-from sarb.research.select_pairs import evaluate_pair_on_val, scan_pairs, PairResult
+from sarb.research.select_pairs import (
+    evaluate_pair_on_val, evaluate_pair_rows, evaluate_pairs_both_orientations, scan_pairs, PairResult,
+)
+from sarb.research.context import ResearchData
 from sarb.split.time_split import time_train_val_test_split
 
 
@@ -35,3 +40,216 @@ def test_scan_pairs_small_universe(synthetic_prices):
     # Should find at least 1 pair (Y/X are cointegrated)
     assert len(selected) >= 1
     assert all(isinstance(r, PairResult) for r in selected)
+
+
+def test_both_orientations_keeps_better_direction():
+    prices = _make_long_prices()
+    data = ResearchData.from_prices(prices)
+    train, val = slice(0, 480), slice(480, 640)
+    args = dict(lookback_z=60, entry_z=2.0, exit_z=0.5, fee_bps=1.0, slippage_bps=0.5)
+    c = data.columns
+    pairs = [(c["Y"], c["X"]), (c["X"], c["Y"]), (c["X"], c["W"]), (c["Z"], c["Y"])]
+
+    both = evaluate_pairs_both_orientations(data, pairs, train, val, **args)
+    # the same unordered pair resolves to the same orientation whichever way it is given
+    assert (both[0].y, both[0].x) == (both[1].y, both[1].x)
+    for (a, b), res in zip(pairs, both):
+        fwd = evaluate_pair_rows(data, a, b, train, val, **args)
+        rev = evaluate_pair_rows(data, b, a, train, val, **args)
+        best = fwd if fwd.adf_p <= rev.adf_p else rev
+        assert (res.y, res.x) == (best.y, best.x)
+        for field in ("alpha", "beta", "adf_p", "half_life", "corr", "val_sharpe"):
+            assert getattr(res, field) == pytest.approx(getattr(best, field), rel=1e-7, abs=1e-12)
+
+    selected = scan_pairs(
+        prices=data, tickers=list(prices.columns), train_idx=train, val_idx=val,
+        corr_threshold=0.3, fdr_q=0.2, top_k=4, orientation="both", **args,
+    )
+    assert selected and len({frozenset((r.y, r.x)) for r in selected}) == len(selected)
+    with pytest.raises(ValueError):
+        scan_pairs(prices=data, tickers=["Y", "X"], train_idx=train, val_idx=val, orientation="up", **args)
+
+
+def _make_long_prices(n: int = 800) -> pd.DataFrame:
+    """Y/X and W/X cointegrated, Z unrelated; long enough for quarterly windows."""
+    rng = np.random.default_rng(7)
+    dates = pd.bdate_range("2018-01-01", periods=n)
+    x = 100.0 + np.cumsum(rng.normal(0, 0.5, n))
+    ou = np.zeros(n)
+    for i in range(1, n):
+        ou[i] = 0.8 * ou[i - 1] + rng.normal(0, 0.3)
+    return pd.DataFrame(
+        {
+            "Y": 0.5 + 1.2 * x + ou,
+            "X": x,
+            "W": 30.0 + 0.8 * x + rng.normal(0, 0.3, n),
+            "Z": 50.0 + np.cumsum(rng.normal(0, 0.4, n)),
+        },
+        index=dates,
+    )
+
+
+def _scan_unstaged(data, train, val, candidates, fdr_q, top_k, **args):
+    """scan_pairs before staging: evaluate (and backtest) every candidate, then FDR."""
+    from sarb.stats.multiple_testing import fdr_control
+
+    results = [evaluate_pair_rows(data, data.columns[y], data.columns[x], train, val, **args) for y, x in candidates]
+    results = [r for r in results if r is not None and np.isfinite(r.adf_p)]
+    keep, _ = fdr_control([r.adf_p for r in results], q=fdr_q)
+    filtered = [r for r, k in zip(results, keep) if k] or sorted(results, key=lambda r: r.adf_p)[:top_k]
+    return sorted(filtered, key=lambda r: r.val_sharpe, reverse=True)[:top_k]
+
+
+@pytest.mark.parametrize("fdr_q", [0.5, 1e-300])  # second case exercises the no-survivor fallback
+def test_staged_scan_matches_unstaged_pipeline(fdr_q):
+    from sarb.research.select_pairs import screen_pairs
+
+    prices = _make_long_prices()
+    data = ResearchData.from_prices(prices)
+    train, val = slice(0, 400), slice(400, 600)
+    args = dict(lookback_z=40, entry_z=1.5, exit_z=0.5, fee_bps=1.0, slippage_bps=0.5)
+    tickers = list(prices.columns)
+    candidates = [(y, x) for i, y in enumerate(tickers) for x in tickers[i + 1:]]
+
+    staged = scan_pairs(data, tickers, train, val, corr_threshold=0.0, fdr_q=fdr_q, top_k=4, **args)
+    ref = _scan_unstaged(data, train, val, candidates, fdr_q, 4, **args)
+    assert [(r.y, r.x) for r in staged] == [(r.y, r.x) for r in ref]
+    for a, b in zip(staged, ref):
+        for field in ("alpha", "beta", "corr", "adf_p", "half_life", "val_sharpe"):
+            assert getattr(a, field) == pytest.approx(getattr(b, field), rel=1e-8, abs=1e-12)
+
+    screen = screen_pairs(data, [(0, 1)], slice(0, 200), val)
+    assert not screen.eligible.any()  # TRAIN too short, nothing reaches the backtest
+
+
+def test_walkforward_portfolio_multi_matches_single():
+    from sarb.research.walkforward_portfolio import (
+        WFConfig,
+        walkforward_quarterly_portfolio,
+        walkforward_quarterly_portfolio_multi,
+    )
+    from sarb.risk.limits import RiskLimits
+    from sarb.split.rebalance import rolling_windows_by_quarter
+
+    prices = _make_long_prices()
+    windows = rolling_windows_by_quarter(prices, train_days=300, val_days=100)
+    assert len(windows) >= 2
+
+    cfgs = [
+        WFConfig(top_k=2, corr_threshold=0.3, fdr_q=0.20, use_vol_targeting=False),
+        WFConfig(top_k=2, corr_threshold=0.3, fdr_q=0.20, use_vol_targeting=True),
+        WFConfig(
+            top_k=2, corr_threshold=0.3, fdr_q=0.20,
+            use_correlation_weights=True, risk_limits=RiskLimits(),
+        ),
+        WFConfig(top_k=1, corr_threshold=0.3, fdr_q=0.20),
+    ]
+    tickers = ["Y", "X", "W", "Z"]
+    multi = walkforward_quarterly_portfolio_multi(prices, tickers, windows, cfgs)
+    assert len(multi) == len(cfgs)
+
+    for cfg, (port, meta) in zip(cfgs, multi):
+        port_1, meta_1 = walkforward_quarterly_portfolio(prices, tickers, windows, cfg)
+        pd.testing.assert_frame_equal(port, port_1)
+        pd.testing.assert_frame_equal(meta, meta_1)
+
+
+def test_daily_portfolio_on_walkforward_matrix_matches_quarterly():
+    from sarb.portfolio.daily import DailyPortfolioConfig, run_daily_portfolio
+    from sarb.research.walkforward_portfolio import (
+        WFConfig,
+        walkforward_pair_return_matrix,
+        walkforward_quarterly_portfolio,
+    )
+    from sarb.split.rebalance import rolling_windows_by_quarter
+
+    prices = _make_long_prices()
+    windows = rolling_windows_by_quarter(prices, train_days=300, val_days=100)
+    cfg = WFConfig(top_k=2, corr_threshold=0.3, fdr_q=0.20, use_vol_targeting=False)
+    tickers = list(prices.columns)
+
+    M = walkforward_pair_return_matrix(prices, tickers, windows, cfg)
+    assert M.shape[1] >= 2
+    out, _ = run_daily_portfolio(M, DailyPortfolioConfig(use_vol_targeting=False))
+    port, _ = walkforward_quarterly_portfolio(prices, tickers, windows, cfg)
+    # equal weights over held pairs == the quarterly equal-weight baseline
+    np.testing.assert_allclose(out["ret_net"].values, port["ret_net"].values, atol=1e-15)
+
+
+def test_research_data_views_and_row_functions(synthetic_prices):
+    from sarb.research.context import ResearchData
+    from sarb.research.select_pairs import evaluate_pair_rows
+    from sarb.research.walkforward_portfolio import WFConfig, pair_window_returns, trade_one_pair_window
+
+    prices = synthetic_prices.copy()
+    prices.iloc[320:323, 1] = np.nan  # missing X bars inside val
+    data = ResearchData.from_prices(prices)
+    train, val, test = time_train_val_test_split(prices, 0.6, 0.2)
+    tr, va, te = data.rows(train.index), data.rows(val.index), data.rows(test.index)
+    assert (tr.start, tr.stop, va.stop) == (0, 300, 400)
+
+    y, x, kept = data.pair(tr, data.columns["Y"], data.columns["X"])
+    assert kept is None and np.shares_memory(y, data.values)
+    _, _, kept = data.pair(va, data.columns["Y"], data.columns["X"])
+    assert len(kept) == 97
+
+    kw = dict(lookback_z=60, entry_z=2.0, exit_z=0.5, fee_bps=1.0, slippage_bps=0.5)
+    by_rows = evaluate_pair_rows(data, data.columns["Y"], data.columns["X"], tr, va, **kw)
+    by_labels = evaluate_pair_on_val(prices, "Y", "X", train.index, val.index, **kw)
+    assert by_rows == by_labels
+
+    cfg = WFConfig(entry_z=1.0, exit_z=0.2)
+    sig = slice(tr.start, te.stop)
+    r = pair_window_returns(data, data.columns["Y"], data.columns["X"], tr, sig, cfg)
+    s = trade_one_pair_window(prices, "Y", "X", train.index, prices.index, test.index, cfg)
+    np.testing.assert_array_equal(r[te.start:], s.to_numpy())
+    assert np.all(r[320:323] == 0.0) and np.any(r != 0.0)
+    # the train+val history is a prefix of the train..trade backtest (causal signals)
+    hist = pair_window_returns(data, data.columns["Y"], data.columns["X"], tr, slice(tr.start, va.stop), cfg)
+    np.testing.assert_array_equal(r[: va.stop], hist)
+
+    with pytest.raises(ValueError):
+        data.rows(train.index[::2])
+
+
+def test_basket_search_finds_planted_basket():
+    from sarb.research.baskets import BasketSearch, search_baskets, trade_basket
+
+    rng = np.random.default_rng(8)
+    n = 700
+    idx = pd.bdate_range("2019-01-01", periods=n)
+    trends = np.cumsum(rng.normal(0, 1, (n, 2)), axis=0)
+    stationary = np.zeros(n)
+    for t in range(1, n):
+        stationary[t] = 0.8 * stationary[t - 1] + rng.normal(0, 0.5)
+    # C = A + B - 100 + stationary: weights ~ (1, 1, -1) on (A, B, C)
+    a = 100 + trends[:, 0] + rng.normal(0, 0.2, n)
+    b = 100 + trends[:, 1] + rng.normal(0, 0.2, n)
+    prices = pd.DataFrame({
+        "A": a, "B": b, "C": a + b - 100 + stationary,
+        "D": 100 + np.cumsum(rng.normal(0, 1, n)),
+        "E": 100 + np.cumsum(rng.normal(0, 1, n)),
+    }, index=idx)
+    train = idx[:500]
+
+    found = search_baskets(prices, [["A", "B", "C", "D", "E"]], train, sizes=(3, 4), min_abs_corr=0.0)
+    assert found and found[0].rank >= 1
+    best = [r for r in found if len(r.tickers) == 3][0]
+    assert best.tickers == ("A", "B", "C")
+    np.testing.assert_allclose(best.weights, [1.0, 1.0, -1.0], atol=0.1)
+    assert [r.trace_ratio for r in found] == sorted((r.trace_ratio for r in found), reverse=True)
+
+    # an exactly collinear ticker only drops the baskets it is in
+    collinear = prices.assign(F=2.0 * prices["A"])
+    with_f = search_baskets(collinear, [["A", "B", "C", "D", "E", "F"]], train, sizes=(3, 4), min_abs_corr=0.0)
+    assert with_f[0].trace_ratio == pytest.approx(found[0].trace_ratio)  # A,B,C or its twin B,C,F
+    assert not any({"A", "F"} <= set(r.tickers) for r in with_f)
+
+    # the correlation prune drops every basket when no legs are linked
+    search = BasketSearch(prices, train)
+    assert search.search([["A", "B", "C", "D", "E"]], sizes=(3,), min_abs_corr=0.99) == []
+
+    bt = trade_basket(prices, best, lookback_z=40, entry_z=1.5, exit_z=0.5, fee_bps=1.0, slippage_bps=0.5)
+    assert {"z", "w_A", "w_B", "w_C", "ret_net", "equity"} <= set(bt.columns)
+    gross = bt[["w_A", "w_B", "w_C"]].abs().sum(axis=1)
+    assert np.allclose(gross[gross > 0], 1.0)
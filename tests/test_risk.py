@@ -1,13 +1,20 @@
 from __future__ import annotations
 import numpy as np
+import pytest
 import pandas as pd
 
-from sarb.risk.covariance import ledoit_wolf_shrinkage, correlation_aware_weights
+from sarb.risk.covariance import (
+    ledoit_wolf_shrinkage,
+    correlation_aware_weights,
+    RollingCovariance,
+    EWMCovariance,
+)
 from sarb.risk.limits import (
     RiskLimits,
     apply_position_limits,
     check_drawdown_breaker,
     compute_short_borrow_cost,
+    DrawdownState,
 )
 
 
@@ -27,6 +34,47 @@ def test_ledoit_wolf_shrinkage_symmetric():
     np.testing.assert_array_almost_equal(cov.values, cov.values.T)
 
 
+def test_ledoit_wolf_shrinkage_matches_sklearn():
+    skcov = pytest.importorskip("sklearn.covariance")
+    rng = np.random.default_rng(0)
+    X = rng.normal(0, 0.01, (150, 20)) + rng.normal(0, 0.005, (150, 1))
+    cov = ledoit_wolf_shrinkage(pd.DataFrame(X))
+    expected, _ = skcov.ledoit_wolf(X)
+    np.testing.assert_allclose(cov.values, expected, rtol=1e-10, atol=1e-16)
+
+
+def test_rolling_covariance_matches_batch():
+    rng = np.random.default_rng(1)
+    X = rng.normal(0, 0.01, (150, 6)) + rng.normal(0, 0.005, (150, 1))
+    rc = RollingCovariance(n_assets=6, window=40)
+    for i, row in enumerate(X):
+        rc.update(row)
+        if i in (20, 39, 75, 149):
+            ref = ledoit_wolf_shrinkage(pd.DataFrame(X[max(0, i - 39) : i + 1]))
+            np.testing.assert_allclose(rc.ledoit_wolf(), ref.values, rtol=1e-8, atol=1e-16)
+    assert rc.count == 40
+
+
+def test_ewm_covariance_matches_pandas():
+    rng = np.random.default_rng(2)
+    X = rng.normal(0, 0.01, (200, 4))
+    ec = EWMCovariance(n_assets=4, halflife=20.0)
+    for row in X:
+        ec.update(row)
+    expected = pd.DataFrame(X).ewm(halflife=20.0).cov(bias=True).iloc[-4:].values
+    np.testing.assert_allclose(ec.covariance(), expected, rtol=1e-8)
+    shrunk = ec.ledoit_wolf()
+    assert (np.linalg.eigvalsh(shrunk) > 0).all()
+
+
+def test_correlation_aware_weights_precomputed_cov():
+    rng = np.random.default_rng(42)
+    ret = pd.DataFrame(rng.normal(0, 0.01, (200, 3)), columns=["P1", "P2", "P3"])
+    w = correlation_aware_weights(ret, target_vol=0.008)
+    w_cov = correlation_aware_weights(ret, target_vol=0.008, cov=ledoit_wolf_shrinkage(ret))
+    pd.testing.assert_series_equal(w, w_cov)
+
+
 def test_correlation_aware_weights():
     rng = np.random.default_rng(42)
     ret = pd.DataFrame(rng.normal(0, 0.01, (200, 3)), columns=["P1", "P2", "P3"])
@@ -59,6 +107,18 @@ def test_check_drawdown_breaker_no_trigger():
     assert check_drawdown_breaker(eq, limits) is False
 
 
+def test_drawdown_state_matches_batch():
+    rets = [0.0, 0.1, -0.0909, -0.12, -0.034, 0.0588]
+    state = DrawdownState()
+    for r in rets:
+        state.update(r)
+    eq = (1.0 + pd.Series(rets)).cumprod()
+    dd = (eq / eq.cummax()) - 1.0
+    assert abs(state.max_drawdown - dd.min()) < 1e-12
+    limits = RiskLimits(max_drawdown_pct=0.15)
+    assert state.breached(limits) == check_drawdown_breaker(eq, limits)
+
+
 def test_compute_short_borrow_cost():
     short = pd.Series([10000.0, 10000.0, 10000.0])
     cost = compute_short_borrow_cost(short, borrow_cost_bps=100.0, ann_factor=252)
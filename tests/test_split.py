@@ -37,3 +37,80 @@ def test_rolling_windows_by_quarter(synthetic_prices):
         # Time ordering: train < val < trade
         assert train_idx.max() <= val_idx.min()
         assert val_idx.max() <= trade_idx.min()
+
+
+def test_rolling_windows_by_quarter_intraday_bars():
+    import numpy as np
+    from sarb.config import bars_per_day, periods_per_year
+
+    assert bars_per_day("1D") == 1
+    assert bars_per_day("30min") == 13
+    assert periods_per_year("1h") == 252 * 6.5
+
+    days = pd.bdate_range("2020-01-01", "2021-12-31")
+    idx = pd.DatetimeIndex(np.concatenate(
+        [(d + pd.Timedelta("09:30:00") + pd.timedelta_range(0, periods=13, freq="30min")).values for d in days]
+    ))
+    prices = pd.DataFrame({"A": np.arange(len(idx), dtype=float)}, index=idx)
+
+    windows = rolling_windows_by_quarter(prices, train_days=126, val_days=63, bars_per_day=13)
+    assert windows
+    for train, val, trade in windows:
+        assert len(train) == 126 * 13
+        assert len(val) == 63 * 13
+        assert train.max() < val.min() and val.max() < trade.min()
+
+
+def _legacy_quarter_windows(prices, train_days, val_days):
+    idx = pd.DatetimeIndex(prices.index).sort_values()
+    q_starts = list(idx.to_series().groupby(idx.to_period("Q")).min().values)
+    windows = []
+    for t0, t1 in zip(q_starts[:-1], q_starts[1:]):
+        trade = idx[(idx >= t0) & (idx < t1)]
+        if len(trade) < 20 or (idx < t0).sum() < val_days:
+            continue
+        start_val = idx[idx < t0][-val_days]
+        if (idx < start_val).sum() < train_days:
+            continue
+        start_train = idx[idx < start_val][-train_days]
+        windows.append((idx[(idx >= start_train) & (idx < start_val)], idx[(idx >= start_val) & (idx < t0)], trade))
+    return windows
+
+
+def test_plan_rolling_windows_matches_label_windows():
+    import numpy as np
+    from sarb.split.rebalance import plan_rolling_windows
+
+    idx = pd.bdate_range("2012-01-01", periods=1500)
+    prices = pd.DataFrame({"A": np.arange(len(idx), dtype=float)}, index=idx)
+    expected = _legacy_quarter_windows(prices, 252, 63)
+
+    plan = plan_rolling_windows(idx, 252, 63, freq="Q")
+    assert len(plan) == len(expected) > 0
+    for w, (train, val, trade) in zip(plan, expected):
+        assert idx[w.train].equals(train) and idx[w.val].equals(val) and idx[w.trade].equals(trade)
+        # positional slices give views of the price array
+        assert np.shares_memory(prices.to_numpy()[w.trade], prices.to_numpy())
+
+    got = rolling_windows_by_quarter(prices, 252, 63)
+    assert all(a.equals(b) for gw, ew in zip(got, expected) for a, b in zip(gw, ew))
+
+
+def test_plan_rolling_windows_frequencies_and_calendar():
+    from sarb.split.rebalance import plan_rolling_windows, rebalance_starts
+
+    idx = pd.bdate_range("2020-01-01", periods=400)
+
+    monthly = plan_rolling_windows(idx, 100, 20, freq="M", min_trade_days=5)
+    assert all(idx[w.trade][0].month == idx[w.trade][-1].month for w in monthly)
+    assert all(w.trade.stop == n.trade.start for w, n in zip(monthly, monthly[1:]))
+
+    weekly = rebalance_starts(idx, "W")
+    assert all(idx[p].dayofweek == 0 for p in weekly[1:])
+
+    cal = pd.to_datetime(["2020-09-15", "2020-11-01", "2021-01-04", "2021-03-20"])
+    custom = plan_rolling_windows(idx, 100, 20, freq=cal, min_trade_days=5)
+    assert [idx[w.trade][0] for w in custom] == [pd.Timestamp("2020-09-15"), pd.Timestamp("2020-11-02"), pd.Timestamp("2021-01-04")]
+    for w in custom:
+        assert w.train.stop == w.val.start and w.val.stop == w.trade.start
+        assert w.train.stop - w.train.start == 100 and w.val.stop - w.val.start == 20
@@ -1,9 +1,10 @@
 from __future__ import annotations
 import numpy as np
 import pandas as pd
+import pytest
 
-from sarb.stats.cointegration import engle_granger_adf_pvalue, estimate_half_life
-from sarb.stats.bootstrap import bootstrap_mean_ci, bootstrap_sharpe_ci
+from sarb.stats.cointegration import adf_pvalues, engle_granger_adf_pvalue, estimate_half_life, half_lives
+from sarb.stats.bootstrap import QuantileSketch, bootstrap_cis, bootstrap_mean_ci, bootstrap_sharpe_ci
 from sarb.stats.multiple_testing import benjamini_hochberg
 
 
@@ -36,6 +37,29 @@ def test_estimate_half_life(synthetic_prices):
     assert hl > 0
 
 
+def test_batched_adf_and_half_life_match_per_series():
+    rng = np.random.default_rng(5)
+    n, k = 400, 12
+    series = np.empty((n, k))
+    for j in range(k):
+        phi = 0.7 + 0.3 * j / (k - 1)  # from strongly mean-reverting to a random walk
+        e = rng.normal(size=n)
+        for t in range(1, n):
+            e[t] += phi * e[t - 1]
+        series[:, j] = 10.0 + e
+    series[:, -1] = 3.0  # constant column -> NaN
+
+    p = adf_pvalues(series)
+    hl = half_lives(series)
+    for j in range(k - 1):
+        s = pd.Series(series[:, j])
+        assert p[j] == pytest.approx(engle_granger_adf_pvalue(s), rel=1e-8, abs=1e-12)
+        ref_hl = estimate_half_life(s)
+        assert (np.isnan(hl[j]) and np.isnan(ref_hl)) or hl[j] == pytest.approx(ref_hl, rel=1e-9)
+    assert np.isnan(p[-1])
+    assert np.isnan(adf_pvalues(series[:30])).all()
+
+
 def test_bootstrap_mean_ci():
     rng = np.random.default_rng(42)
     r = pd.Series(rng.normal(0.001, 0.01, 252))
@@ -56,6 +80,42 @@ def test_bootstrap_sharpe_ci():
     assert ci["ci_low"] <= ci["sharpe"] <= ci["ci_high"]
 
 
+def test_quantile_sketch_merges_exactly():
+    rng = np.random.default_rng(3)
+    v = rng.normal(0, 1, 50_000)
+    whole = QuantileSketch(-4.0, 4.0, bins=4096)
+    whole.update(v)
+    parts = [QuantileSketch(-4.0, 4.0, bins=4096) for _ in range(3)]
+    for part, chunk in zip(parts, np.array_split(v, 3)):
+        part.update(chunk)
+    parts[0].merge(parts[2])
+    parts[0].merge(parts[1])
+    np.testing.assert_array_equal(parts[0].counts, whole.counts)
+    for q in (0.001, 0.025, 0.5, 0.975, 1.0):
+        assert abs(whole.quantile(q) - np.quantile(v, q)) <= 8.0 / 4096
+    assert whole.quantile(1.0) == v.max()  # tails come from the exact extremes
+
+
+def test_bootstrap_cis_independent_of_jobs():
+    rng = np.random.default_rng(42)
+    rets = {f"p{i}": pd.Series(rng.normal(0.001, 0.01, 252)) for i in range(3)}
+    rets["flat"] = pd.Series(np.zeros(10))
+    one = bootstrap_cis(rets, n_boot=4000, chunk_size=700)
+    two = bootstrap_cis(rets, n_boot=4000, chunk_size=700, jobs=2)
+    pd.testing.assert_frame_equal(one, two)
+
+    assert list(one.index) == ["p0", "p1", "p2", "flat"]
+    assert (one["mean_ci_low"] <= one["mean"]).all() and (one["mean"] <= one["mean_ci_high"]).all()
+    assert (one.loc["flat"] == 0.0).all()
+    # same estimator as the per-series functions, different resample streams
+    ref = bootstrap_sharpe_ci(rets["p0"], n_boot=4000)
+    assert abs(one.loc["p0", "sharpe_ci_low"] - ref["ci_low"]) < 0.3
+    assert abs(one.loc["p0", "sharpe_ci_high"] - ref["ci_high"]) < 0.3
+
+    with pytest.raises(ValueError):
+        bootstrap_cis(rets, n_boot=0)
+
+
 def test_benjamini_hochberg_basic():
     # Known p-values: first two should be rejected at q=0.10
     pvals = [0.001, 0.01, 0.5, 0.8]
@@ -74,3 +134,77 @@ def test_benjamini_hochberg_all_high():
     pvals = [0.5, 0.6, 0.7]
     mask = benjamini_hochberg(pvals, q=0.05)
     assert all(m is False for m in mask)
+
+
+def test_fdr_control_matches_statsmodels_rowwise():
+    from statsmodels.stats.multitest import multipletests
+    from sarb.stats.multiple_testing import fdr_control
+
+    rng = np.random.default_rng(0)
+    pvals = rng.uniform(0, 1, (20, 150)) ** 3
+    for method, sm_method in [("bh", "fdr_bh"), ("by", "fdr_by")]:
+        reject, adjusted = fdr_control(pvals, q=0.10, method=method)
+        assert reject.shape == adjusted.shape == pvals.shape
+        for row in range(len(pvals)):
+            exp_reject, exp_adj, _, _ = multipletests(pvals[row], alpha=0.10, method=sm_method)
+            np.testing.assert_array_equal(reject[row], exp_reject)
+            np.testing.assert_allclose(adjusted[row], exp_adj)
+
+    bh_reject, _ = fdr_control(pvals, q=0.10, method="bh")
+    assert all(bh_reject[row].tolist() == benjamini_hochberg(list(pvals[row]), q=0.10) for row in range(len(pvals)))
+
+
+def test_fdr_control_nan_padding_and_storey():
+    from sarb.stats.multiple_testing import fdr_control, storey_pi0
+
+    rng = np.random.default_rng(1)
+    pvals = np.concatenate([rng.uniform(0, 1e-3, (4, 30)), rng.uniform(0, 1, (4, 170))], axis=1)
+    padded = np.concatenate([pvals, np.full((4, 50), np.nan)], axis=1)
+
+    reject, adjusted = fdr_control(padded, q=0.10, method="by")
+    exp_reject, exp_adj = fdr_control(pvals, q=0.10, method="by")
+    np.testing.assert_array_equal(reject[:, :200], exp_reject)
+    np.testing.assert_allclose(adjusted[:, :200], exp_adj)
+    assert not reject[:, 200:].any() and np.isnan(adjusted[:, 200:]).all()
+
+    pi0 = storey_pi0(pvals)
+    assert np.all((pi0 > 0.6) & (pi0 <= 1.0))
+    st_reject, qvals = fdr_control(pvals, q=0.10, method="storey")
+    bh_reject, bh_adj = fdr_control(pvals, q=0.10, method="bh")
+    np.testing.assert_allclose(qvals, np.minimum(bh_adj * pi0[:, None], 1.0))
+    assert st_reject.sum() >= bh_reject.sum()
+    np.testing.assert_array_equal(st_reject, qvals <= 0.10)
+
+
+@pytest.mark.parametrize("k_ar_diff", [1, 2])
+def test_johansen_batch_matches_statsmodels(k_ar_diff):
+    from statsmodels.tsa.vector_ar.vecm import coint_johansen
+    from sarb.stats.johansen import JohansenMoments, johansen_batch
+
+    rng = np.random.default_rng(5)
+    n = 600
+    common = np.cumsum(rng.normal(0, 1, (n, 2)), axis=0)
+    px = np.column_stack([
+        common[:, 0] + rng.normal(0, 0.5, n),
+        0.5 * common[:, 0] + common[:, 1] + rng.normal(0, 0.5, n),
+        common[:, 1] + rng.normal(0, 0.5, n),
+        np.cumsum(rng.normal(0, 1, n)),
+        common[:, 0] - common[:, 1] + rng.normal(0, 0.5, n),
+    ]) + 100.0
+    baskets = np.array([[0, 1, 2], [1, 2, 4], [0, 3, 4], [2, 3, 4]])
+    res = johansen_batch(JohansenMoments.from_prices(px, k_ar_diff), baskets)
+    for i, b in enumerate(baskets):
+        ref = coint_johansen(px[:, b], det_order=0, k_ar_diff=k_ar_diff)
+        np.testing.assert_allclose(res.eig[i], ref.eig, rtol=1e-9)
+        np.testing.assert_allclose(res.trace_stat[i], ref.lr1, rtol=1e-8)
+        np.testing.assert_allclose(res.max_eig_stat[i], ref.lr2, rtol=1e-8)
+        np.testing.assert_allclose(res.trace_crit, ref.cvt)
+        v = ref.evec[:, 0] / ref.evec[0, 0]
+        np.testing.assert_allclose(res.weights()[i], v, rtol=1e-6)
+    assert res.rank()[0] >= 1  # legs 0,1,2 share two common trends
+
+    # constant and exactly collinear legs are screened out, not fatal for the batch
+    bad = np.column_stack([px, np.full(n, 7.0), 2.0 * px[:, 0]])
+    screened = johansen_batch(JohansenMoments.from_prices(bad, k_ar_diff), [[0, 1, 2], [0, 1, 5], [1, 2, 6], [0, 2, 6]])
+    np.testing.assert_array_equal(screened.baskets, [[0, 1, 2], [1, 2, 6]])
+    np.testing.assert_allclose(screened.eig[0], res.eig[0], rtol=1e-9)
@@ -35,3 +35,48 @@ def test_generate_spread_positions_entry_exit():
     # After z crosses back to |z|<=0.5, should exit
     # The position at index 5 (from z=-0.2 at index 4) should be 0
     assert pos.iloc[5] == 0.0
+
+
+def test_final_spread_state_matches_machine():
+    from sarb.strategy.pairs import final_spread_state
+
+    rng = np.random.default_rng(0)
+    for k in range(300):
+        z = rng.normal(0, 1.5, rng.integers(1, 60))
+        z[rng.random(len(z)) < 0.1] = np.nan
+        entry_z, exit_z = [(2.0, 0.5), (1.0, 0.2), (0.5, 0.5)][k % 3]
+        # append a dummy bar so the shifted machine exposes the state after z[-1]
+        pos = generate_spread_positions(pd.Series(np.append(z, 0.0)), entry_z, exit_z)
+        assert final_spread_state(z, entry_z, exit_z) == pos.iloc[-1]
+
+
+def _reference_states(z, entry_z, exit_z, state=0.0):
+    out = []
+    for zi in z:
+        if not np.isnan(zi):
+            if state == 0.0:
+                if zi <= -entry_z:
+                    state = +1.0
+                elif zi >= entry_z:
+                    state = -1.0
+            elif abs(zi) <= exit_z:
+                state = 0.0
+        out.append(state)
+    return np.array(out)
+
+
+def test_spread_states_vectorized_matches_loop_and_chunks():
+    from sarb.strategy.pairs import spread_states
+
+    rng = np.random.default_rng(1)
+    for k in range(400):
+        z = rng.normal(0, 1.5, rng.integers(2, 80))
+        z[rng.random(len(z)) < 0.1] = np.nan
+        entry_z, exit_z = [(2.0, 0.5), (1.0, 0.2), (0.5, 0.5), (1.0, -1.0)][k % 4]
+        full = spread_states(z, entry_z, exit_z)
+        np.testing.assert_array_equal(full, _reference_states(z, entry_z, exit_z))
+
+        cut = len(z) // 2
+        head = spread_states(z[:cut], entry_z, exit_z)
+        tail = spread_states(z[cut:], entry_z, exit_z, initial=head[-1] if cut else 0.0)
+        np.testing.assert_array_equal(np.concatenate([head, tail]), full)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
+import pytest
 from matplotlib.figure import Figure
 
 from sarb.viz.charts import (
@@ -66,3 +67,56 @@ def test_save_figure(tmp_path, synthetic_prices):
     path = str(tmp_path / "test.png")
     save_figure(fig, path)
     assert (tmp_path / "test.png").exists()
+
+
+def test_downsampling_keeps_extremes():
+    from sarb.viz.charts import minmax_indices, lttb_indices
+
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=50_001))
+    y[123] = np.nan
+
+    keep = minmax_indices(y, 1000)
+    assert len(keep) <= 1000
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert np.nanmax(y[keep]) == np.nanmax(y) and np.nanmin(y[keep]) == np.nanmin(y)
+    assert np.array_equal(minmax_indices(y[:500], 1000), np.arange(500))
+
+    keep = lttb_indices(np.arange(len(y)), y, 500)
+    assert len(keep) == 500 and np.all(np.diff(keep) > 0)
+
+    s = pd.Series(y, index=pd.date_range("2020-01-01", periods=len(y), freq="min"))
+    fig = plot_equity_curve(s, max_points=500, downsample="lttb")
+    assert len(fig.axes[0].lines[0].get_xdata()) == 500
+    with pytest.raises(ValueError):
+        plot_equity_curve(s, max_points=500, downsample="every_nth")
+
+
+def test_correlation_heatmap_skips_annotations_when_large():
+    rng = np.random.default_rng(1)
+    small = plot_correlation_heatmap(pd.DataFrame(rng.normal(size=(100, 5))))
+    large = plot_correlation_heatmap(pd.DataFrame(rng.normal(size=(100, 120))))
+    assert len(small.axes[0].texts) == 25
+    assert len(large.axes[0].texts) == 0
+    assert len(large.axes[0].get_xticks()) <= 60
+
+
+def test_save_backtest_reports_batch(tmp_path):
+    from sarb.viz.report import PairReport, save_backtest_reports
+
+    rng = np.random.default_rng(2)
+    idx = pd.bdate_range("2020-01-01", periods=5000)
+    items = [
+        PairReport(
+            prefix=f"P{i}",
+            bt=pd.DataFrame({"equity": 1 + np.cumsum(rng.normal(0, 0.01, len(idx)))}, index=idx),
+            spread=pd.Series(rng.normal(size=len(idx)), index=idx),
+            z=pd.Series(rng.normal(size=len(idx)), index=idx),
+        )
+        for i in range(3)
+    ]
+    saved = save_backtest_reports(items, output_dir=tmp_path, jobs=2, max_points=1000, dpi=60)
+    assert sorted(saved) == ["P0", "P1", "P2"]
+    for paths in saved.values():
+        assert len(paths) == 3
+        assert all((tmp_path / p.split("/")[-1]).exists() for p in paths)